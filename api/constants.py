@@ -1,43 +1,94 @@
-from typing import List
+import asyncio
+import json
+import logging
+import os
+from typing import List, Optional
 
-import anthropic
+from src.settings import settings
 
+# Used until the first successful refresh when no persisted list exists
+FALLBACK_CLAUDE_MODELS = [
+    "claude-3-5-haiku-20241022",
+    "claude-sonnet-4-20250514",
+    "claude-opus-4-20250514",
+    "claude-opus-4-1-20250805",
+]
 
-def get_claude_models() -> List[str]:
-    """Fetch available Claude models from Anthropic API."""
-    try:
-        client = anthropic.Anthropic()
-        models = client.models.list().data
-        model_ids = [model.id for model in models]
 
-        # Sort models to prioritize Haiku (cheaper) as default
-        haiku_models = [m for m in model_ids if "haiku" in m.lower()]
-        other_models = [m for m in model_ids if "haiku" not in m.lower()]
+def _sort_models(model_ids: List[str]) -> List[str]:
+    # Sort models to prioritize Haiku (cheaper) as default
+    haiku_models = [m for m in model_ids if "haiku" in m.lower()]
+    other_models = [m for m in model_ids if "haiku" not in m.lower()]
+
+    # Return Haiku models first for cheaper defaults
+    return haiku_models + other_models
 
-        # Return Haiku models first for cheaper defaults
-        return haiku_models + other_models
-    except Exception:
-        # Fallback to hardcoded models if API call fails
-        return [
-            "claude-3-5-haiku-20241022",
-            "claude-sonnet-4-20250514",
-            "claude-opus-4-20250514",
-            "claude-opus-4-1-20250805",
-        ]
 
+# Last known model list; filled from disk or by the background refresh, never
+# by a blocking network call
+_CLAUDE_MODELS: Optional[List[str]] = None
 
-# Cache models to avoid repeated API calls
-_CLAUDE_MODELS = None
+
+def _load_persisted_models() -> Optional[List[str]]:
+    try:
+        with open(settings.model_cache_path, "r", encoding="utf-8") as f:
+            models = json.load(f)
+        if isinstance(models, list) and models:
+            return [str(m) for m in models]
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def _persist_models(models: List[str]) -> None:
+    try:
+        directory = os.path.dirname(settings.model_cache_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{settings.model_cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(models, f)
+        os.replace(tmp_path, settings.model_cache_path)
+    except OSError as e:
+        logging.warning(f"Could not persist Claude model list: {e}")
 
 
 def get_cached_claude_models() -> List[str]:
-    """Get cached Claude models or fetch them if not cached."""
+    """Get the last known Claude models without touching the network."""
     global _CLAUDE_MODELS
     if _CLAUDE_MODELS is None:
-        _CLAUDE_MODELS = get_claude_models()
+        _CLAUDE_MODELS = _load_persisted_models() or list(FALLBACK_CLAUDE_MODELS)
     return _CLAUDE_MODELS
 
 
+async def refresh_claude_models() -> List[str]:
+    """Fetch the model list from Anthropic and persist it; keeps the old list on failure."""
+    global _CLAUDE_MODELS
+    import anthropic
+
+    try:
+        async with anthropic.AsyncAnthropic(
+            timeout=settings.model_discovery_timeout
+        ) as client:
+            page = await client.models.list()
+        models = _sort_models([model.id for model in page.data])
+        if models:
+            _CLAUDE_MODELS = models
+            _persist_models(models)
+    except Exception as e:
+        logging.warning(f"Claude model refresh failed, keeping last known list: {e}")
+    return get_cached_claude_models()
+
+
+async def refresh_claude_models_periodically(
+    interval: float = settings.model_refresh_interval,
+) -> None:
+    """Background task: refresh the model list now and then every `interval` seconds."""
+    while True:
+        await refresh_claude_models()
+        await asyncio.sleep(interval)
+
+
 # Static constants
 DIFFICULTY_LEVEL = ["Easy", "Medium", "Hard"]
 CHAT_TYPE = ["Get a Hint", "Deep Dive into the Answer"]
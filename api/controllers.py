@@ -1,60 +1,140 @@
-from fastapi import HTTPException
+import asyncio
+import logging
+import multiprocessing
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict
+from functools import lru_cache
+from typing import AsyncIterator, Optional, Tuple
+
+from fastapi import Header, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse, StreamingResponse
 
 from api.constants import CHAT_TYPE, DIFFICULTY_LEVEL, get_cached_claude_models
+from api.jobs import Job, ProgressCallback, get_job_manager
 from api.models import (
     ChatRequest,
     ChatResponse,
     GenerateCluesRequest,
     GenerateCrosswordRequest,
     GenerateCrosswordResponse,
+    GeneratePuzzleBatchRequest,
+    GeneratePuzzleRequest,
+    GeneratePuzzleResponse,
+    JobCreatedResponse,
+    JobResponse,
+    PlacementVerdict,
+    ProfilingStatusResponse,
+    ProfilingUpdateRequest,
+    PuzzleBatchItem,
+    PuzzleListResponse,
+    PuzzleSummary,
+    StoredPuzzleResponse,
+    VerifyPuzzleRequest,
+    VerifyPuzzleResponse,
 )
+from api.wire import NegotiatedResponse, negotiate
 from src.chat.chat_service import ChatService
-from src.crossword.clue_generator import ClueGenerator
+from src.crossword.clue_generator import ClueGenerator, CrosswordClue
 from src.crossword.crossword_generator import CrosswordGenerator
+from src.crossword.fit_pipeline import FitDrivenPuzzleBuilder
+from src.crossword.wire_format import (
+    COMPACT_MEDIA_TYPE,
+    JSON_MEDIA_TYPE,
+    MSGPACK_MEDIA_TYPE,
+)
+from src.llm.client import LLMUnavailableError
+from src.llm.scheduler import SchedulerOverloadedError, get_scheduler
+from src.llm.usage import TokenBudgetExceededError, get_usage_tracker, usage_scope
+from src.metrics import (
+    LLM_IN_FLIGHT,
+    LLM_QUEUE_DEPTH,
+    REGISTRY,
+    record_cache,
+    timed,
+)
+from src.profiling import config_dict, configure, list_profiles, profiled
+from src.puzzle_store import get_puzzle_store
+from src.settings import settings
+
+# Stored puzzles are immutable (content-hashed ids)
+PUZZLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+WIRE_ETAG_SUFFIXES = {
+    JSON_MEDIA_TYPE: "",
+    COMPACT_MEDIA_TYPE: "-compact",
+    MSGPACK_MEDIA_TYPE: "-msgpack",
+}
 
 _chat_services = {}
 _clue_generators = {}
+_grid_executor: Optional[ProcessPoolExecutor] = None
 
 
 def get_chat_service(model: str) -> ChatService:
+    record_cache("chat_service", model in _chat_services)
     if model not in _chat_services:
         _chat_services[model] = ChatService(model=model)
     return _chat_services[model]
 
 
 def get_clue_generator(model: str) -> ClueGenerator:
+    record_cache("clue_generator", model in _clue_generators)
     if model not in _clue_generators:
         _clue_generators[model] = ClueGenerator(model=model)
     return _clue_generators[model]
 
 
+def _llm_error_response(e: Exception) -> Optional[HTTPException]:
+    """Map expected LLM pipeline errors to HTTP errors; None for anything else."""
+    if isinstance(e, HTTPException):
+        return e
+    if isinstance(e, SchedulerOverloadedError):
+        return HTTPException(
+            status_code=429,
+            detail=f"Server busy: {str(e)}",
+            headers={"Retry-After": "5"},
+        )
+    if isinstance(e, LLMUnavailableError):
+        return HTTPException(
+            status_code=503,
+            detail=f"Upstream model unavailable: {str(e)}",
+            headers={"Retry-After": "30"},
+        )
+    if isinstance(e, TokenBudgetExceededError):
+        return HTTPException(status_code=400, detail=str(e))
+    return None
+
+
 async def health_check():
     return {"status": "healthy"}
 
 
+@profiled("http.generate_clues")
 async def generate_clues(request: GenerateCluesRequest):
     try:
         clue_generator = get_clue_generator(request.model)
-        result = clue_generator.generate_clues(
-            topic_str=request.topic_str,
-            difficulty=request.difficulty,
-            num_clues=request.num_clues,
-        )
+        with usage_scope("clues", token_budget=request.token_budget):
+            result = await run_in_threadpool(
+                clue_generator.generate_clues,
+                topic_str=request.topic_str,
+                difficulty=request.difficulty,
+                num_clues=request.num_clues,
+            )
         if not result:
             raise HTTPException(status_code=500, detail="Failed to generate clues")
         return result
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error generating clues: {str(e)}")
-
+        raise _llm_error_response(e) or HTTPException(
+            status_code=500, detail=f"Error generating clues: {str(e)}"
+        )
 
-async def generate_crossword(request: GenerateCrosswordRequest):
-    try:
-        if not request.clues:
-            raise HTTPException(status_code=400, detail="No clues provided")
 
-        crossword_generator = CrosswordGenerator(clues=request.clues)
-        grid_df, placements = crossword_generator.generate()
-        grid = grid_df.values.tolist()
+def _build_crossword(clues: list[CrosswordClue]) -> GenerateCrosswordResponse:
+    crossword_generator = CrosswordGenerator(clues=clues)
+    grid, placements = crossword_generator.generate_grid()
+    with timed("serialization"):
         placements_dict = []
         for p in placements:
             placements_dict.append(
@@ -66,38 +146,455 @@ async def generate_crossword(request: GenerateCrosswordRequest):
                     "clue": p.clue,
                 }
             )
-
         return GenerateCrosswordResponse(grid=grid, placements=placements_dict)
+
+
+@profiled("http.generate_crossword")
+async def generate_crossword(request: GenerateCrosswordRequest):
+    try:
+        if not request.clues:
+            raise HTTPException(status_code=400, detail="No clues provided")
+
+        crossword = _build_crossword(request.clues)
+        crossword.puzzle_id = _store_puzzle(request.clues, crossword)
+        return crossword
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Error generating crossword: {str(e)}"
         )
 
 
-async def generate_chat_response(request: ChatRequest):
+def _store_puzzle(
+    clues: list[CrosswordClue],
+    crossword: GenerateCrosswordResponse,
+    request: Optional[GeneratePuzzleRequest] = None,
+    source: str = "api",
+) -> Optional[str]:
+    """Persist a generated puzzle; storage problems never fail the generation."""
     try:
-        chat_service = get_chat_service(request.model)
+        return get_puzzle_store().save(
+            clues,
+            crossword.grid,
+            crossword.placements,
+            topic=request.topic_str if request else None,
+            difficulty=request.difficulty if request else None,
+            model=request.model if request else None,
+            source=source,
+        )
+    except sqlite3.Error as e:
+        logging.warning(f"Could not store puzzle: {e}")
+        return None
 
-        if request.clue:
-            response = chat_service.generate_response(
-                user_input=request.user_input,
-                clue=request.clue,
-                type=request.chat_type,
-                historical_messages=request.historical_messages,
+
+def _generate_puzzle_clues(
+    request: GeneratePuzzleRequest, endpoint: str
+) -> list[CrosswordClue]:
+    with usage_scope(endpoint, token_budget=request.token_budget):
+        clue_response = get_clue_generator(request.model).generate_clues(
+            topic_str=request.topic_str,
+            difficulty=request.difficulty,
+            num_clues=request.num_clues,
+        )
+    if not clue_response or not clue_response.clues:
+        raise HTTPException(status_code=500, detail="Failed to generate clues")
+    return clue_response.clues
+
+
+def _build_fit_driven_puzzle(
+    request: GeneratePuzzleRequest,
+    endpoint: str,
+    source: str,
+    report: Optional[ProgressCallback] = None,
+) -> GeneratePuzzleResponse:
+    # numpy-backed; only loaded on the fit-driven path
+    from src.crossword.answer_index import get_answer_index
+
+    builder = FitDrivenPuzzleBuilder(
+        get_clue_generator(request.model), answer_index=get_answer_index()
+    )
+    with usage_scope(endpoint, token_budget=request.token_budget):
+        result = builder.build(
+            topic_str=request.topic_str,
+            difficulty=request.difficulty,
+            num_clues=request.num_clues,
+            report=report,
+        )
+    crossword = GenerateCrosswordResponse(
+        grid=result.grid, placements=[asdict(p) for p in result.placements]
+    )
+    return GeneratePuzzleResponse(
+        clues=result.clues,
+        grid=crossword.grid,
+        placements=crossword.placements,
+        puzzle_id=_store_puzzle(result.clues, crossword, request, source=source),
+        fit_stats=result.stats,
+    )
+
+
+@profiled("job.puzzle")
+def _run_puzzle_job(
+    request: GeneratePuzzleRequest, report: ProgressCallback
+) -> GeneratePuzzleResponse:
+    """Generate clues, then the grid, reporting progress between the stages."""
+    if request.fit_driven:
+        return _build_fit_driven_puzzle(request, "puzzle_job", "job", report)
+
+    report("generating_clues", 0.1)
+    clues = _generate_puzzle_clues(request, "puzzle_job")
+
+    report("generating_crossword", 0.8)
+    crossword = _build_crossword(clues)
+    return GeneratePuzzleResponse(
+        clues=clues,
+        grid=crossword.grid,
+        placements=crossword.placements,
+        puzzle_id=_store_puzzle(clues, crossword, request, source="job"),
+    )
+
+
+def get_grid_executor() -> ProcessPoolExecutor:
+    """Worker processes for grid building, which is CPU-bound and holds the GIL."""
+    global _grid_executor
+    if _grid_executor is None:
+        # Forking a process that is already running threads can copy a held lock
+        # into the child; forkserver children start from a clean process
+        _grid_executor = ProcessPoolExecutor(
+            max_workers=settings.grid_workers,
+            mp_context=multiprocessing.get_context("forkserver"),
+        )
+    return _grid_executor
+
+
+def shutdown_grid_executor() -> None:
+    global _grid_executor
+    if _grid_executor is not None:
+        _grid_executor.shutdown(cancel_futures=True)
+        _grid_executor = None
+
+
+async def _generate_batch_item(
+    index: int, request: GeneratePuzzleRequest, semaphore: asyncio.Semaphore
+) -> PuzzleBatchItem:
+    try:
+        if request.fit_driven:
+            # Interleaves LLM calls with grid fitting, so it runs in one thread
+            async with semaphore:
+                puzzle = await run_in_threadpool(
+                    _build_fit_driven_puzzle, request, "puzzle_batch", "batch"
+                )
+            return PuzzleBatchItem(index=index, status="completed", puzzle=puzzle)
+
+        # The semaphore bounds threadpool use; the LLM scheduler still enforces
+        # per-model concurrency and rate limits across all callers
+        async with semaphore:
+            clues = await run_in_threadpool(
+                _generate_puzzle_clues, request, "puzzle_batch"
             )
-        else:
-            response = chat_service.generate_research_response(
-                user_input=request.user_input,
-                historical_messages=request.historical_messages,
+        crossword = await asyncio.get_running_loop().run_in_executor(
+            get_grid_executor(), _build_crossword, clues
+        )
+        puzzle_id = await run_in_threadpool(
+            _store_puzzle, clues, crossword, request, "batch"
+        )
+        return PuzzleBatchItem(
+            index=index,
+            status="completed",
+            puzzle=GeneratePuzzleResponse(
+                clues=clues,
+                grid=crossword.grid,
+                placements=crossword.placements,
+                puzzle_id=puzzle_id,
+            ),
+        )
+    except Exception as e:
+        error = _llm_error_response(e)
+        return PuzzleBatchItem(
+            index=index,
+            status="failed",
+            error=str(error.detail if error else e),
+            error_status_code=error.status_code if error else 500,
+        )
+
+
+async def generate_puzzle_batch(request: GeneratePuzzleBatchRequest):
+    """Generate many puzzles concurrently, streaming each as an NDJSON line when done."""
+
+    async def lines():
+        semaphore = asyncio.Semaphore(settings.batch_concurrency)
+        tasks = [
+            asyncio.create_task(_generate_batch_item(index, spec, semaphore))
+            for index, spec in enumerate(request.puzzles)
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                item = await next_done
+                yield item.model_dump_json() + "\n"
+        finally:
+            # Client went away: stop any puzzles that haven't started yet
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+def _job_response(job: Job) -> JobResponse:
+    return JobResponse(
+        job_id=job.id,
+        status=job.status.value,
+        stage=job.stage,
+        progress=job.progress,
+        created_at=job.created_at,
+        updated_at=job.updated_at,
+        finished_at=job.finished_at,
+        error=job.error,
+        result=job.result,
+    )
+
+
+def _get_job_or_404(job_id: str) -> Job:
+    job = get_job_manager().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job
+
+
+async def create_puzzle_job(request: GeneratePuzzleRequest):
+    job = get_job_manager().submit(_run_puzzle_job, request)
+    return JobCreatedResponse(
+        job_id=job.id, status=job.status.value, status_url=f"/api/jobs/{job.id}"
+    )
+
+
+async def get_job(job_id: str):
+    return _job_response(_get_job_or_404(job_id))
+
+
+async def wait_for_job(job_id: str, timeout: float = 25.0):
+    """Long-poll: return as soon as the job finishes, or its current state after `timeout`."""
+    job = _get_job_or_404(job_id)
+    deadline = time.monotonic() + min(max(timeout, 0.0), 60.0)
+    while not job.done and time.monotonic() < deadline:
+        await asyncio.sleep(0.25)
+        job = await run_in_threadpool(get_job_manager().get, job_id) or job
+    return _job_response(job)
+
+
+async def _job_updates(job: Job) -> AsyncIterator[Tuple[str, JobResponse]]:
+    """("progress", state) on every change of `job`, then ("complete", state)."""
+    last_update = None
+    while True:
+        if job.updated_at != last_update:
+            last_update = job.updated_at
+            yield ("complete" if job.done else "progress"), _job_response(job)
+            if job.done:
+                return
+        await asyncio.sleep(0.25)
+        # Re-read: the job may be running in another worker process
+        job = await run_in_threadpool(get_job_manager().get, job.id) or job
+
+
+async def stream_job_events(job_id: str):
+    """Server-sent events: a `progress` event on every change, then `complete`."""
+    job = _get_job_or_404(job_id)
+
+    async def events():
+        async for event, response in _job_updates(job):
+            yield f"event: {event}\ndata: {response.model_dump_json()}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+    )
+
+
+async def get_puzzle(
+    puzzle_id: str, request: Request, solution: bool = Query(default=True)
+):
+    """
+    Serve a stored puzzle. Ids are content hashes, so a puzzle never changes:
+    the id doubles as a strong ETag and responses are cacheable forever.
+
+    With `solution=false` letters and answers are left out (placements carry the
+    answer length instead); check fills with POST /api/puzzles/{id}/verify.
+    """
+    # One ETag per representation: blank or not, and per negotiated wire format
+    media_type = negotiate(request.headers.get("accept", ""))
+    variant = ("" if solution else "-blank") + WIRE_ETAG_SUFFIXES[media_type]
+    etag = f'"{puzzle_id}{variant}"'
+    headers = {"ETag": etag, "Cache-Control": PUZZLE_CACHE_CONTROL}
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+
+    puzzle = await run_in_threadpool(get_puzzle_store().get, puzzle_id)
+    if puzzle is None:
+        raise HTTPException(status_code=404, detail=f"Puzzle {puzzle_id} not found")
+    grid, placements, clues = puzzle.grid, puzzle.placements, puzzle.clues
+    if not solution:
+        from src.crossword.verification import strip_solution
+
+        grid, placements = strip_solution(grid, placements)
+        clues = []
+    body = StoredPuzzleResponse(
+        puzzle_id=puzzle.id,
+        clues=clues,
+        grid=grid,
+        placements=placements,
+        topic=puzzle.topic,
+        difficulty=puzzle.difficulty,
+        model=puzzle.model,
+        created_at=puzzle.created_at,
+    )
+    return NegotiatedResponse(content=body.model_dump(), headers=headers)
+
+
+@lru_cache(maxsize=256)
+def _solution_mask(puzzle_id: str):
+    """Solution arrays of a stored puzzle; immutable, so cached per id."""
+    # numpy-backed; only loaded once answers are checked
+    from src.crossword.verification import SolutionMask
+
+    puzzle = get_puzzle_store().get(puzzle_id)
+    if puzzle is None:
+        # Raised rather than returned so unknown ids aren't cached
+        raise KeyError(puzzle_id)
+    return SolutionMask(puzzle.grid, puzzle.placements)
+
+
+async def verify_puzzle(puzzle_id: str, request: VerifyPuzzleRequest):
+    """Check a player's fill against the stored solution, per placement (and cell)."""
+    if (request.fill is None) == (request.cells is None):
+        raise HTTPException(
+            status_code=422, detail="Provide exactly one of `fill` or `cells`"
+        )
+    try:
+        mask = await run_in_threadpool(_solution_mask, puzzle_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Puzzle {puzzle_id} not found")
+
+    try:
+        entries = (
+            mask.parse_fill(request.fill)
+            if request.fill is not None
+            else mask.parse_cells(request.cells)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    with timed("verify_puzzle", cells=mask.size):
+        verification = mask.verify(entries, per_cell=request.per_cell)
+
+    return VerifyPuzzleResponse(
+        puzzle_id=puzzle_id,
+        placements=[
+            PlacementVerdict(row=row, col=col, direction=direction, status=status)
+            for (row, col, direction), status in zip(mask.slots, verification.statuses)
+        ],
+        solved=verification.solved,
+        total=len(verification.statuses),
+        cells=verification.cells,
+    )
+
+
+async def list_puzzles(
+    response: Response,
+    topic: Optional[str] = None,
+    difficulty: Optional[str] = None,
+    limit: int = Query(default=20, ge=1, le=100),
+):
+    puzzles = await run_in_threadpool(
+        get_puzzle_store().find, topic=topic, difficulty=difficulty, limit=limit
+    )
+    # New puzzles appear over time, so the listing is only briefly cacheable
+    response.headers["Cache-Control"] = "public, max-age=60"
+    return PuzzleListResponse(
+        puzzles=[
+            PuzzleSummary(
+                puzzle_id=p.id,
+                topic=p.topic,
+                difficulty=p.difficulty,
+                num_clues=len(p.clues),
+                created_at=p.created_at,
             )
+            for p in puzzles
+        ]
+    )
+
+
+@profiled("http.generate_chat_response")
+async def generate_chat_response(request: ChatRequest):
+    try:
+        chat_service = get_chat_service(request.model)
+
+        with usage_scope(
+            "chat", session_id=request.session_id, token_budget=request.token_budget
+        ):
+            if request.clue:
+                response = await run_in_threadpool(
+                    chat_service.generate_response,
+                    user_input=request.user_input,
+                    clue=request.clue,
+                    type=request.chat_type,
+                    historical_messages=request.historical_messages,
+                )
+            else:
+                response = await run_in_threadpool(
+                    chat_service.generate_research_response,
+                    user_input=request.user_input,
+                    historical_messages=request.historical_messages,
+                )
 
         return ChatResponse(response=response)
     except Exception as e:
-        raise HTTPException(
+        raise _llm_error_response(e) or HTTPException(
             status_code=500, detail=f"Error generating chat response: {str(e)}"
         )
 
 
+async def get_metrics():
+    scheduler = get_scheduler()
+    LLM_QUEUE_DEPTH.set(scheduler.queue_depth())
+    for model, in_flight in scheduler.in_flight().items():
+        LLM_IN_FLIGHT.set(in_flight, model=model)
+    return PlainTextResponse(
+        REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+async def get_usage(group_by: str = "model"):
+    try:
+        return get_usage_tracker().summary(group_by=group_by)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _require_admin(token: Optional[str]) -> None:
+    if not settings.admin_token:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled")
+    if token != settings.admin_token:
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+
+def _profiling_status() -> ProfilingStatusResponse:
+    return ProfilingStatusResponse(**config_dict(), profiles=list_profiles())
+
+
+async def get_profiling(x_admin_token: Optional[str] = Header(default=None)):
+    _require_admin(x_admin_token)
+    return _profiling_status()
+
+
+async def update_profiling(
+    request: ProfilingUpdateRequest,
+    x_admin_token: Optional[str] = Header(default=None),
+):
+    """Turn profiling on/off or switch mode without restarting the server."""
+    _require_admin(x_admin_token)
+    configure(enabled=request.enabled, mode=request.mode, interval=request.interval)
+    return _profiling_status()
+
+
 async def get_available_models():
     return {"models": get_cached_claude_models()}
 
@@ -0,0 +1,139 @@
+import json
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, fields
+from enum import Enum
+from typing import Any, Callable, Optional
+
+from src.settings import settings
+from src.shared_state import StateBackend, get_state_backend
+
+
+class JobStatus(str, Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+# Callback handed to job functions so they can report (stage, progress in [0, 1])
+ProgressCallback = Callable[[str, float], None]
+
+
+@dataclass
+class Job:
+    id: str
+    status: JobStatus = JobStatus.PENDING
+    stage: str = "queued"
+    progress: float = 0.0
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    error_status_code: Optional[int] = None
+    created_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in (JobStatus.COMPLETED, JobStatus.FAILED)
+
+    def to_json(self) -> str:
+        data = {f.name: getattr(self, f.name) for f in fields(self)}
+        data["status"] = self.status.value
+        if hasattr(self.result, "model_dump"):
+            data["result"] = self.result.model_dump(mode="json")
+        return json.dumps(data)
+
+    @classmethod
+    def from_json(cls, text: str) -> "Job":
+        data = json.loads(text)
+        data["status"] = JobStatus(data["status"])
+        return cls(**data)
+
+
+class JobManager:
+    """
+    Runs long jobs (clue + puzzle generation) on a background worker pool and
+    writes their state to the shared state backend, so clients can poll for
+    progress through any API worker. Job records expire `result_ttl` seconds
+    after their last update.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = settings.job_workers,
+        result_ttl: float = settings.job_result_ttl,
+        backend: Optional[StateBackend] = None,
+    ):
+        self.result_ttl = result_ttl
+        self.backend = backend or get_state_backend()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="job-worker"
+        )
+        self._lock = threading.Lock()
+
+    def submit(self, fn: Callable[..., Any], *args, **kwargs) -> Job:
+        """Queue `fn(*args, report=..., **kwargs)` and return its job immediately."""
+        job = Job(id=uuid.uuid4().hex)
+        self._save(job)
+        self._executor.submit(self._run, job, fn, args, kwargs)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Latest state of a job, whichever worker process runs it."""
+        text = self.backend.get(_job_key(job_id))
+        return Job.from_json(text) if text is not None else None
+
+    def _save(self, job: Job) -> None:
+        self.backend.set(_job_key(job.id), job.to_json(), ttl=self.result_ttl)
+
+    def _update(self, job: Job, **changes) -> None:
+        with self._lock:
+            for key, value in changes.items():
+                setattr(job, key, value)
+            job.updated_at = time.time()
+        self._save(job)
+
+    def _run(self, job: Job, fn: Callable[..., Any], args, kwargs) -> None:
+        self._update(job, status=JobStatus.RUNNING, stage="started")
+
+        def report(stage: str, progress: float) -> None:
+            self._update(job, stage=stage, progress=max(0.0, min(1.0, progress)))
+
+        try:
+            result = fn(*args, report=report, **kwargs)
+            self._update(
+                job,
+                status=JobStatus.COMPLETED,
+                stage="done",
+                progress=1.0,
+                result=result,
+                finished_at=time.time(),
+            )
+        except Exception as e:
+            logging.exception(f"Job {job.id} failed")
+            self._update(
+                job,
+                status=JobStatus.FAILED,
+                error=str(getattr(e, "detail", e)),
+                error_status_code=getattr(e, "status_code", None),
+                finished_at=time.time(),
+            )
+
+
+def _job_key(job_id: str) -> str:
+    return f"atb:job:{job_id}"
+
+
+_JOB_MANAGER = None
+
+
+def get_job_manager() -> JobManager:
+    """Get the process-wide job manager, creating it on first use."""
+    global _JOB_MANAGER
+    if _JOB_MANAGER is None:
+        _JOB_MANAGER = JobManager()
+    return _JOB_MANAGER
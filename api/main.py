@@ -1,13 +1,37 @@
-import uvicorn
-from fastapi import FastAPI
+import asyncio
+import contextlib
+import time
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 
+from api.constants import refresh_claude_models_periodically
+from api.controllers import shutdown_grid_executor
 from api.routes import router
+from api.wire import CompressionMiddleware, NegotiatedResponse, WireFormatMiddleware
+from src.metrics import HTTP_REQUEST_DURATION, HTTP_REQUESTS_IN_FLIGHT
+from src.settings import settings
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Model discovery runs in the background so startup never waits on the network
+    refresh_task = asyncio.create_task(refresh_claude_models_periodically())
+    yield
+    refresh_task.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await refresh_task
+    shutdown_grid_executor()
+
 
 app = FastAPI(
     title="Across the Board API",
     description="API for crossword generation and chat services",
     version="1.0.0",
+    lifespan=lifespan,
+    # orjson-backed JSON, or the compact/msgpack crossword format on request
+    default_response_class=NegotiatedResponse,
 )
 
 # Add CORS middleware to allow Streamlit and React apps to access the API
@@ -26,10 +50,38 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(WireFormatMiddleware)
+app.add_middleware(
+    CompressionMiddleware, minimum_size=settings.compression_minimum_size
+)
+
 app.include_router(router)
 
 
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    HTTP_REQUESTS_IN_FLIGHT.inc(method=request.method)
+    started_at = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        HTTP_REQUESTS_IN_FLIGHT.dec(method=request.method)
+        # Label by route template (not raw path) to keep job IDs out of the labels
+        route = request.scope.get("route")
+        HTTP_REQUEST_DURATION.observe(
+            time.perf_counter() - started_at,
+            method=request.method,
+            route=getattr(route, "path", "unmatched"),
+            status=status,
+        )
+
+
 if __name__ == "__main__":
+    import uvicorn
+
     uvicorn.run(
         "api.main:app", host="0.0.0.0", port=8000, reload=True, log_level="info"
     )
@@ -1,16 +1,19 @@
-from typing import List, Optional
+from typing import List, Literal, Optional, Tuple
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from api.constants import get_cached_claude_models
 from src.crossword.clue_generator import CrosswordClue
+from src.settings import settings
 
 
 class GenerateCluesRequest(BaseModel):
     topic_str: Optional[str] = None
     difficulty: Optional[str] = None
     num_clues: Optional[int] = 30
-    model: str = get_cached_claude_models()[0]
+    model: str = Field(default_factory=lambda: get_cached_claude_models()[0])
+    # Optional cap on input + output tokens spent by this request
+    token_budget: Optional[int] = Field(default=None, gt=0)
 
 
 class GenerateCrosswordRequest(BaseModel):
@@ -20,6 +23,103 @@ class GenerateCrosswordRequest(BaseModel):
 class GenerateCrosswordResponse(BaseModel):
     grid: List[List[str]]
     placements: List[dict]  # Will contain Placement data as dicts
+    # Content hash under which the puzzle was stored; GET /api/puzzles/{puzzle_id}
+    puzzle_id: Optional[str] = None
+
+
+class GeneratePuzzleRequest(GenerateCluesRequest):
+    """Clue generation options; the job also builds the crossword grid."""
+
+    # Over-generate clues and keep the subset that fills the grid best, topping
+    # up with pattern-targeted clues (more LLM calls, denser puzzles)
+    fit_driven: bool = False
+
+
+class GeneratePuzzleResponse(GenerateCrosswordResponse):
+    clues: List[CrosswordClue]
+    # Calls, candidates, placed words and fill of a fit-driven build
+    fit_stats: Optional[dict] = None
+
+
+class StoredPuzzleResponse(GeneratePuzzleResponse):
+    topic: Optional[str] = None
+    difficulty: Optional[str] = None
+    model: Optional[str] = None
+    created_at: float
+
+
+class PuzzleSummary(BaseModel):
+    puzzle_id: str
+    topic: Optional[str] = None
+    difficulty: Optional[str] = None
+    num_clues: int
+    created_at: float
+
+
+class PuzzleListResponse(BaseModel):
+    puzzles: List[PuzzleSummary]
+
+
+class VerifyPuzzleRequest(BaseModel):
+    """
+    A player's fill: either `fill`, the grid row-major as one string (any
+    non-letter is an empty cell), or sparse `cells` of (row, col, letter).
+    """
+
+    fill: Optional[str] = None
+    cells: Optional[List[Tuple[int, int, str]]] = None
+    # Also return one result character per cell
+    per_cell: bool = False
+
+
+class PlacementVerdict(BaseModel):
+    row: int
+    col: int
+    direction: Literal["across", "down"]
+    status: Literal["correct", "incorrect", "incomplete"]
+
+
+class VerifyPuzzleResponse(BaseModel):
+    puzzle_id: str
+    placements: List[PlacementVerdict]
+    solved: int
+    total: int
+    # Row-major, one per cell: "+" correct, "x" wrong, "." empty, "#" block
+    cells: Optional[str] = None
+
+
+class GeneratePuzzleBatchRequest(BaseModel):
+    puzzles: List[GeneratePuzzleRequest] = Field(
+        min_length=1, max_length=settings.batch_max_puzzles
+    )
+
+
+class PuzzleBatchItem(BaseModel):
+    """One NDJSON line of a batch response, emitted as soon as that puzzle is done."""
+
+    index: int
+    status: Literal["completed", "failed"]
+    puzzle: Optional[GeneratePuzzleResponse] = None
+    error: Optional[str] = None
+    error_status_code: Optional[int] = None
+
+
+class JobCreatedResponse(BaseModel):
+    job_id: str
+    status: str
+    status_url: str
+
+
+class JobResponse(BaseModel):
+    job_id: str
+    status: str
+    stage: str
+    progress: float
+    created_at: float
+    updated_at: float
+    finished_at: Optional[float] = None
+    error: Optional[str] = None
+    result: Optional[GeneratePuzzleResponse] = None
 
 
 class ChatRequest(BaseModel):
@@ -27,8 +127,30 @@ class ChatRequest(BaseModel):
     clue: Optional[CrosswordClue] = None
     chat_type: str
     historical_messages: List[dict] = []
-    model: str = get_cached_claude_models()[0]
+    model: str = Field(default_factory=lambda: get_cached_claude_models()[0])
+    session_id: Optional[str] = None
+    token_budget: Optional[int] = Field(default=None, gt=0)
 
 
 class ChatResponse(BaseModel):
     response: str
+
+
+class ProfilingUpdateRequest(BaseModel):
+    enabled: Optional[bool] = None
+    mode: Optional[Literal["sampling", "deterministic"]] = None
+    interval: Optional[float] = Field(default=None, gt=0)
+
+
+class ProfileDump(BaseModel):
+    path: str
+    bytes: int
+    modified: float
+
+
+class ProfilingStatusResponse(BaseModel):
+    enabled: bool
+    mode: str
+    directory: str
+    interval: float
+    profiles: List[ProfileDump]
@@ -0,0 +1,301 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from fastapi import HTTPException, WebSocket, WebSocketDisconnect
+from fastapi.encoders import jsonable_encoder
+from pydantic import ValidationError
+
+from api.controllers import (
+    _job_updates,
+    _llm_error_response,
+    _run_puzzle_job,
+    get_chat_service,
+    verify_puzzle,
+)
+from api.jobs import Job, get_job_manager
+from api.models import ChatRequest, GeneratePuzzleRequest, VerifyPuzzleRequest
+from src.llm.usage import usage_scope
+from src.metrics import WS_CONNECTIONS, WS_FRAMES
+from src.settings import settings
+
+# Close codes: heartbeat missed (1001 "going away"), unexpected server error
+CLOSE_IDLE = 1001
+CLOSE_ERROR = 1011
+
+Handler = Callable[[str, dict], Awaitable[None]]
+
+
+class PlaySession:
+    """
+    One play connection: streaming chat, puzzle job progress and answer checks
+    multiplexed over a single WebSocket as JSON frames.
+
+    Client frames are `{"type", "id", ...}`, where `id` is chosen by the client
+    and echoed on every frame answering that request:
+
+        chat      ChatRequest fields      -> chat.token*, chat.done
+        generate  GeneratePuzzleRequest   -> job.progress*, job.complete
+        watch     {"job_id"}              -> job.progress*, job.complete
+        verify    {"puzzle_id", ...VerifyPuzzleRequest}  -> verify.result
+        cancel    {"id"} of a running request            -> cancelled
+        ping / pong                       -> pong / (nothing)
+
+    Failures answer with `{"type": "error", "id", "status_code", "detail"}`,
+    using the status codes of the equivalent HTTP endpoints.
+
+    Outbound frames go through a bounded queue drained by one sender task. Chat
+    tokens and results wait for room, so a slow client slows its LLM stream
+    down instead of growing the buffer; progress frames and server pings are
+    dropped when the queue is full, since the next one supersedes them. The
+    server pings every `ws_heartbeat_interval` seconds and closes connections
+    that send nothing for `ws_idle_timeout` seconds.
+    """
+
+    def __init__(self, websocket: WebSocket, session_id: str):
+        self.websocket = websocket
+        self.session_id = session_id
+        self._outbox: asyncio.Queue = asyncio.Queue(maxsize=settings.ws_send_queue_size)
+        self._requests: Dict[str, asyncio.Task] = {}
+        self._handlers: Dict[str, Handler] = {
+            "chat": self._chat,
+            "generate": self._generate,
+            "watch": self._watch,
+            "verify": self._verify,
+        }
+
+    async def run(self) -> None:
+        await self.websocket.accept()
+        WS_CONNECTIONS.inc()
+        sender = asyncio.create_task(self._send_loop())
+        heartbeat = asyncio.create_task(self._heartbeat())
+        close_code = None
+        try:
+            close_code = await self._receive_loop()
+        except WebSocketDisconnect:
+            pass
+        except Exception:
+            logging.exception(f"Play session {self.session_id} failed")
+            close_code = CLOSE_ERROR
+        finally:
+            WS_CONNECTIONS.dec()
+            tasks = [heartbeat, *self._requests.values(), sender]
+            for task in tasks:
+                task.cancel()
+            await asyncio.wait(tasks)
+        if close_code is not None:
+            await self.websocket.close(code=close_code)
+
+    async def send(self, frame: dict) -> None:
+        """Queue a frame, waiting while the outbox is full."""
+        await self._outbox.put(frame)
+
+    def send_nowait(self, frame: dict) -> bool:
+        """Queue a frame unless the outbox is full; returns whether it was queued."""
+        try:
+            self._outbox.put_nowait(frame)
+            return True
+        except asyncio.QueueFull:
+            WS_FRAMES.inc(direction="dropped", type=frame["type"])
+            return False
+
+    async def _send_loop(self) -> None:
+        while True:
+            frame = await self._outbox.get()
+            await self.websocket.send_text(json.dumps(frame, separators=(",", ":")))
+            WS_FRAMES.inc(direction="out", type=frame["type"])
+
+    async def _heartbeat(self) -> None:
+        while True:
+            await asyncio.sleep(settings.ws_heartbeat_interval)
+            self.send_nowait({"type": "ping", "ts": time.time()})
+
+    async def _receive_loop(self) -> int:
+        """Dispatch client frames until disconnect; returns a close code on timeout."""
+        while True:
+            try:
+                message = await asyncio.wait_for(
+                    self.websocket.receive(), timeout=settings.ws_idle_timeout
+                )
+            except asyncio.TimeoutError:
+                logging.info(f"Play session {self.session_id} idle; closing")
+                return CLOSE_IDLE
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+
+            try:
+                frame = json.loads(message.get("text") or message.get("bytes") or b"")
+                kind = frame["type"]
+                if not isinstance(kind, str):
+                    raise TypeError(kind)
+            except (ValueError, KeyError, TypeError):
+                await self._error(
+                    None, 400, "Frames must be JSON objects with a `type`"
+                )
+                continue
+            WS_FRAMES.inc(direction="in", type=kind)
+            await self._dispatch(kind, frame)
+
+    async def _dispatch(self, kind: str, frame: dict) -> None:
+        request_id = frame.get("id")
+        if kind == "pong":
+            return
+        if kind == "ping":
+            self.send_nowait({"type": "pong", "ts": frame.get("ts")})
+            return
+        if kind == "cancel":
+            task = self._requests.pop(str(request_id), None)
+            if task is not None:
+                task.cancel()
+                await self.send({"type": "cancelled", "id": request_id})
+            return
+
+        handler = self._handlers.get(kind)
+        if handler is None:
+            await self._error(request_id, 400, f"Unknown frame type {kind!r}")
+        elif not isinstance(request_id, str) or not request_id:
+            await self._error(request_id, 400, f"`{kind}` frames need a string `id`")
+        elif request_id in self._requests:
+            await self._error(
+                request_id, 409, f"Request {request_id} is already running"
+            )
+        elif len(self._requests) >= settings.ws_max_in_flight:
+            await self._error(
+                request_id,
+                429,
+                f"At most {settings.ws_max_in_flight} requests may run at once",
+            )
+        else:
+            self._requests[request_id] = asyncio.create_task(
+                self._run_request(request_id, handler, frame)
+            )
+
+    async def _run_request(
+        self, request_id: str, handler: Handler, frame: dict
+    ) -> None:
+        try:
+            await handler(request_id, frame)
+        except ValidationError as e:
+            await self._error(request_id, 422, e.errors(include_url=False))
+        except Exception as e:
+            error = _llm_error_response(e)
+            if error is None:
+                logging.exception(f"Play request {frame['type']} failed")
+                error = HTTPException(
+                    status_code=500, detail=f"Error handling {frame['type']}: {str(e)}"
+                )
+            await self._error(request_id, error.status_code, error.detail)
+        finally:
+            if self._requests.get(request_id) is asyncio.current_task():
+                del self._requests[request_id]
+
+    async def _error(
+        self, request_id: Optional[str], status_code: int, detail: Any
+    ) -> None:
+        await self.send(
+            {
+                "type": "error",
+                "id": request_id,
+                "status_code": status_code,
+                "detail": jsonable_encoder(detail),
+            }
+        )
+
+    async def _chat(self, request_id: str, frame: dict) -> None:
+        request = ChatRequest.model_validate({**frame, "session_id": self.session_id})
+        chat_service = get_chat_service(request.model)
+        loop = asyncio.get_running_loop()
+        stop = threading.Event()
+
+        def stream() -> str:
+            chunks = []
+            with usage_scope(
+                "chat", session_id=request.session_id, token_budget=request.token_budget
+            ):
+                tokens = chat_service.stream_response(
+                    user_input=request.user_input,
+                    clue=request.clue,
+                    type=request.chat_type,
+                    historical_messages=request.historical_messages,
+                )
+                try:
+                    for text in tokens:
+                        chunks.append(text)
+                        token = {"type": "chat.token", "id": request_id, "text": text}
+                        if not self._send_from_thread(token, loop, stop):
+                            break
+                finally:
+                    tokens.close()
+            return "".join(chunks)
+
+        try:
+            # Not run_in_threadpool: that defers cancellation until the worker
+            # returns, and a worker blocked on a full outbox never would
+            response = await loop.run_in_executor(None, stream)
+        finally:
+            # Releases the worker (and its scheduler slot) if this task was cancelled
+            stop.set()
+        await self.send({"type": "chat.done", "id": request_id, "response": response})
+
+    def _send_from_thread(
+        self, frame: dict, loop: asyncio.AbstractEventLoop, stop: threading.Event
+    ) -> bool:
+        """`send` from a worker thread, blocking while the outbox is full; False once stopped."""
+        future = asyncio.run_coroutine_threadsafe(self.send(frame), loop)
+        while not stop.is_set():
+            try:
+                future.result(timeout=0.5)
+                return True
+            except TimeoutError:
+                continue
+        future.cancel()
+        return False
+
+    async def _generate(self, request_id: str, frame: dict) -> None:
+        request = GeneratePuzzleRequest.model_validate(frame)
+        await self._follow_job(
+            request_id, get_job_manager().submit(_run_puzzle_job, request)
+        )
+
+    async def _watch(self, request_id: str, frame: dict) -> None:
+        job = get_job_manager().get(str(frame.get("job_id")))
+        if job is None:
+            raise HTTPException(
+                status_code=404, detail=f"Job {frame.get('job_id')} not found"
+            )
+        await self._follow_job(request_id, job)
+
+    async def _follow_job(self, request_id: str, job: Job) -> None:
+        async for event, response in _job_updates(job):
+            update = {
+                "type": f"job.{event}",
+                "id": request_id,
+                "job": response.model_dump(mode="json"),
+            }
+            if event == "progress":
+                self.send_nowait(update)
+            else:
+                await self.send(update)
+
+    async def _verify(self, request_id: str, frame: dict) -> None:
+        puzzle_id = frame.get("puzzle_id")
+        if not isinstance(puzzle_id, str):
+            raise HTTPException(status_code=422, detail="`puzzle_id` is required")
+        result = await verify_puzzle(
+            puzzle_id, VerifyPuzzleRequest.model_validate(frame)
+        )
+        await self.send(
+            {
+                "type": "verify.result",
+                "id": request_id,
+                "result": result.model_dump(mode="json"),
+            }
+        )
+
+
+async def play_socket(websocket: WebSocket, session_id: str):
+    """WebSocket for one play session; see `PlaySession` for the frame protocol."""
+    await PlaySession(websocket, session_id).run()
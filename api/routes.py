@@ -1,28 +1,68 @@
 from fastapi import APIRouter
 
 from api.controllers import (
+    create_puzzle_job,
     generate_chat_response,
     generate_clues,
     generate_crossword,
+    generate_puzzle_batch,
     get_available_models,
     get_chat_types,
     get_difficulty_levels,
+    get_job,
+    get_metrics,
+    get_profiling,
+    get_puzzle,
+    get_usage,
     health_check,
+    list_puzzles,
+    stream_job_events,
+    update_profiling,
+    verify_puzzle,
+    wait_for_job,
 )
 from api.models import (
     ChatResponse,
     GenerateCrosswordResponse,
+    JobCreatedResponse,
+    JobResponse,
+    ProfilingStatusResponse,
+    PuzzleListResponse,
+    StoredPuzzleResponse,
+    VerifyPuzzleResponse,
 )
+from api.play import play_socket
 from src.crossword.clue_generator import CrosswordClueResponse
 
 router = APIRouter()
 
 router.get("/health")(health_check)
+router.get("/metrics", include_in_schema=False)(get_metrics)
 router.post("/api/clues/generate", response_model=CrosswordClueResponse)(generate_clues)
 router.post("/api/crossword/generate", response_model=GenerateCrosswordResponse)(
     generate_crossword
 )
+router.post("/api/jobs/puzzle", response_model=JobCreatedResponse, status_code=202)(
+    create_puzzle_job
+)
+router.post("/api/puzzles/batch")(generate_puzzle_batch)
+router.get("/api/puzzles", response_model=PuzzleListResponse)(list_puzzles)
+router.get("/api/puzzles/{puzzle_id}", response_model=StoredPuzzleResponse)(get_puzzle)
+router.post("/api/puzzles/{puzzle_id}/verify", response_model=VerifyPuzzleResponse)(
+    verify_puzzle
+)
+router.get("/api/jobs/{job_id}", response_model=JobResponse)(get_job)
+router.get("/api/jobs/{job_id}/wait", response_model=JobResponse)(wait_for_job)
+router.get("/api/jobs/{job_id}/events")(stream_job_events)
 router.post("/api/chat/generate", response_model=ChatResponse)(generate_chat_response)
+router.get("/api/usage")(get_usage)
+router.websocket("/ws/play/{session_id}")(play_socket)
+router.get("/api/admin/profiling", response_model=ProfilingStatusResponse)(
+    get_profiling
+)
+router.post("/api/admin/profiling", response_model=ProfilingStatusResponse)(
+    update_profiling
+)
 router.get("/api/models")(get_available_models)
 router.get("/api/difficulty-levels")(get_difficulty_levels)
 router.get("/api/chat-types")(get_chat_types)
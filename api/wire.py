@@ -0,0 +1,112 @@
+from contextvars import ContextVar
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.crossword.wire_format import (
+    COMPACT_MEDIA_TYPE,
+    JSON_MEDIA_TYPE,
+    MSGPACK_MEDIA_TYPE,
+    compact,
+)
+
+# Optional speedups: orjson for serialization, msgpack for the binary wire
+# format, brotli-asgi for Brotli compression; each falls back when missing
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+try:
+    from brotli_asgi import BrotliMiddleware
+except ImportError:
+    BrotliMiddleware = None
+
+# Streaming endpoints: compressors buffer chunks, which would hold back lines
+STREAMING_PATHS = ("/api/puzzles/batch",)
+STREAMING_SUFFIXES = ("/events",)
+
+_accept: ContextVar[str] = ContextVar("accept", default="")
+
+
+def negotiate(accept: str) -> str:
+    """Pick the response media type: msgpack, then compact JSON, then JSON."""
+    if msgpack is not None and MSGPACK_MEDIA_TYPE in accept:
+        return MSGPACK_MEDIA_TYPE
+    if COMPACT_MEDIA_TYPE in accept:
+        return COMPACT_MEDIA_TYPE
+    return JSON_MEDIA_TYPE
+
+
+class NegotiatedResponse(JSONResponse):
+    """
+    Default response class: JSON via orjson, or the compact / msgpack wire
+    format when the request's Accept header asks for it.
+    """
+
+    def render(self, content: Any) -> bytes:
+        self.media_type = negotiate(_accept.get())
+        if self.media_type != JSON_MEDIA_TYPE:
+            content = compact(content)
+        if self.media_type == MSGPACK_MEDIA_TYPE:
+            return msgpack.packb(content, use_bin_type=True)
+        if orjson is not None:
+            return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+        return super().render(content)
+
+
+class WireFormatMiddleware:
+    """Expose the Accept header to `NegotiatedResponse` and mark responses `Vary: Accept`."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = _accept.set(Headers(scope=scope).get("accept", ""))
+
+        async def send_with_vary(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).add_vary_header("Accept")
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_vary)
+        finally:
+            _accept.reset(token)
+
+
+class CompressionMiddleware:
+    """
+    Brotli (gzip fallback) when brotli-asgi is installed, else gzip, for
+    buffered responses; streaming endpoints pass through uncompressed.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1000):
+        self.app = app
+        if BrotliMiddleware is not None:
+            self.compressed = BrotliMiddleware(
+                app, quality=4, minimum_size=minimum_size, gzip_fallback=True
+            )
+        else:
+            self.compressed = GZipMiddleware(
+                app, minimum_size=minimum_size, compresslevel=6
+            )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        path = scope.get("path", "")
+        if scope["type"] != "http" or (
+            path in STREAMING_PATHS or path.endswith(STREAMING_SUFFIXES)
+        ):
+            await self.app(scope, receive, send)
+            return
+        await self.compressed(scope, receive, send)
@@ -17,15 +17,22 @@ import CrosswordGrid from '../components/CrosswordGrid';
 import CrosswordClues from '../components/CrosswordClues';
 import ChatInterface from '../components/ChatInterface';
 import { APIClient } from '../lib/api-client';
+import { PlaySocket, withHttpFallback } from '../lib/play-socket';
 import {
   CrosswordGrid as GridType,
   Placement,
   CrosswordClue,
   EMPTY_CELL,
+  PuzzleResult,
+  VerifyPuzzleResponse,
 } from '../lib/types';
 
 export default function Home() {
   const [apiClient] = useState(() => new APIClient());
+  // Attributes chat token usage to this browser session
+  const [sessionId] = useState(() => crypto.randomUUID());
+  // Chat, puzzle generation and answer checks share one connection per session
+  const [playSocket] = useState(() => new PlaySocket(sessionId));
   const [isApiHealthy, setIsApiHealthy] = useState<boolean | null>(null);
   const [availableModels, setAvailableModels] = useState<string[]>([]);
   const [isLoading, setIsLoading] = useState(false);
@@ -35,6 +42,8 @@ export default function Home() {
   const [grid, setGrid] = useState<GridType | null>(null);
   const [userGrid, setUserGrid] = useState<GridType | null>(null);
   const [placements, setPlacements] = useState<Placement[]>([]);
+  const [puzzleId, setPuzzleId] = useState<string | null>(null);
+  const [verification, setVerification] = useState<VerifyPuzzleResponse | null>(null);
   
   // UI state
   const [currentPage, setCurrentPage] = useState<'form' | 'crossword'>('form');
@@ -43,7 +52,32 @@ export default function Home() {
   const [chatOpen, setChatOpen] = useState(false);
   const [chatType, setChatType] = useState<string>('');
 
-  // Check API health and fetch models on mount
+  const showPuzzle = (puzzle: PuzzleResult) => {
+    setGrid(puzzle.grid);
+    setPlacements([...puzzle.placements].sort((a, b) =>
+      a.row === b.row ? a.col - b.col : a.row - b.row
+    ));
+
+    // Initialize user grid
+    const newUserGrid = puzzle.grid.map(row =>
+      row.map(cell => (cell === null || cell === EMPTY_CELL) ? null : '')
+    );
+    setUserGrid(newUserGrid);
+    setPuzzleId(puzzle.puzzle_id ?? null);
+    setVerification(null);
+
+    // Make the URL shareable: reloading it restores this puzzle
+    if (puzzle.puzzle_id) {
+      const url = new URL(window.location.href);
+      url.searchParams.set('puzzle', puzzle.puzzle_id);
+      window.history.replaceState(null, '', url.toString());
+    }
+
+    // Navigate to crossword page
+    setCurrentPage('crossword');
+  };
+
+  // Check API health, fetch models and open a shared puzzle (?puzzle=<id>) on mount
   useEffect(() => {
     const initializeApp = async () => {
       const healthy = await apiClient.healthCheck();
@@ -52,16 +86,27 @@ export default function Home() {
       if (healthy) {
         const models = await apiClient.getAvailableModels();
         setAvailableModels(models);
+
+        const sharedPuzzleId = new URLSearchParams(window.location.search).get('puzzle');
+        if (sharedPuzzleId) {
+          const puzzle = await apiClient.getPuzzle(sharedPuzzleId);
+          if (puzzle) {
+            showPuzzle(puzzle);
+          }
+        }
       }
     };
     initializeApp();
   }, [apiClient]);
 
+  useEffect(() => () => playSocket.close(), [playSocket]);
+
   const handleFormSubmit = async (formData: {
     topics: string;
     difficulty: string;
     clueModel: string;
     numClues: number;
+    fitDriven: boolean;
   }) => {
     setIsLoading(true);
     try {
@@ -74,35 +119,21 @@ export default function Home() {
       setChatOpen(false);
       setChatType('');
 
-      // Generate clues
-      const clueResponse = await apiClient.generateClues({
+      // Generate clues and crossword as a background job
+      const request = {
         topic_str: formData.topics,
         difficulty: formData.difficulty,
         num_clues: formData.numClues,
         model: formData.clueModel,
-      });
-
-      if (clueResponse && clueResponse.clues) {
-        // Generate crossword
-        const crosswordResult = await apiClient.generateCrossword({
-          clues: clueResponse.clues,
-        });
+        fit_driven: formData.fitDriven,
+      };
+      const crosswordResult = await withHttpFallback(
+        () => playSocket.generatePuzzle(request),
+        () => apiClient.generatePuzzle(request)
+      );
 
-        if (crosswordResult) {
-          setGrid(crosswordResult.grid);
-          setPlacements(crosswordResult.placements.sort((a, b) => 
-            a.row === b.row ? a.col - b.col : a.row - b.row
-          ));
-          
-          // Initialize user grid
-          const newUserGrid = crosswordResult.grid.map(row =>
-            row.map(cell => (cell === null || cell === EMPTY_CELL) ? null : '')
-          );
-          setUserGrid(newUserGrid);
-          
-          // Navigate to crossword page
-          setCurrentPage('crossword');
-        }
+      if (crosswordResult) {
+        showPuzzle(crosswordResult);
       }
     } catch (error) {
       console.error('Error generating crossword:', error);
@@ -123,6 +154,18 @@ export default function Home() {
       })
     );
     setUserGrid(newUserGrid);
+    // Results describe the previous fill
+    setVerification(null);
+  };
+
+  const handleCheckAnswers = async () => {
+    if (!puzzleId || !userGrid) return;
+    setVerification(
+      await withHttpFallback(
+        () => playSocket.verifyPuzzle(puzzleId, userGrid, true),
+        () => apiClient.verifyPuzzle(puzzleId, userGrid, true)
+      )
+    );
   };
 
   const handleClueSelect = (placement: Placement, chatType: string) => {
@@ -134,19 +177,27 @@ export default function Home() {
     setChatOpen(true);
   };
 
-  const handleSendMessage = async (message: string, chatType: string): Promise<string | null> => {
+  const handleSendMessage = async (
+    message: string,
+    chatType: string,
+    onToken?: (text: string) => void,
+  ): Promise<string | null> => {
     if (!selectedClue) return null;
     
     setIsChatLoading(true);
     try {
-      const response = await apiClient.generateChatResponse({
+      const request = {
         user_input: message,
         clue: selectedClue,
         chat_type: chatType,
         historical_messages: [], // For simplicity, not tracking history in this component
         model: availableModels[0], 
-      });
-      return response;
+        session_id: sessionId,
+      };
+      return await withHttpFallback(
+        () => playSocket.chat(request, onToken),
+        () => apiClient.generateChatResponse(request)
+      );
     } catch (error) {
       console.error('Error sending chat message:', error);
       return null;
@@ -299,6 +350,7 @@ export default function Home() {
                   grid={grid}
                   userGrid={userGrid || undefined}
                   showAnswer={showAnswers}
+                  cellResults={verification?.cells ?? undefined}
                   onCellChange={handleCellChange}
                 />
                 <Box sx={{ display: 'flex', alignItems: 'left', gap: 1 }}>
@@ -311,7 +363,17 @@ export default function Home() {
                     }
                     label="Show answers"
                   />
+                  {puzzleId && (
+                    <Button variant="outlined" onClick={handleCheckAnswers} disabled={showAnswers}>
+                      Check answers
+                    </Button>
+                  )}
                 </Box>
+                {verification && (
+                  <Alert severity={verification.solved === verification.total ? 'success' : 'info'}>
+                    {verification.solved}/{verification.total} answers correct
+                  </Alert>
+                )}
               </Box>
 
               {/* Clues Section */}
@@ -16,7 +16,12 @@ import { ChatMessage, CrosswordClue } from '../lib/types';
 
 interface ChatInterfaceProps {
   selectedClue: CrosswordClue | null;
-  onSendMessage: (message: string, chatType: string) => Promise<string | null>;
+  // `onToken` receives the reply as it streams in, before the promise resolves
+  onSendMessage: (
+    message: string,
+    chatType: string,
+    onToken?: (text: string) => void,
+  ) => Promise<string | null>;
   isLoading: boolean;
   chatType?: string;
   onClose: () => void;
@@ -25,6 +30,8 @@ interface ChatInterfaceProps {
 export default function ChatInterface({ selectedClue, onSendMessage, isLoading, chatType = 'Get a Hint', onClose }: ChatInterfaceProps) {
   const [messages, setMessages] = useState<ChatMessage[]>([]);
   const [inputValue, setInputValue] = useState('');
+  // Partial assistant reply while it streams
+  const [streamingReply, setStreamingReply] = useState<string | null>(null);
   const messagesEndRef = useRef<HTMLDivElement>(null);
 
   const scrollToBottom = () => {
@@ -33,7 +40,22 @@ export default function ChatInterface({ selectedClue, onSendMessage, isLoading,
 
   useEffect(() => {
     scrollToBottom();
-  }, [messages]);
+  }, [messages, streamingReply]);
+
+  const sendMessage = async (message: string) => {
+    setStreamingReply(null);
+    try {
+      return await onSendMessage(message, chatType, text =>
+        setStreamingReply(prev => (prev ?? '') + text)
+      );
+    } finally {
+      setStreamingReply(null);
+    }
+  };
+
+  const shownMessages: ChatMessage[] = streamingReply
+    ? [...messages, { role: 'assistant', content: streamingReply }]
+    : messages;
 
   // Send opening message when clue or chat type changes
   useEffect(() => {
@@ -50,7 +72,7 @@ export default function ChatInterface({ selectedClue, onSendMessage, isLoading,
       ? "Give me an initial direction how to think about the clue. Ask me what I know / think I know about this clue already."
       : "Provide me a brief intellectual, academic overview of this topic. Ask me if there's anything specific I want to know about this topic.";
 
-    const response = await onSendMessage(opener, chatType);
+    const response = await sendMessage(opener);
     if (response) {
       setMessages([{ role: 'assistant', content: response }]);
     }
@@ -68,7 +90,7 @@ export default function ChatInterface({ selectedClue, onSendMessage, isLoading,
     setMessages(newMessages);
 
     // Get AI response
-    const response = await onSendMessage(userMessage, chatType);
+    const response = await sendMessage(userMessage);
     if (response) {
       setMessages(prev => [...prev, { role: 'assistant', content: response }]);
     } else {
@@ -140,7 +162,7 @@ export default function ChatInterface({ selectedClue, onSendMessage, isLoading,
         }}
       >
         <Box sx={{ flex: 1 }}>
-          {messages.map((message, index) => (
+          {shownMessages.map((message, index) => (
             <Box
               key={index}
               sx={{
@@ -204,7 +226,7 @@ export default function ChatInterface({ selectedClue, onSendMessage, isLoading,
               </Box>
             </Box>
           ))}
-          {isLoading && (
+          {isLoading && !streamingReply && (
             <Box textAlign="left" mb={2}>
               <Box
                 sx={{
@@ -11,6 +11,8 @@ import {
   Typography,
   Box,
   Collapse,
+  FormControlLabel,
+  Checkbox,
 } from '@mui/material';
 import { ExpandMore, ExpandLess } from '@mui/icons-material';
 import { APIClient } from '../lib/api-client';
@@ -21,6 +23,7 @@ interface CrosswordFormProps {
     difficulty: string;
     clueModel: string;
     numClues: number;
+    fitDriven: boolean;
   }) => void;
   isLoading: boolean;
 }
@@ -32,6 +35,7 @@ export default function CrosswordForm({ onSubmit, isLoading }: CrosswordFormProp
   const [availableModels, setAvailableModels] = useState<string[]>([]);
   const [clueModel, setClueModel] = useState('');
   const [numClues, setNumClues] = useState(30);
+  const [fitDriven, setFitDriven] = useState(false);
   const [showAdvanced, setShowAdvanced] = useState(false);
 
   React.useEffect(() => {
@@ -59,6 +63,7 @@ export default function CrosswordForm({ onSubmit, isLoading }: CrosswordFormProp
       difficulty,
       clueModel,
       numClues,
+      fitDriven,
     });
   };
 
@@ -149,6 +154,16 @@ export default function CrosswordForm({ onSubmit, isLoading }: CrosswordFormProp
               }
             }}
           />
+
+          <FormControlLabel
+            control={
+              <Checkbox
+                checked={fitDriven}
+                onChange={(e) => setFitDriven(e.target.checked)}
+              />
+            }
+            label="Optimize grid fill (slower, uses extra model calls)"
+          />
         </Box>
       </Collapse>
 
@@ -8,6 +8,8 @@ interface CrosswordGridProps {
   grid: GridType;
   userGrid?: GridType;
   showAnswer?: boolean;
+  // Row-major result per cell from verifyPuzzle: "+" correct, "x" wrong
+  cellResults?: string;
   onCellChange?: (row: number, col: number, value: string) => void;
 }
 
@@ -15,6 +17,7 @@ export default function CrosswordGrid({
   grid,
   userGrid,
   showAnswer = false,
+  cellResults,
   onCellChange,
 }: CrosswordGridProps) {
   if (!grid || grid.length === 0) return null;
@@ -41,6 +44,14 @@ export default function CrosswordGrid({
     return userGrid?.[row]?.[col] || '';
   };
 
+  const getBorderColor = (row: number, col: number): string => {
+    if (showAnswer) return 'success.main';
+    const result = cellResults?.[row * grid[0].length + col];
+    if (result === '+') return 'success.main';
+    if (result === 'x') return 'error.main';
+    return 'grey.300';
+  };
+
   const isBlockCell = (row: number, col: number): boolean => {
     const originalCell = grid[row]?.[col];
     return originalCell === null || 
@@ -93,7 +104,7 @@ export default function CrosswordGrid({
                         height: '48px',
                         borderRadius: '8px',
                         '& fieldset': {
-                          borderColor: showAnswer ? 'success.main' : 'grey.300',
+                          borderColor: getBorderColor(rowIndex, colIndex),
                           borderWidth: 2,
                         },
                         '&:hover fieldset': {
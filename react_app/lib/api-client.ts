@@ -1,12 +1,22 @@
 import axios, { AxiosResponse } from 'axios';
 import {
+  BlankPuzzle,
   CrosswordClueResponse,
   GenerateCluesRequest,
   GenerateCrosswordRequest,
   GenerateChatRequest,
+  GeneratePuzzleRequest,
   Placement,
   CrosswordGrid,
+  JobResponse,
+  PuzzleResult,
+  StoredPuzzle,
+  VerifyPuzzleResponse,
 } from './types';
+import { COMPACT_MEDIA_TYPE, encodeFill, expandCrossword } from './wire-format';
+
+// Server-side wait per long-poll request; must stay below the axios timeout
+const LONG_POLL_TIMEOUT_S = 25;
 
 export class APIClient {
   private client;
@@ -17,8 +27,17 @@ export class APIClient {
       timeout: 30000,
       headers: {
         'Content-Type': 'application/json',
+        // Compact crossword payloads; plain JSON is still accepted
+        'Accept': `${COMPACT_MEDIA_TYPE}, application/json;q=0.5`,
       },
     });
+    this.client.interceptors.response.use(response => {
+      const contentType = String(response.headers['content-type'] ?? '');
+      if (contentType.startsWith(COMPACT_MEDIA_TYPE)) {
+        response.data = expandCrossword(response.data);
+      }
+      return response;
+    });
   }
 
   async healthCheck(): Promise<boolean> {
@@ -81,12 +100,105 @@ export class APIClient {
     }
   }
 
+  async generatePuzzle(
+    {
+      topic_str,
+      difficulty,
+      num_clues = 30,
+      model = "claude-3-5-haiku-20241022",
+      fit_driven = false,
+    }: GeneratePuzzleRequest,
+    onProgress?: (job: JobResponse) => void,
+    maxWaitMs = 600000,
+  ): Promise<PuzzleResult | null> {
+    try {
+      const created = await this.client.post('/api/jobs/puzzle', {
+        topic_str,
+        difficulty,
+        num_clues,
+        model,
+        fit_driven,
+      });
+      const jobId: string = created.data.job_id;
+
+      const deadline = Date.now() + maxWaitMs;
+      while (Date.now() < deadline) {
+        const response: AxiosResponse<JobResponse> = await this.client.get(
+          `/api/jobs/${jobId}/wait`,
+          { params: { timeout: LONG_POLL_TIMEOUT_S } }
+        );
+        const job = response.data;
+        onProgress?.(job);
+        if (job.status === 'completed' && job.result) {
+          return job.result;
+        }
+        if (job.status === 'failed') {
+          console.error(`Puzzle job ${jobId} failed:`, job.error);
+          return null;
+        }
+      }
+      console.error(`Puzzle job ${jobId} did not finish in time`);
+      return null;
+    } catch (error) {
+      console.error('Error generating puzzle:', error);
+      return null;
+    }
+  }
+
+  // Stored puzzles are immutable and served with ETag/Cache-Control, so the
+  // browser HTTP cache makes repeat loads free
+  async getPuzzle(puzzleId: string): Promise<StoredPuzzle | null> {
+    try {
+      const response: AxiosResponse<StoredPuzzle> = await this.client.get(
+        `/api/puzzles/${encodeURIComponent(puzzleId)}`
+      );
+      return response.data;
+    } catch (error) {
+      console.error(`Error loading puzzle ${puzzleId}:`, error);
+      return null;
+    }
+  }
+
+  // Same puzzle without letters or answers; check fills with verifyPuzzle
+  async getBlankPuzzle(puzzleId: string): Promise<BlankPuzzle | null> {
+    try {
+      const response: AxiosResponse<BlankPuzzle> = await this.client.get(
+        `/api/puzzles/${encodeURIComponent(puzzleId)}`,
+        { params: { solution: false } }
+      );
+      return response.data;
+    } catch (error) {
+      console.error(`Error loading puzzle ${puzzleId}:`, error);
+      return null;
+    }
+  }
+
+  // Checks the fill server-side, so the comparison (and, with getBlankPuzzle,
+  // the solution) stays off the client
+  async verifyPuzzle(
+    puzzleId: string,
+    userGrid: CrosswordGrid,
+    perCell = false,
+  ): Promise<VerifyPuzzleResponse | null> {
+    try {
+      const response: AxiosResponse<VerifyPuzzleResponse> = await this.client.post(
+        `/api/puzzles/${encodeURIComponent(puzzleId)}/verify`,
+        { fill: encodeFill(userGrid), per_cell: perCell }
+      );
+      return response.data;
+    } catch (error) {
+      console.error(`Error verifying puzzle ${puzzleId}:`, error);
+      return null;
+    }
+  }
+
   async generateChatResponse({
     user_input,
     clue,
     chat_type = "Get a Hint",
     historical_messages = [],
-    model = "claude-3-5-sonnet-20241022"
+    model = "claude-3-5-sonnet-20241022",
+    session_id,
   }: GenerateChatRequest): Promise<string | null> {
     try {
       const response = await this.client.post('/api/chat/generate', {
@@ -95,6 +207,7 @@ export class APIClient {
         chat_type,
         historical_messages,
         model,
+        session_id,
       });
       
       return response.data.response;
@@ -0,0 +1,187 @@
+// One WebSocket per play session (/ws/play/{sessionId}) carrying streamed chat
+// tokens, puzzle job progress and answer checks; see api/play.py for the
+// frame protocol. The socket opens on first use and reopens on the next
+// request after a disconnect.
+import {
+  CrosswordGrid,
+  GenerateChatRequest,
+  GeneratePuzzleRequest,
+  JobResponse,
+  PuzzleResult,
+  VerifyPuzzleResponse,
+} from './types';
+import { encodeFill } from './wire-format';
+
+interface Frame {
+  type: string;
+  id?: string | null;
+  [key: string]: any;
+}
+
+type FrameHandler<T> = (
+  frame: Frame,
+  resolve: (value: T) => void,
+  reject: (error: Error) => void,
+) => void;
+
+interface PendingRequest {
+  onFrame: (frame: Frame) => void;
+  reject: (error: Error) => void;
+}
+
+// `statusCode` is set for errors reported by the server (same codes as the HTTP
+// endpoints) and unset when the connection itself failed
+export class PlaySocketError extends Error {
+  constructor(message: string, public statusCode?: number) {
+    super(message);
+    this.name = 'PlaySocketError';
+  }
+}
+
+export class PlaySocket {
+  private socket: WebSocket | null = null;
+  private opening: Promise<WebSocket> | null = null;
+  private pending = new Map<string, PendingRequest>();
+  private nextId = 0;
+
+  constructor(private sessionId: string, private baseUrl = "ws://localhost:8000") {}
+
+  // Streams reply text to `onToken` and resolves with the full reply
+  chat(
+    { user_input, clue, chat_type, historical_messages, model }: GenerateChatRequest,
+    onToken?: (text: string) => void,
+  ): Promise<string> {
+    return this.request<string>(
+      {
+        type: 'chat',
+        user_input,
+        clue: clue ? { clue: clue.clue, answer: clue.answer } : null,
+        chat_type,
+        historical_messages,
+        model,
+      },
+      (frame, resolve) => {
+        if (frame.type === 'chat.token') {
+          onToken?.(frame.text);
+        } else if (frame.type === 'chat.done') {
+          resolve(frame.response);
+        }
+      }
+    );
+  }
+
+  generatePuzzle(
+    request: GeneratePuzzleRequest,
+    onProgress?: (job: JobResponse) => void,
+  ): Promise<PuzzleResult> {
+    return this.request<PuzzleResult>({ type: 'generate', ...request }, (frame, resolve, reject) => {
+      const job: JobResponse = frame.job;
+      onProgress?.(job);
+      if (frame.type !== 'job.complete') return;
+      if (job.status === 'completed' && job.result) {
+        resolve(job.result);
+      } else {
+        reject(new PlaySocketError(job.error ?? 'Puzzle generation failed', 500));
+      }
+    });
+  }
+
+  verifyPuzzle(
+    puzzleId: string,
+    userGrid: CrosswordGrid,
+    perCell = false,
+  ): Promise<VerifyPuzzleResponse> {
+    return this.request<VerifyPuzzleResponse>(
+      { type: 'verify', puzzle_id: puzzleId, fill: encodeFill(userGrid), per_cell: perCell },
+      (frame, resolve) => {
+        if (frame.type === 'verify.result') resolve(frame.result);
+      }
+    );
+  }
+
+  close() {
+    this.socket?.close();
+  }
+
+  private async request<T>(frame: Frame, onFrame: FrameHandler<T>): Promise<T> {
+    const socket = await this.connect();
+    const id = `${frame.type}-${++this.nextId}`;
+    return new Promise<T>((resolve, reject) => {
+      const settle = <V>(fn: (value: V) => void) => (value: V) => {
+        this.pending.delete(id);
+        fn(value);
+      };
+      this.pending.set(id, {
+        onFrame: received => onFrame(received, settle(resolve), settle(reject)),
+        reject: settle(reject),
+      });
+      socket.send(JSON.stringify({ ...frame, id }));
+    });
+  }
+
+  private connect(): Promise<WebSocket> {
+    if (this.socket?.readyState === WebSocket.OPEN) {
+      return Promise.resolve(this.socket);
+    }
+    if (!this.opening) {
+      this.opening = new Promise<WebSocket>((resolve, reject) => {
+        const socket = new WebSocket(
+          `${this.baseUrl}/ws/play/${encodeURIComponent(this.sessionId)}`
+        );
+        socket.onopen = () => {
+          this.socket = socket;
+          this.opening = null;
+          resolve(socket);
+        };
+        socket.onmessage = event => this.handleFrame(JSON.parse(event.data));
+        socket.onclose = () => {
+          if (this.opening) {
+            this.opening = null;
+            reject(new PlaySocketError('Could not connect to the play socket'));
+          }
+          this.socket = null;
+          // Requests are tied to the connection; they can't resume on a new one
+          for (const request of Array.from(this.pending.values())) {
+            request.reject(new PlaySocketError('Play socket closed'));
+          }
+          this.pending.clear();
+        };
+      });
+    }
+    return this.opening;
+  }
+
+  private handleFrame(frame: Frame) {
+    if (frame.type === 'ping') {
+      // Heartbeat: the server closes connections that stay silent
+      this.socket?.send(JSON.stringify({ type: 'pong', ts: frame.ts }));
+      return;
+    }
+    const request = frame.id ? this.pending.get(frame.id) : undefined;
+    if (!request) return;
+    if (frame.type === 'error') {
+      const detail = typeof frame.detail === 'string' ? frame.detail : JSON.stringify(frame.detail);
+      request.reject(new PlaySocketError(detail, frame.status_code));
+    } else {
+      request.onFrame(frame);
+    }
+  }
+}
+
+// Runs a request over the socket, falling back to HTTP only when the socket
+// itself is unavailable (server errors are not retried)
+export async function withHttpFallback<T>(
+  viaSocket: () => Promise<T>,
+  viaHttp: () => Promise<T | null>,
+): Promise<T | null> {
+  try {
+    return await viaSocket();
+  } catch (error) {
+    if (error instanceof PlaySocketError && error.statusCode === undefined) {
+      console.warn('Play socket unavailable, falling back to HTTP:', error.message);
+      return viaHttp();
+    }
+    console.error('Play socket request failed:', error);
+    return null;
+  }
+}
@@ -27,16 +27,72 @@ export interface GenerateCluesRequest {
   model: string;
 }
 
+export interface GeneratePuzzleRequest extends GenerateCluesRequest {
+  fit_driven?: boolean;
+}
+
 export interface GenerateCrosswordRequest {
   clues: CrosswordClue[];
 }
 
+export type JobStatus = "pending" | "running" | "completed" | "failed";
+
+export interface PuzzleResult {
+  clues: CrosswordClue[];
+  grid: CrosswordGrid;
+  placements: Placement[];
+  puzzle_id?: string | null;
+}
+
+export interface StoredPuzzle extends PuzzleResult {
+  topic?: string | null;
+  difficulty?: string | null;
+  model?: string | null;
+  created_at: number;
+}
+
+// Solution-free puzzle (GET /api/puzzles/{id}?solution=false): blank grid,
+// placements carry the answer length instead of the word
+export interface BlankPlacement extends Omit<Placement, 'word'> {
+  length: number;
+}
+
+export interface BlankPuzzle extends Omit<StoredPuzzle, 'placements'> {
+  placements: BlankPlacement[];
+}
+
+export type PlacementStatus = "correct" | "incorrect" | "incomplete";
+
+export interface VerifyPuzzleResponse {
+  puzzle_id: string;
+  placements: {
+    row: number;
+    col: number;
+    direction: "across" | "down";
+    status: PlacementStatus;
+  }[];
+  solved: number;
+  total: number;
+  // Row-major, one per cell: "+" correct, "x" wrong, "." empty, "#" block
+  cells?: string | null;
+}
+
+export interface JobResponse {
+  job_id: string;
+  status: JobStatus;
+  stage: string;
+  progress: number;
+  error?: string | null;
+  result?: PuzzleResult | null;
+}
+
 export interface GenerateChatRequest {
   user_input: string;
   clue?: CrosswordClue;
   chat_type: string;
   historical_messages: ChatMessage[];
   model: string;
+  session_id?: string;
 }
 
 export type GridCell = string | null;
@@ -0,0 +1,60 @@
+// Decoder for the API's compact crossword wire format
+// (Accept: application/vnd.crossword.compact+json). Grids arrive as one
+// row-major string of cells and placements as parallel arrays; see
+// src/crossword/wire_format.py for the encoder.
+
+export const COMPACT_MEDIA_TYPE = "application/vnd.crossword.compact+json";
+
+const BLANK_CELL = ".";
+const DIRECTION_NAMES: Record<string, "across" | "down"> = { A: "across", D: "down" };
+
+interface CompactGrid {
+  rows: number;
+  cols: number;
+  cells: string;
+}
+
+const isObject = (value: unknown): value is Record<string, any> =>
+  typeof value === "object" && value !== null && !Array.isArray(value);
+
+const expandGrid = ({ rows, cols, cells }: CompactGrid): string[][] =>
+  Array.from({ length: rows }, (_, r) =>
+    Array.from(cells.slice(r * cols, (r + 1) * cols), cell => (cell === BLANK_CELL ? "" : cell))
+  );
+
+const expandPlacements = (columns: Record<string, any>): Record<string, any>[] => {
+  const keys = Object.keys(columns);
+  if (keys.length === 0) return [];
+  const count = columns[keys[0]].length;
+  return Array.from({ length: count }, (_, i) =>
+    Object.fromEntries(
+      keys.map(key => [key, key === "direction" ? DIRECTION_NAMES[columns[key][i]] : columns[key][i]])
+    )
+  );
+};
+
+// Recursively turn compact grids/placements back into the plain JSON shapes
+export function expandCrossword<T = any>(data: unknown): T {
+  if (Array.isArray(data)) {
+    return data.map(item => expandCrossword(item)) as T;
+  }
+  if (!isObject(data)) {
+    return data as T;
+  }
+  const result: Record<string, any> = {};
+  for (const [key, value] of Object.entries(data)) {
+    result[key] = expandCrossword(value);
+  }
+  if (isObject(data.grid) && isObject(data.placements)) {
+    result.grid = expandGrid(data.grid as CompactGrid);
+    result.placements = expandPlacements(data.placements);
+  }
+  return result as T;
+}
+
+// Player fill for answer checks: row-major, one character per cell, with
+// blocks and blanks as "."
+export const encodeFill = (grid: (string | null)[][]): string =>
+  grid
+    .map(row => row.map(cell => (cell && /^[A-Za-z]$/.test(cell) ? cell : BLANK_CELL)).join(''))
+    .join('');
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for CrosswordGenerator scaling.
+
+Measures wall time, words placed, fill density and peak memory as the number of
+answers and their lengths grow, over synthetic and real answer-list fixtures.
+Results are written as JSON and can be compared against a saved baseline to
+prove engine optimizations or catch regressions.
+
+Usage:
+    python scripts/bench_crossword.py
+    python scripts/bench_crossword.py --save-baseline bench/crossword_baseline.json
+    python scripts/bench_crossword.py --baseline bench/crossword_baseline.json
+    python scripts/bench_crossword.py --corpus scripts/data/clues.json --sizes 10,50,200
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Add the project root to Python path so 'src' module can be found
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.crossword.clue_generator import CrosswordClue  # noqa: E402
+from src.crossword.crossword_generator import CrosswordGenerator  # noqa: E402
+
+DEFAULT_SIZES = [10, 25, 50, 100, 200]
+# Synthetic answer length ranges (inclusive)
+DEFAULT_LENGTH_RANGES = [(3, 7), (5, 10), (8, 15)]
+FIXTURE_PATH = os.path.join(
+    project_root, "scripts", "fixtures", "crossword_answers.txt"
+)
+
+# Letters weighted roughly by English frequency so synthetic words intersect
+LETTER_WEIGHTS = {
+    "E": 12.7, "T": 9.1, "A": 8.2, "O": 7.5, "I": 7.0, "N": 6.7, "S": 6.3,
+    "H": 6.1, "R": 6.0, "D": 4.3, "L": 4.0, "C": 2.8, "U": 2.8, "M": 2.4,
+    "W": 2.4, "F": 2.2, "G": 2.0, "Y": 2.0, "P": 1.9, "B": 1.5, "V": 1.0,
+    "K": 0.8, "J": 0.2, "X": 0.2, "Q": 0.1, "Z": 0.1,
+}  # fmt: skip
+
+
+def synthetic_answers(
+    count: int, min_len: int, max_len: int, rng: random.Random
+) -> List[str]:
+    letters, weights = zip(*LETTER_WEIGHTS.items())
+    answers: Dict[str, None] = {}
+    while len(answers) < count:
+        length = rng.randint(min_len, max_len)
+        answers["".join(rng.choices(letters, weights=weights, k=length))] = None
+    return list(answers)
+
+
+def load_answer_list(path: str) -> List[str]:
+    """Read answers from a newline-separated list or a clue corpus JSON file."""
+    with open(path, "r", encoding="utf-8") as f:
+        if path.endswith(".json"):
+            rows: Iterable[Any] = json.load(f)
+            raw = [row.get("answer", "") for row in rows if isinstance(row, dict)]
+        else:
+            raw = f.read().split()
+    cleaned = [a.strip().upper() for a in raw if a and a.strip().isalpha()]
+    return list(dict.fromkeys(a for a in cleaned if len(a) >= 3))
+
+
+def build_fixtures(
+    sizes: List[int],
+    length_ranges: List[Tuple[int, int]],
+    real_lists: Dict[str, List[str]],
+    seed: int,
+) -> List[Dict[str, Any]]:
+    fixtures = []
+    for size in sizes:
+        for min_len, max_len in length_ranges:
+            rng = random.Random(f"{seed}-{size}-{min_len}-{max_len}")
+            fixtures.append(
+                {
+                    "name": f"synthetic-{min_len}to{max_len}-n{size}",
+                    "kind": "synthetic",
+                    "answers": synthetic_answers(size, min_len, max_len, rng),
+                }
+            )
+        for list_name, answers in real_lists.items():
+            if len(answers) < size:
+                continue
+            rng = random.Random(f"{seed}-{list_name}-{size}")
+            fixtures.append(
+                {
+                    "name": f"{list_name}-n{size}",
+                    "kind": "real",
+                    "answers": rng.sample(answers, size),
+                }
+            )
+    return fixtures
+
+
+def run_case(answers: List[str], repeats: int) -> Dict[str, Any]:
+    clues = [CrosswordClue(clue=f"Clue for {a}", answer=a) for a in answers]
+
+    timings = []
+    for _ in range(repeats):
+        generator = CrosswordGenerator(clues=clues)
+        started_at = time.perf_counter()
+        grid, placements = generator.generate_grid()
+        timings.append(time.perf_counter() - started_at)
+
+    # Separate run for memory: tracemalloc slows execution down noticeably
+    tracemalloc.start()
+    CrosswordGenerator(clues=clues).generate_grid()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    cells = len(grid) * len(grid[0])
+    filled = sum(cell != CrosswordGenerator.EMPTY for row in grid for cell in row)
+    return {
+        "num_answers": len(answers),
+        "mean_answer_length": round(statistics.mean(len(a) for a in answers), 2),
+        "grid_size": len(grid),
+        "words_placed": len(placements),
+        "placed_ratio": round(len(placements) / len(answers), 4),
+        "fill_density": round(filled / cells, 4),
+        "wall_time_s": {
+            "median": round(statistics.median(timings), 6),
+            "min": round(min(timings), 6),
+            "max": round(max(timings), 6),
+        },
+        "peak_memory_kb": round(peak / 1024, 1),
+    }
+
+
+def compare(
+    results: Dict[str, Any],
+    baseline: Dict[str, Any],
+    time_tolerance: float,
+    min_time_delta: float,
+) -> List[str]:
+    """Return a list of regressions of `results` relative to `baseline`."""
+    regressions = []
+    base_cases = baseline.get("cases", {})
+    for name, case in results["cases"].items():
+        base = base_cases.get(name)
+        if base is None:
+            continue
+        base_time = base["wall_time_s"]["median"]
+        time_now = case["wall_time_s"]["median"]
+        if (
+            time_now > base_time * (1 + time_tolerance)
+            and time_now - base_time > min_time_delta
+        ):
+            regressions.append(
+                f"{name}: median wall time {time_now:.4f}s vs baseline {base_time:.4f}s"
+            )
+        if case["words_placed"] < base["words_placed"]:
+            regressions.append(
+                f"{name}: placed {case['words_placed']} words vs baseline {base['words_placed']}"
+            )
+    return regressions
+
+
+def parse_length_ranges(value: str) -> List[Tuple[int, int]]:
+    ranges = []
+    for part in value.split(","):
+        low, _, high = part.partition("-")
+        ranges.append((int(low), int(high or low)))
+    return ranges
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--sizes",
+        default=",".join(map(str, DEFAULT_SIZES)),
+        help="Comma-separated answer counts",
+    )
+    parser.add_argument(
+        "--lengths",
+        default=",".join(f"{a}-{b}" for a, b in DEFAULT_LENGTH_RANGES),
+        help="Comma-separated synthetic answer length ranges, e.g. 3-7,8-15",
+    )
+    parser.add_argument(
+        "--corpus",
+        default=os.getenv("JSON_PATH"),
+        help="Clue corpus JSON to sample real answers from (optional)",
+    )
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=13)
+    parser.add_argument("--output", help="Write JSON results to this path")
+    parser.add_argument("--save-baseline", help="Write results as a new baseline")
+    parser.add_argument("--baseline", help="Compare against a saved baseline")
+    parser.add_argument(
+        "--time-tolerance",
+        type=float,
+        default=0.25,
+        help="Allowed relative slowdown before a case counts as a regression",
+    )
+    parser.add_argument(
+        "--min-time-delta",
+        type=float,
+        default=0.005,
+        help="Ignore slowdowns smaller than this many seconds (timer noise)",
+    )
+    args = parser.parse_args()
+
+    real_lists = {"fixture": load_answer_list(FIXTURE_PATH)}
+    if args.corpus and os.path.exists(args.corpus):
+        real_lists["corpus"] = load_answer_list(args.corpus)
+
+    fixtures = build_fixtures(
+        sizes=[int(s) for s in args.sizes.split(",")],
+        length_ranges=parse_length_ranges(args.lengths),
+        real_lists=real_lists,
+        seed=args.seed,
+    )
+
+    results: Dict[str, Any] = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "repeats": args.repeats,
+        "seed": args.seed,
+        "cases": {},
+    }
+    for fixture in fixtures:
+        case = run_case(fixture["answers"], args.repeats)
+        case["kind"] = fixture["kind"]
+        results["cases"][fixture["name"]] = case
+        print(
+            f"{fixture['name']:<32} placed {case['words_placed']:>4}/{case['num_answers']:<4} "
+            f"density {case['fill_density']:.3f}  "
+            f"median {case['wall_time_s']['median'] * 1000:9.2f} ms  "
+            f"peak {case['peak_memory_kb']:9.1f} KiB",
+            file=sys.stderr,
+        )
+
+    payload = json.dumps(results, indent=2)
+    if not args.output:
+        print(payload)
+    for path in filter(None, [args.output, args.save_baseline]):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(payload)
+
+    if args.baseline:
+        baseline: Optional[Dict[str, Any]] = None
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(
+            results, baseline, args.time_tolerance, args.min_time_delta
+        )
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            return 1
+        print("No regressions against baseline.", file=sys.stderr)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Parity and latency/memory benchmark for the query embedding backends.
+
+Loads the embedding model under each backend (see src/embeddings.py) in a
+fresh interpreter, encodes the same query strings one at a time as
+WeaviateClient does, and reports load time, p50/p99 encode latency and peak
+resident memory. Parity is the cosine similarity of each backend's embeddings
+against the fp32 torch reference; the run fails when the lowest similarity
+drops below --min-cosine.
+
+Usage:
+    python scripts/bench_embeddings.py
+    python scripts/bench_embeddings.py --backends torch,onnx-int8 --repeats 5
+    python scripts/bench_embeddings.py --corpus scripts/data/clues.json --queries 500
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List
+
+# Add the project root to Python path so 'src' module can be found
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.metrics import percentile  # noqa: E402
+
+REFERENCE_BACKEND = "torch"
+
+# Topic strings as typed into the puzzle form (comma-separated topics)
+DEFAULT_QUERIES = [
+    "Jazz", "Space", "Baseball", "Cooking", "Greek mythology", "Opera",
+    "Chemistry", "Broadway musicals", "Rivers of Europe", "Birds",
+    "Movies, Music", "Ancient Rome, Gladiators", "Computers", "Weather",
+    "Fashion", "Cheese", "Poetry", "Chess", "Olympic sports", "Volcanoes",
+]  # fmt: skip
+
+
+def load_queries(corpus: str, count: int, seed: int) -> List[str]:
+    """Default topics plus clue texts sampled from the corpus JSON, if present."""
+    queries = list(DEFAULT_QUERIES)
+    if corpus and os.path.exists(corpus):
+        with open(corpus, "r", encoding="utf-8") as f:
+            clues = [row.get("clue") for row in json.load(f) if isinstance(row, dict)]
+        clues = [clue for clue in dict.fromkeys(clues) if clue]
+        random.Random(seed).shuffle(clues)
+        queries.extend(clues[: max(0, count - len(queries))])
+    return queries[:count]
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def measure_backend(backend: str, queries: List[str], repeats: int) -> Dict[str, Any]:
+    """Run in the child process: load one backend and time single-query encodes."""
+    import sentence_transformers  # noqa: F401
+
+    from src.embeddings import load_embedding_model, onnx_available
+
+    if backend != REFERENCE_BACKEND and not onnx_available():
+        raise RuntimeError(f"{backend} unavailable; install optimum[onnxruntime]")
+    rss_before = peak_rss_mb()
+    started_at = time.perf_counter()
+    model = load_embedding_model(backend)
+    load_s = time.perf_counter() - started_at
+    if backend != REFERENCE_BACKEND and model.backend == REFERENCE_BACKEND:
+        # load_embedding_model fell back to torch
+        raise RuntimeError(f"{backend} unavailable; install optimum[onnxruntime]")
+
+    embeddings = [model.encode(query).tolist() for query in queries]
+    latencies = []
+    for _ in range(repeats):
+        for query in queries:
+            started_at = time.perf_counter()
+            model.encode(query)
+            latencies.append(time.perf_counter() - started_at)
+    return {
+        "load_s": round(load_s, 3),
+        "encode_ms": {
+            "p50": round(percentile(latencies, 50) * 1000, 2),
+            "p99": round(percentile(latencies, 99) * 1000, 2),
+            "mean": round(statistics.mean(latencies) * 1000, 2),
+        },
+        "model_rss_mb": round(peak_rss_mb() - rss_before, 1),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "embeddings": embeddings,
+    }
+
+
+def run_backend(backend: str, queries: List[str], repeats: int) -> Dict[str, Any]:
+    """Measure one backend in a fresh interpreter so memory figures don't mix."""
+    proc = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--measure", backend,
+         "--repeats", str(repeats)],
+        input=json.dumps(queries),
+        capture_output=True,
+        text=True,
+        cwd=project_root,
+    )  # fmt: skip
+    if proc.returncode != 0:
+        raise RuntimeError(f"Backend {backend} failed:\n{proc.stderr[-2000:]}")
+    return json.loads(proc.stdout)
+
+
+def cosine_parity(
+    embeddings: List[List[float]], reference: List[List[float]]
+) -> Dict[str, float]:
+    import numpy as np
+
+    a = np.asarray(embeddings, dtype=np.float64)
+    b = np.asarray(reference, dtype=np.float64)
+    cosines = (a * b).sum(axis=1) / (
+        np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1)
+    )
+    return {
+        "min": round(float(cosines.min()), 5),
+        "mean": round(float(cosines.mean()), 5),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--backends",
+        default="torch,onnx,onnx-int8",
+        help="Comma-separated backends; torch is always measured as the reference",
+    )
+    parser.add_argument(
+        "--corpus",
+        default=os.getenv("JSON_PATH", "scripts/data/clues.json"),
+        help="Clue corpus JSON to sample extra queries from (optional)",
+    )
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=13)
+    parser.add_argument(
+        "--min-cosine",
+        type=float,
+        default=0.98,
+        help="Fail when any backend's lowest cosine similarity to torch is below this",
+    )
+    parser.add_argument("--output", help="Write JSON results to this path")
+    parser.add_argument("--measure", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        queries = json.loads(sys.stdin.read())
+        print(json.dumps(measure_backend(args.measure, queries, args.repeats)))
+        return 0
+
+    from src.settings import settings
+
+    queries = load_queries(args.corpus, args.queries, args.seed)
+    backends = [b.strip() for b in args.backends.split(",") if b.strip()]
+    backends = [REFERENCE_BACKEND] + [b for b in backends if b != REFERENCE_BACKEND]
+
+    results: Dict[str, Any] = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "model": settings.embedding_model,
+        "queries": len(queries),
+        "repeats": args.repeats,
+        "backends": {},
+    }
+    reference = None
+    failures = []
+    print(
+        f"{'backend':<10} {'load s':>8} {'p50 ms':>8} {'p99 ms':>8} "
+        f"{'model MB':>9} {'peak MB':>8} {'cos min':>8} {'cos mean':>9}",
+        file=sys.stderr,
+    )
+    for backend in backends:
+        try:
+            result = run_backend(backend, queries, args.repeats)
+        except RuntimeError as e:
+            if backend == REFERENCE_BACKEND:
+                raise
+            print(f"{backend:<10} skipped: {str(e).splitlines()[-1]}", file=sys.stderr)
+            continue
+        embeddings = result.pop("embeddings")
+        if reference is None:
+            reference = embeddings
+        result["cosine"] = cosine_parity(embeddings, reference)
+        results["backends"][backend] = result
+        print(
+            f"{backend:<10} {result['load_s']:>8.2f} "
+            f"{result['encode_ms']['p50']:>8.2f} {result['encode_ms']['p99']:>8.2f} "
+            f"{result['model_rss_mb']:>9.1f} {result['peak_rss_mb']:>8.1f} "
+            f"{result['cosine']['min']:>8.4f} {result['cosine']['mean']:>9.4f}",
+            file=sys.stderr,
+        )
+        if result["cosine"]["min"] < args.min_cosine:
+            failures.append(
+                f"{backend}: min cosine {result['cosine']['min']} < {args.min_cosine}"
+            )
+
+    payload = json.dumps(results, indent=2)
+    if args.output:
+        directory = os.path.dirname(args.output)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(payload)
+    else:
+        print(payload)
+
+    for failure in failures:
+        print(f"PARITY {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
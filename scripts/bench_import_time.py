@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Import-time benchmark for the API and client entry points.
+
+Runs `python -X importtime -c "import <module>"` in a fresh interpreter (best of
+N runs), reports the cumulative import time and the heaviest imports, and fails
+when a module exceeds its budget or pulls in a dependency that must stay lazy.
+
+Usage:
+    python scripts/bench_import_time.py
+    python scripts/bench_import_time.py --budget api.main=800 --runs 5
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Cumulative import budgets in milliseconds
+DEFAULT_BUDGETS_MS = {
+    "api.main": 1000.0,
+    "streamlit_app.api_client": 800.0,
+}
+
+# Heavy dependencies that must only load on the code path that needs them
+DEFAULT_FORBIDDEN = [
+    "anthropic",
+    "onnxruntime",
+    "pandas",
+    "sentence_transformers",
+    "torch",
+    "weaviate",
+]
+
+
+def measure(module: str) -> Tuple[float, List[Tuple[str, float, float]]]:
+    """Import `module` in a subprocess; return (total ms, [(name, self ms, cumulative ms)])."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=project_root,
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONPATH": project_root},
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{proc.stderr[-2000:]}")
+
+    entries = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        entries.append(
+            (name.strip(), int(self_us) / 1000.0, int(cumulative_us) / 1000.0)
+        )
+
+    total = next((cumulative for name, _, cumulative in entries if name == module), 0.0)
+    return total, entries
+
+
+def parse_budgets(values: List[str]) -> Dict[str, float]:
+    budgets = dict(DEFAULT_BUDGETS_MS)
+    for value in values:
+        module, _, budget = value.partition("=")
+        budgets[module] = float(budget)
+    return budgets
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--budget",
+        action="append",
+        default=[],
+        metavar="MODULE=MS",
+        help="Override or add a module budget (repeatable)",
+    )
+    parser.add_argument("--runs", type=int, default=3, help="Best-of-N runs")
+    parser.add_argument("--top", type=int, default=10, help="Heaviest imports shown")
+    parser.add_argument("--json", action="store_true", help="Emit JSON results")
+    args = parser.parse_args()
+
+    budgets = parse_budgets(args.budget)
+    results = []
+    failed = False
+
+    for module, budget in budgets.items():
+        runs = [measure(module) for _ in range(max(1, args.runs))]
+        total, entries = min(runs, key=lambda run: run[0])
+        loaded = {name.split(".")[0] for name, _, _ in entries}
+        forbidden = sorted(loaded.intersection(DEFAULT_FORBIDDEN))
+        heaviest = sorted(entries, key=lambda e: e[1], reverse=True)[: args.top]
+        ok = total <= budget and not forbidden
+        failed = failed or not ok
+        results.append(
+            {
+                "module": module,
+                "total_ms": round(total, 1),
+                "budget_ms": budget,
+                "forbidden_imports": forbidden,
+                "heaviest": [
+                    {
+                        "module": name,
+                        "self_ms": round(s, 1),
+                        "cumulative_ms": round(c, 1),
+                    }
+                    for name, s, c in heaviest
+                ],
+                "ok": ok,
+            }
+        )
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for result in results:
+            status = "OK" if result["ok"] else "FAIL"
+            print(
+                f"[{status}] {result['module']}: {result['total_ms']:.1f} ms "
+                f"(budget {result['budget_ms']:.0f} ms)"
+            )
+            if result["forbidden_imports"]:
+                print(f"  loads lazy-only dependencies: {result['forbidden_imports']}")
+            for entry in result["heaviest"]:
+                print(
+                    f"  {entry['self_ms']:8.1f} ms self {entry['cumulative_ms']:8.1f} ms "
+                    f"cumulative  {entry['module']}"
+                )
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Retrieval recall and latency benchmark across Weaviate vector index settings.
+
+Loads the clue corpus (with its precomputed vectors) into a scratch
+collection per build setting, using scripts/setup_weaviate.py: HNSW
+maxConnections x efConstruction, or a flat index, x compression (none, PQ or
+BQ). Then, for each query-time ef and each `limit`, it runs held-out corpus
+queries (see src/retrieval_eval.py) through WeaviateClient.query_collection
+and reports recall@limit, MRR and p50/p99 latency as a comparison table, plus
+ANN recall (overlap with an exact brute-force search over the same vectors;
+vector mode only), load time and estimated index memory. Query embeddings are
+computed once up front, so latencies compare the index rather than the
+embedding model (see scripts/bench_embeddings.py for that).
+
+Scratch collections are dropped afterwards unless --keep is given. Requires
+a running Weaviate and a corpus JSON with vectors.
+
+Usage:
+    python scripts/bench_retrieval.py
+    python scripts/bench_retrieval.py --max-connections 16,32 --ef 32,64,128 --compression none,bq
+    python scripts/bench_retrieval.py --index-types hnsw,flat --compression none,bq
+    python scripts/bench_retrieval.py --limits 5,10 --mode hybrid --output .cache/bench_retrieval.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+# Add the project root to Python path so 'src' module can be found
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from scripts.setup_weaviate import (  # noqa: E402
+    COMPRESSIONS,
+    KEY_VECTOR,
+    enable_pq,
+    estimate_memory,
+    import_data,
+    make_collection,
+    pq_segments,
+    vector_index_config,
+)
+from src.retrieval_eval import (  # noqa: E402
+    EvalQuery,
+    build_query_set,
+    clue_key,
+    evaluate,
+)
+
+INDEX_TYPES = ("hnsw", "flat")
+
+
+class ExactNeighbors:
+    """Brute-force cosine top-k over the corpus vectors: the ANN recall baseline."""
+
+    def __init__(self, rows: List[Dict[str, Any]]):
+        import numpy as np
+
+        vectors = np.asarray([row[KEY_VECTOR] for row in rows], dtype=np.float32)
+        self.vectors = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+        self.keys = [clue_key(row["clue"], row["answer"]) for row in rows]
+
+    def ranked(self, embedding, limit: int) -> List[Tuple[str, str]]:
+        """Keys of the `limit` nearest vectors, nearest first."""
+        import numpy as np
+
+        scores = self.vectors @ (embedding / np.linalg.norm(embedding))
+        limit = min(limit, len(self.keys))
+        nearest = np.argpartition(-scores, limit - 1)[:limit]
+        return [self.keys[i] for i in nearest[np.argsort(-scores[nearest])]]
+
+
+class MemoizedEncoder:
+    """Stands in for the embedding model with embeddings computed up front."""
+
+    def __init__(self, model, texts: List[str]):
+        self._embeddings = {text: model.encode(text) for text in set(texts)}
+
+    def encode(self, text: str):
+        return self._embeddings[text]
+
+
+def int_list(value: str) -> List[int]:
+    # "dynamic" is Weaviate's ef=-1: ef scales with the limit
+    return [
+        -1 if part.strip() == "dynamic" else int(part)
+        for part in value.split(",")
+        if part.strip()
+    ]
+
+
+def build_collection(
+    client,
+    name: str,
+    rows: List[Dict[str, Any]],
+    index_type: str,
+    max_connections: Optional[int],
+    ef_construction: Optional[int],
+    compression: str,
+) -> Tuple[float, Dict[str, float]]:
+    """Create and load one scratch collection; returns load seconds and memory estimate."""
+    if index_type == "hnsw":
+        index_config = vector_index_config(
+            "hnsw", ef_construction, max_connections, -1, compression
+        )
+    else:
+        index_config = vector_index_config(index_type, compression=compression)
+    make_collection(client, name, index_config)
+
+    started_at = time.perf_counter()
+    count = import_data(client, rows, name)
+    if compression == "pq":
+        enable_pq(client, count, name)
+    load_s = time.perf_counter() - started_at
+    # Let compression and index housekeeping settle before timing queries
+    time.sleep(2)
+    memory = estimate_memory(
+        count,
+        len(rows[0][KEY_VECTOR]),
+        index_type=index_type,
+        max_connections=max_connections or 0,
+        compression=compression,
+        pq_segments=pq_segments(client, name) if compression == "pq" else 0,
+    )
+    return load_s, memory
+
+
+def set_ef(collection, ef: int) -> None:
+    from weaviate.classes.config import Reconfigure
+
+    collection.config.update(
+        vector_config=Reconfigure.Vectors.update(
+            name="default", vector_index_config=Reconfigure.VectorIndex.hnsw(ef=ef)
+        )
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--corpus",
+        default=os.getenv("JSON_PATH", "scripts/data/clues.json"),
+        help="Clue corpus JSON with precomputed vectors",
+    )
+    parser.add_argument(
+        "--index-types", default="hnsw", help="Vector index types: hnsw, flat"
+    )
+    parser.add_argument(
+        "--max-connections", default="16,32", help="HNSW maxConnections"
+    )
+    parser.add_argument("--ef-construction", default="128", help="HNSW efConstruction")
+    parser.add_argument(
+        "--ef", default="dynamic,32,64,128", help="Query-time HNSW ef values"
+    )
+    parser.add_argument(
+        "--compression",
+        default=",".join(COMPRESSIONS),
+        help="Vector compression per build: none, pq, bq",
+    )
+    parser.add_argument(
+        "--limits",
+        default="5,10,20",
+        help="Result limits (the clue generator asks for 5)",
+    )
+    parser.add_argument("--mode", choices=["vector", "hybrid"], default="vector")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=13)
+    parser.add_argument("--prefix", default="RetrievalBench")
+    parser.add_argument("--keep", action="store_true", help="Keep scratch collections")
+    parser.add_argument("--output", help="Write JSON results to this path")
+    args = parser.parse_args()
+
+    compressions = [c.strip() for c in args.compression.split(",") if c.strip()]
+    index_types = [t.strip() for t in args.index_types.split(",") if t.strip()]
+    unknown = set(compressions) - set(COMPRESSIONS) | set(index_types) - set(
+        INDEX_TYPES
+    )
+    if unknown:
+        parser.error(f"unknown index type or compression {sorted(unknown)}")
+    # (index type, maxConnections, efConstruction, compression); flat has no
+    # graph parameters and doesn't support PQ
+    builds: List[Tuple[str, Optional[int], Optional[int], str]] = []
+    for index_type in index_types:
+        if index_type == "flat":
+            builds += [("flat", None, None, c) for c in compressions if c != "pq"]
+            continue
+        for max_connections in int_list(args.max_connections):
+            for ef_construction in int_list(args.ef_construction):
+                builds += [
+                    ("hnsw", max_connections, ef_construction, c) for c in compressions
+                ]
+    if not os.path.exists(args.corpus):
+        print(f"❌ Clue corpus not found at {args.corpus}", file=sys.stderr)
+        return 1
+    with open(args.corpus, "r", encoding="utf-8") as f:
+        rows = [
+            row
+            for row in json.load(f)
+            if isinstance(row, dict)
+            and row.get("clue")
+            and row.get("answer")
+            and row.get(KEY_VECTOR)
+        ]
+    queries = build_query_set(rows, args.queries, seed=args.seed)
+    if not queries:
+        print("❌ No answers with two or more clues in the corpus", file=sys.stderr)
+        return 1
+
+    from src.weaviate_client import WeaviateClient
+
+    client = WeaviateClient()
+    client.embedding_model = MemoizedEncoder(
+        client.embedding_model, [query.text for query in queries]
+    )
+    limits = int_list(args.limits)
+    # Exact neighbours up front, so the brute-force search stays out of the timings
+    exact = ExactNeighbors(rows)
+    expected_by_text = {
+        query.text: exact.ranked(
+            client.embedding_model.encode(query.text), max(limits) + 1
+        )
+        for query in queries
+    }
+    results: Dict[str, Any] = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "objects": len(rows),
+        "queries": len(queries),
+        "mode": args.mode,
+        "runs": [],
+    }
+    print(
+        f"{'index':>5} {'M':>4} {'efC':>5} {'comp':>5} {'ef':>5} {'limit':>6} "
+        f"{'recall':>7} {'MRR':>7} {'ANN':>7} {'p50 ms':>8} {'p99 ms':>8} "
+        f"{'load s':>7} {'mem MB':>7}",
+        file=sys.stderr,
+    )
+    try:
+        for index_type, max_connections, ef_construction, compression in builds:
+            if index_type == "hnsw":
+                name = f"{args.prefix}_m{max_connections}_efc{ef_construction}_{compression}"
+            else:
+                name = f"{args.prefix}_{index_type}_{compression}"
+            load_s, memory = build_collection(
+                client.client,
+                name,
+                rows,
+                index_type,
+                max_connections,
+                ef_construction,
+                compression,
+            )
+            client.collection = client.client.collections.get(name)
+
+            overlaps: List[float] = []
+
+            def search(query: EvalQuery, limit: int) -> List[Tuple[str, str]]:
+                objects = client.query_collection(
+                    query.text,
+                    limit=limit,
+                    mode=args.mode,
+                    reranker_model="",
+                    query_properties=query.query_properties,
+                )
+                keys = [
+                    clue_key(o.properties.get("clue"), o.properties.get("answer"))
+                    for o in objects
+                ]
+                if args.mode == "vector":
+                    expected = set(expected_by_text[query.text][:limit])
+                    overlaps.append(len(expected.intersection(keys)) / len(expected))
+                return keys
+
+            # ef only applies to HNSW
+            for ef in int_list(args.ef) if index_type == "hnsw" else [None]:
+                if ef is not None:
+                    set_ef(client.collection, ef)
+                evaluate(search, queries[:3], limits[0])  # warm up
+                for limit in limits:
+                    overlaps.clear()
+                    result = evaluate(search, queries, limit)
+                    run = {
+                        "index_type": index_type,
+                        "max_connections": max_connections,
+                        "ef_construction": ef_construction,
+                        "compression": compression,
+                        "ef": ef,
+                        "limit": limit,
+                        "recall": result["all"][f"recall@{limit}"],
+                        "mrr": result["all"]["mrr"],
+                        "ann_recall": (
+                            round(statistics.mean(overlaps), 4) if overlaps else None
+                        ),
+                        "latency_ms": result["latency_ms"],
+                        "load_s": round(load_s, 2),
+                        "memory_mb": memory["total_mb"],
+                    }
+                    results["runs"].append(run)
+                    ann = "-" if not overlaps else f"{run['ann_recall']:.4f}"
+                    print(
+                        f"{index_type:>5} {max_connections or '-':>4} "
+                        f"{ef_construction or '-':>5} {compression:>5} "
+                        f"{'-' if ef is None else ef:>5} {limit:>6} "
+                        f"{run['recall']:>7.4f} {run['mrr']:>7.4f} {ann:>7} "
+                        f"{run['latency_ms']['p50']:>8.2f} {run['latency_ms']['p99']:>8.2f} "
+                        f"{run['load_s']:>7.2f} {run['memory_mb']:>7.1f}",
+                        file=sys.stderr,
+                    )
+            if not args.keep:
+                client.client.collections.delete(name)
+    finally:
+        client.client.close()
+
+    payload = json.dumps(results, indent=2)
+    if args.output:
+        directory = os.path.dirname(args.output)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(payload)
+    else:
+        print(payload)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Build the answer index used to fill open grid slots with real NYT answers.
+
+Reads (answer, clue, year) rows from the clue corpus JSON (the same file
+setup_weaviate.py imports) or straight from the Weaviate collection, and writes
+the memory-mapped per-length arrays and letter-at-position bitsets of
+src/crossword/answer_index.py.
+
+Usage:
+    python scripts/build_answer_index.py
+    python scripts/build_answer_index.py --json scripts/data/clues.json --output .cache/answer_index
+    python scripts/build_answer_index.py --from-weaviate
+    python scripts/build_answer_index.py --query "??R??"
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Iterator, Optional, Tuple
+
+# Add the project root to Python path so 'src' module can be found
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+Row = Tuple[str, str, Optional[int]]
+
+
+def rows_from_json(path: str) -> Iterator[Row]:
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if not isinstance(data, list):
+        raise ValueError("Expected JSON file to contain a list of objects")
+    for obj in data:
+        yield obj.get("answer") or "", obj.get("clue") or "", obj.get("year")
+
+
+def rows_from_weaviate() -> Iterator[Row]:
+    import weaviate
+
+    from src.settings import settings
+
+    # No embedding model needed, so skip WeaviateClient
+    client = weaviate.connect_to_local(
+        host=settings.weaviate_host, port=settings.weaviate_port
+    )
+    try:
+        collection = client.collections.get(settings.collection_name)
+        for obj in collection.iterator(return_properties=["answer", "clue", "year"]):
+            props = obj.properties
+            yield props.get("answer") or "", props.get("clue") or "", props.get("year")
+    finally:
+        client.close()
+
+
+def main() -> int:
+    from src.settings import settings
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--json",
+        default=os.getenv("JSON_PATH", "scripts/data/clues.json"),
+        help="Clue corpus JSON (list of objects with answer/clue/year)",
+    )
+    parser.add_argument(
+        "--from-weaviate", action="store_true", help="Read rows from Weaviate instead"
+    )
+    parser.add_argument(
+        "--output",
+        default=settings.answer_index_path,
+        help="Index directory (default: ANSWER_INDEX_PATH)",
+    )
+    parser.add_argument("--query", help="Print matches for a pattern after building")
+    args = parser.parse_args()
+
+    from src.crossword.answer_index import AnswerIndex
+
+    if not args.from_weaviate and not os.path.exists(args.json):
+        parser.error(f"JSON file not found at {args.json}")
+    rows = rows_from_weaviate() if args.from_weaviate else rows_from_json(args.json)
+
+    started_at = time.perf_counter()
+    index = AnswerIndex.build(rows, args.output)
+    elapsed = time.perf_counter() - started_at
+    size = sum(
+        os.path.getsize(os.path.join(args.output, name))
+        for name in os.listdir(args.output)
+    )
+    print(
+        f"Indexed {len(index)} answers "
+        f"({', '.join(f'{n}x{length}' for length, n in sorted(index.counts.items()))}) "
+        f"in {elapsed:.1f}s, {size / 1e6:.1f} MB at {args.output}"
+    )
+
+    if args.query:
+        for answer in index.match(args.query, limit=20):
+            print(f"  {answer}: {' | '.join(index.clues(answer))}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Offline quality and latency evaluation of clue example retrieval modes.
+
+Builds held-out queries from the clue corpus JSON (see src/retrieval_eval.py:
+an answer used as a one-word topic, or one of its clues, should retrieve the
+other clues for that answer; answer queries aren't keyword-matched against
+the answer property, which holds the query itself) and runs them through
+WeaviateClient.query_collection under each retrieval config. Reports
+recall@k, MRR and p50/p99 latency per config, so alpha, the reranker and
+filters can be picked on quality per millisecond.
+
+Configs are "vector", "hybrid:<alpha>", and either with "+rerank" (uses
+--reranker). Requires a running Weaviate loaded by scripts/setup_weaviate.py.
+
+Usage:
+    python scripts/eval_retrieval.py
+    python scripts/eval_retrieval.py --configs vector,hybrid:0.3,hybrid:0.3+rerank \
+        --reranker cross-encoder/ms-marco-MiniLM-L6-v2
+    python scripts/eval_retrieval.py --min-year 2024 --max-answer-length 10 --k 10
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+# Add the project root to Python path so 'src' module can be found
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.retrieval_eval import (  # noqa: E402
+    EvalQuery,
+    build_query_set,
+    clue_key,
+    evaluate,
+)
+
+DEFAULT_CONFIGS = "vector,hybrid:0.25,hybrid:0.5,hybrid:0.75"
+
+
+def parse_config(config: str) -> Tuple[str, Optional[float], bool]:
+    """Parse "hybrid:0.5+rerank" into ("hybrid", 0.5, True)."""
+    base, _, rerank = config.partition("+")
+    mode, _, alpha = base.partition(":")
+    if rerank and rerank != "rerank":
+        raise ValueError(f"Unknown config suffix in {config!r}")
+    return mode, float(alpha) if alpha else None, bool(rerank)
+
+
+def in_bounds(row: Dict[str, Any], args: argparse.Namespace) -> bool:
+    """Whether a corpus row passes the same filters the queries push down."""
+    year, answer = row.get("year"), str(row.get("answer") or "")
+    if args.min_year is not None and (year is None or year < args.min_year):
+        return False
+    if args.max_year is not None and (year is None or year > args.max_year):
+        return False
+    if args.min_answer_length is not None and len(answer) < args.min_answer_length:
+        return False
+    if args.max_answer_length is not None and len(answer) > args.max_answer_length:
+        return False
+    return True
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--corpus",
+        default=os.getenv("JSON_PATH", "scripts/data/clues.json"),
+        help="Clue corpus JSON the collection was loaded from",
+    )
+    parser.add_argument(
+        "--configs",
+        default=DEFAULT_CONFIGS,
+        help="Comma-separated retrieval configs, e.g. vector,hybrid:0.5+rerank",
+    )
+    parser.add_argument("--reranker", help="Cross-encoder model for +rerank configs")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument(
+        "--k", type=int, default=5, help="Results per query (the clue generator uses 5)"
+    )
+    parser.add_argument("--seed", type=int, default=13)
+    parser.add_argument("--min-year", type=int)
+    parser.add_argument("--max-year", type=int)
+    parser.add_argument("--min-answer-length", type=int)
+    parser.add_argument("--max-answer-length", type=int)
+    parser.add_argument("--output", help="Write JSON results to this path")
+    args = parser.parse_args()
+
+    configs = [c.strip() for c in args.configs.split(",") if c.strip()]
+    parsed = {config: parse_config(config) for config in configs}
+    if any(rerank for _, _, rerank in parsed.values()) and not args.reranker:
+        parser.error("+rerank configs need --reranker")
+    if not os.path.exists(args.corpus):
+        print(f"❌ Clue corpus not found at {args.corpus}", file=sys.stderr)
+        return 1
+
+    with open(args.corpus, "r", encoding="utf-8") as f:
+        rows = [row for row in json.load(f) if isinstance(row, dict)]
+    queries = build_query_set(
+        (row for row in rows if in_bounds(row, args)), args.queries, seed=args.seed
+    )
+    if not queries:
+        print("❌ No answers with two or more clues in the corpus", file=sys.stderr)
+        return 1
+
+    from src.settings import settings
+    from src.weaviate_client import WeaviateClient
+
+    client = WeaviateClient()
+    filters = {
+        "min_year": args.min_year,
+        "max_year": args.max_year,
+        "min_answer_length": args.min_answer_length,
+        "max_answer_length": args.max_answer_length,
+    }
+    results: Dict[str, Any] = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "embedding_model": settings.embedding_model,
+        "embedding_backend": settings.embedding_backend,
+        "reranker": args.reranker,
+        "queries": len(queries),
+        "k": args.k,
+        "filters": {
+            name: value for name, value in filters.items() if value is not None
+        },
+        "configs": {},
+    }
+    recall_key = f"recall@{args.k}"
+    print(
+        f"{'config':<22} {recall_key:>9} {'MRR':>7} {'answer R':>9} {'clue R':>7} "
+        f"{'p50 ms':>8} {'p99 ms':>8}",
+        file=sys.stderr,
+    )
+    try:
+        for config, (mode, alpha, rerank) in parsed.items():
+
+            def search(query: EvalQuery, limit: int) -> List[Tuple[str, str]]:
+                objects = client.query_collection(
+                    query.text,
+                    limit=limit,
+                    mode=mode,
+                    alpha=alpha,
+                    reranker_model=args.reranker if rerank else "",
+                    query_properties=query.query_properties,
+                    **filters,
+                )
+                return [
+                    clue_key(o.properties.get("clue"), o.properties.get("answer"))
+                    for o in objects
+                ]
+
+            # Warm up: model loads and first-query setup stay out of the latencies
+            evaluate(search, queries[:3], args.k)
+            result = evaluate(search, queries, args.k)
+            results["configs"][config] = result
+            print(
+                f"{config:<22} {result['all'][recall_key]:>9.4f} "
+                f"{result['all']['mrr']:>7.4f} "
+                f"{result.get('answer', {}).get(recall_key, 0):>9.4f} "
+                f"{result.get('clue', {}).get(recall_key, 0):>7.4f} "
+                f"{result['latency_ms']['p50']:>8.2f} {result['latency_ms']['p99']:>8.2f}",
+                file=sys.stderr,
+            )
+    finally:
+        client.client.close()
+
+    payload = json.dumps(results, indent=2)
+    if args.output:
+        directory = os.path.dirname(args.output)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(payload)
+    else:
+        print(payload)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
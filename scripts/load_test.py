@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Load generator for the clue and chat endpoints.
+
+Drives the FastAPI app with concurrent requests and reports throughput,
+p50/p95/p99 latency and error rates per endpoint. By default the app runs
+in-process with the Anthropic API replaced by the cassette replay stub
+(LLM_TRANSPORT=replay), so runs are deterministic and cost nothing. Point
+--base-url at a running server to load-test a real deployment instead.
+
+The in-process app uses the normal scheduler settings, so raise e.g.
+LLM_REQUESTS_PER_MINUTE to measure the app rather than the rate limiter.
+
+Usage:
+    python scripts/load_test.py --requests 200 --concurrency 20
+    python scripts/load_test.py --latency lognormal:1.2,0.4 --scenario mixed
+    python scripts/load_test.py --base-url http://localhost:8000 --duration 60
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+# Add the project root to Python path so 'api' module can be found
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.metrics import percentile  # noqa: E402
+
+SCENARIOS = {
+    "clues": {"clues": 1.0},
+    "chat": {"chat": 1.0},
+    "mixed": {"clues": 0.3, "chat": 0.7},
+}
+
+
+def build_request(endpoint: str, topic: Optional[str]) -> Tuple[str, Dict[str, Any]]:
+    if endpoint == "clues":
+        return "/api/clues/generate", {
+            "topic_str": topic,
+            "difficulty": random.choice(["Easy", "Medium", "Hard"]),
+            "num_clues": 20,
+        }
+    return "/api/chat/generate", {
+        "user_input": "Can I get a nudge on this one?",
+        "clue": {"clue": "Sandwich cookie", "answer": "OREO"},
+        "chat_type": "Get a Hint",
+        "historical_messages": [],
+    }
+
+
+async def run_load(
+    client: httpx.AsyncClient,
+    scenario: Dict[str, float],
+    concurrency: int,
+    total_requests: Optional[int],
+    duration: Optional[float],
+    topic: Optional[str],
+) -> Tuple[Dict[str, List[Tuple[float, int]]], float]:
+    results: Dict[str, List[Tuple[float, int]]] = defaultdict(list)
+    endpoints, weights = zip(*scenario.items())
+    issued = 0
+    started_at = time.perf_counter()
+    stop_at = started_at + duration if duration else None
+
+    def next_endpoint() -> Optional[str]:
+        nonlocal issued
+        if total_requests is not None and issued >= total_requests:
+            return None
+        if stop_at is not None and time.perf_counter() >= stop_at:
+            return None
+        issued += 1
+        return random.choices(endpoints, weights=weights)[0]
+
+    async def worker():
+        while (endpoint := next_endpoint()) is not None:
+            path, payload = build_request(endpoint, topic)
+            request_started = time.perf_counter()
+            try:
+                response = await client.post(path, json=payload)
+                status = response.status_code
+            except httpx.HTTPError:
+                status = 0  # transport error / client timeout
+            results[endpoint].append((time.perf_counter() - request_started, status))
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return results, time.perf_counter() - started_at
+
+
+def summarize(
+    results: Dict[str, List[Tuple[float, int]]], elapsed: float
+) -> Dict[str, Any]:
+    summary: Dict[str, Any] = {"elapsed_s": round(elapsed, 3), "endpoints": {}}
+    all_samples = [s for samples in results.values() for s in samples]
+    for name, samples in [("all", all_samples), *sorted(results.items())]:
+        latencies = [latency for latency, _ in samples]
+        statuses = Counter(status for _, status in samples)
+        errors = sum(
+            count for status, count in statuses.items() if not 200 <= status < 300
+        )
+        summary["endpoints"][name] = {
+            "requests": len(samples),
+            "throughput_rps": round(len(samples) / elapsed, 2) if elapsed else 0.0,
+            "error_rate": round(errors / len(samples), 4) if samples else 0.0,
+            "status_codes": {str(k): v for k, v in sorted(statuses.items())},
+            "latency_ms": {
+                "mean": round(statistics.mean(latencies) * 1000, 1)
+                if latencies
+                else 0.0,
+                "p50": round(percentile(latencies, 50) * 1000, 1),
+                "p95": round(percentile(latencies, 95) * 1000, 1),
+                "p99": round(percentile(latencies, 99) * 1000, 1),
+                "max": round(max(latencies, default=0.0) * 1000, 1),
+            },
+        }
+    return summary
+
+
+def print_summary(summary: Dict[str, Any]) -> None:
+    print(f"Elapsed: {summary['elapsed_s']}s")
+    print(
+        f"{'endpoint':<8} {'reqs':>6} {'rps':>8} {'err%':>6} "
+        f"{'p50ms':>8} {'p95ms':>8} {'p99ms':>8}  status codes"
+    )
+    for name, stats in summary["endpoints"].items():
+        latency = stats["latency_ms"]
+        print(
+            f"{name:<8} {stats['requests']:>6} {stats['throughput_rps']:>8.2f} "
+            f"{stats['error_rate'] * 100:>6.1f} {latency['p50']:>8.1f} "
+            f"{latency['p95']:>8.1f} {latency['p99']:>8.1f}  {stats['status_codes']}"
+        )
+
+
+async def main_async(args: argparse.Namespace) -> Dict[str, Any]:
+    if args.base_url:
+        transport = None
+        base_url = args.base_url
+    else:
+        # Configure the replay stub before the app (and its settings) are imported
+        os.environ.setdefault("LLM_TRANSPORT", "replay")
+        if args.latency:
+            os.environ["LLM_REPLAY_LATENCY"] = args.latency
+        if args.cassette:
+            os.environ["LLM_CASSETTE_PATH"] = args.cassette
+        from api.main import app
+
+        transport = httpx.ASGITransport(app=app)
+        base_url = "http://load-test"
+
+    async with httpx.AsyncClient(
+        transport=transport, base_url=base_url, timeout=args.timeout
+    ) as client:
+        results, elapsed = await run_load(
+            client,
+            SCENARIOS[args.scenario],
+            args.concurrency,
+            args.requests if not args.duration else None,
+            args.duration,
+            args.topic,
+        )
+    return summarize(results, elapsed)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--base-url", help="Target a running server instead of in-process"
+    )
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="mixed")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--duration", type=float, help="Run for N seconds instead")
+    parser.add_argument(
+        "--latency",
+        help="Replay latency distribution, e.g. fixed:0.5, uniform:0.2,1.5, lognormal:1.2,0.4",
+    )
+    parser.add_argument("--cassette", help="Cassette JSONL to replay")
+    parser.add_argument(
+        "--topic",
+        help="Topic for clue requests (needs Weaviate for clue examples)",
+    )
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--json", action="store_true", help="Emit JSON summary")
+    args = parser.parse_args()
+
+    summary = asyncio.run(main_async(args))
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print_summary(summary)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
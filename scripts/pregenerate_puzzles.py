@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Offline bulk puzzle pre-generation via the Anthropic Message Batches API.
+
+Builds a ClueGenerator prompt for every (topic, difficulty, copy), submits them
+as one message batch (half the price of interactive calls, no rate-limit
+pressure on the API server), polls until the batch ends, validates each
+tool-use result like the interactive path, builds the grid and stores the
+puzzle in the local puzzle store.
+
+Run with --replay to exercise the whole flow against the cassette stub of the
+batch endpoints (no API key, no cost).
+
+Usage:
+    python scripts/pregenerate_puzzles.py --topics "space,jazz,baseball"
+    python scripts/pregenerate_puzzles.py --topics-file topics.txt --copies 3
+    python scripts/pregenerate_puzzles.py --topics space --replay --no-examples
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from typing import Dict, List, Tuple
+
+# Add the project root to Python path so 'src' module can be found
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+DIFFICULTIES = ["Easy", "Medium", "Hard"]
+
+# (topic, difficulty) of each batch request, keyed by custom_id
+RequestSpec = Tuple[str, str]
+
+
+def read_topics(args: argparse.Namespace) -> List[str]:
+    topics = [t.strip() for t in (args.topics or "").split(",") if t.strip()]
+    if args.topics_file:
+        with open(args.topics_file, "r", encoding="utf-8") as f:
+            topics.extend(line.strip() for line in f if line.strip())
+    return list(dict.fromkeys(topics))
+
+
+def custom_id(index: int, topic: str, difficulty: str) -> str:
+    # custom_id must match ^[a-zA-Z0-9_-]{1,64}$
+    slug = re.sub(r"[^a-zA-Z0-9]+", "-", topic).strip("-").lower()[:40]
+    return f"{index:05d}-{difficulty.lower()}-{slug or 'any'}"
+
+
+def build_requests(
+    generator, topics: List[str], difficulties: List[str], copies: int, args
+) -> Tuple[List[dict], Dict[str, RequestSpec]]:
+    requests, specs = [], {}
+    for topic in topics:
+        for difficulty in difficulties:
+            prompt = generator.build_prompt(
+                topic, difficulty, args.num_clues, with_examples=not args.no_examples
+            )
+            params = generator.message_params(prompt)
+            for _ in range(copies):
+                cid = custom_id(len(requests), topic, difficulty)
+                requests.append({"custom_id": cid, "params": params})
+                specs[cid] = (topic, difficulty)
+    return requests, specs
+
+
+def wait_for_batch(batches, batch_id: str, poll_interval: float, max_wait: float):
+    deadline = time.monotonic() + max_wait
+    while True:
+        batch = batches.retrieve(batch_id)
+        counts = batch.request_counts
+        print(
+            f"  {batch.processing_status}: {counts.processing} processing, "
+            f"{counts.succeeded} succeeded, {counts.errored} errored"
+        )
+        if batch.processing_status == "ended":
+            return batch
+        if time.monotonic() >= deadline:
+            raise TimeoutError(f"Batch {batch_id} did not end within {max_wait}s")
+        time.sleep(poll_interval)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--topics", help="Comma-separated topics")
+    parser.add_argument("--topics-file", help="File with one topic per line")
+    parser.add_argument(
+        "--difficulties", default="Medium", help=f"Comma-separated, of {DIFFICULTIES}"
+    )
+    parser.add_argument(
+        "--copies", type=int, default=1, help="Puzzles per topic/difficulty"
+    )
+    parser.add_argument("--num-clues", type=int, default=30)
+    parser.add_argument("--model", help="Claude model (default: first known model)")
+    parser.add_argument("--poll-interval", type=float, default=30.0)
+    parser.add_argument("--max-wait", type=float, default=24 * 3600.0)
+    parser.add_argument("--batch-id", help="Collect results of an existing batch")
+    parser.add_argument(
+        "--store", help="Puzzle store path (default: PUZZLE_STORE_PATH)"
+    )
+    parser.add_argument(
+        "--no-examples", action="store_true", help="Skip Weaviate clue examples"
+    )
+    parser.add_argument(
+        "--replay", action="store_true", help="Use the local cassette stub of the API"
+    )
+    args = parser.parse_args()
+
+    if args.replay:
+        os.environ["LLM_TRANSPORT"] = "replay"
+        os.environ.setdefault("LLM_REPLAY_LATENCY", "fixed:0")
+
+    # Imported after the transport is configured, since settings read the env once
+    from api.constants import get_cached_claude_models
+    from src.crossword.clue_generator import ClueGenerator
+    from src.crossword.crossword_generator import CrosswordGenerator
+    from src.puzzle_store import PuzzleStore, get_puzzle_store
+
+    difficulties = [d.strip() for d in args.difficulties.split(",") if d.strip()]
+    unknown = set(difficulties) - set(DIFFICULTIES)
+    if unknown:
+        parser.error(f"Unknown difficulties: {sorted(unknown)}")
+
+    generator = ClueGenerator(model=args.model or get_cached_claude_models()[0])
+    batches = generator.llm_client.anthropic_client.messages.batches
+    store = PuzzleStore(args.store) if args.store else get_puzzle_store()
+
+    if args.batch_id:
+        # Results carry only custom_ids; topic/difficulty were saved at submit time
+        specs_path = os.path.join(os.path.dirname(store.path), f"{args.batch_id}.json")
+        with open(specs_path, "r", encoding="utf-8") as f:
+            specs = {cid: tuple(spec) for cid, spec in json.load(f).items()}
+        batch_id = args.batch_id
+    else:
+        topics = read_topics(args)
+        if not topics:
+            parser.error("Provide --topics or --topics-file")
+        requests, specs = build_requests(
+            generator, topics, difficulties, args.copies, args
+        )
+        batch = batches.create(requests=requests)
+        batch_id = batch.id
+        specs_path = os.path.join(os.path.dirname(store.path), f"{batch_id}.json")
+        with open(specs_path, "w", encoding="utf-8") as f:
+            json.dump(specs, f)
+        print(f"Submitted batch {batch_id} with {len(requests)} requests")
+
+    wait_for_batch(batches, batch_id, args.poll_interval, args.max_wait)
+
+    stored, failed = set(), 0
+    for item in batches.results(batch_id):
+        topic, difficulty = specs.get(item.custom_id, (None, None))
+        if item.result.type != "succeeded":
+            print(f"  {item.custom_id}: {item.result.type}")
+            failed += 1
+            continue
+        clue_response = ClueGenerator.parse_tool_response(item.result.message)
+        if not clue_response or not clue_response.clues:
+            print(f"  {item.custom_id}: no valid clues in tool output")
+            failed += 1
+            continue
+        try:
+            grid, placements = CrosswordGenerator(clue_response.clues).generate_grid()
+        except ValueError as e:
+            print(f"  {item.custom_id}: {e}")
+            failed += 1
+            continue
+        pid = store.save(
+            clue_response.clues,
+            grid,
+            [vars(p) for p in placements],
+            topic=topic,
+            difficulty=difficulty,
+            model=item.result.message.model,
+            source="batch",
+        )
+        stored.add(pid)
+
+    # Identical puzzles share a content hash, so duplicates are stored once
+    print(f"Stored {len(stored)} distinct puzzles ({failed} failed) in {store.path}")
+    return 0 if stored or not failed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
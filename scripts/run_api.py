@@ -2,6 +2,7 @@
 """
 Script to run the FastAPI server locally.
 This will start the API server with hot-reload enabled for development.
+For production (multiple worker processes) use scripts/serve.py.
 """
 
 import os
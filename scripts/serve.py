@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Run the API in production with one worker process per core.
+
+Each worker is a full copy of the app with its own LLM clients, scheduler
+concurrency slots and caches of immutable data (stored puzzles, solution
+masks). State that must agree across workers goes through the shared state
+backend (STATE_BACKEND, see src/shared_state.py):
+
+- puzzle job records, so /api/jobs/* and the play socket work from any worker
+- LLM rate-limit windows, so the requests-per-minute budget is global
+- token usage and cost totals reported by /api/usage
+
+"sqlite" (the default) shares a file between the workers of one host;
+"redis" points every host at one Redis-protocol server (STATE_REDIS_URL);
+"memory" is per process and refused here with more than one worker.
+LLM_DEFAULT_CONCURRENCY / LLM_MODEL_CONCURRENCY stay per worker, and
+/metrics reports the worker that served the scrape.
+
+Workers run under uvicorn's process supervisor, or under gunicorn with
+--server gunicorn (requires gunicorn and uvicorn-worker). For development
+with hot reload use scripts/run_api.py.
+
+Usage:
+    python scripts/serve.py
+    python scripts/serve.py --workers 8 --port 8080
+    STATE_BACKEND=redis STATE_REDIS_URL=redis://cache:6379/0 python scripts/serve.py
+    python scripts/serve.py --server gunicorn --workers 4
+"""
+
+import argparse
+import os
+import shutil
+import sys
+
+# Add the project root to Python path so 'api' module can be found
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+
+def run_uvicorn(args: argparse.Namespace) -> int:
+    import uvicorn
+
+    uvicorn.run(
+        "api.main:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        log_level=args.log_level,
+        proxy_headers=True,
+        timeout_graceful_shutdown=args.graceful_timeout,
+    )
+    return 0
+
+
+def run_gunicorn(args: argparse.Namespace) -> int:
+    if shutil.which("gunicorn") is None:
+        print("❌ gunicorn is not installed", file=sys.stderr)
+        return 1
+    try:
+        import uvicorn_worker  # noqa: F401
+
+        worker_class = "uvicorn_worker.UvicornWorker"
+    except ImportError:
+        worker_class = "uvicorn.workers.UvicornWorker"
+    # Replace this process so gunicorn receives signals directly
+    os.execvp(
+        "gunicorn",
+        [
+            "gunicorn",
+            "api.main:app",
+            "--worker-class",
+            worker_class,
+            "--workers",
+            str(args.workers),
+            "--bind",
+            f"{args.host}:{args.port}",
+            "--log-level",
+            args.log_level,
+            "--graceful-timeout",
+            str(args.graceful_timeout),
+            # Puzzle generation can hold a request for minutes
+            "--timeout",
+            "300",
+        ],
+    )
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Worker processes (default: one per CPU)",
+    )
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--server", choices=["uvicorn", "gunicorn"], default="uvicorn")
+    parser.add_argument("--log-level", default="info")
+    parser.add_argument(
+        "--graceful-timeout",
+        type=int,
+        default=30,
+        help="Seconds to let in-flight requests finish on shutdown",
+    )
+    parser.add_argument(
+        "--state-backend",
+        choices=["sqlite", "redis", "memory"],
+        help="Override STATE_BACKEND for the workers",
+    )
+    args = parser.parse_args()
+
+    # Workers inherit the environment, so overrides must be set before they start
+    if args.state_backend:
+        os.environ["STATE_BACKEND"] = args.state_backend
+    # Grid building forks a process pool per worker; split the cores between them
+    if "GRID_WORKERS" not in os.environ:
+        os.environ["GRID_WORKERS"] = str(max(1, (os.cpu_count() or 1) // args.workers))
+
+    from src.settings import settings
+
+    if args.workers > 1 and settings.state_backend.lower() == "memory":
+        print(
+            "❌ STATE_BACKEND=memory keeps jobs, rate limits and usage per process; "
+            "use sqlite or redis with more than one worker",
+            file=sys.stderr,
+        )
+        return 1
+
+    print(
+        f"Starting Across the Board API: {args.workers} worker(s) on "
+        f"{args.host}:{args.port}, state backend {settings.state_backend}"
+    )
+    try:
+        if args.server == "gunicorn":
+            return run_gunicorn(args)
+        return run_uvicorn(args)
+    except KeyboardInterrupt:
+        print("\n👋 API server stopped")
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
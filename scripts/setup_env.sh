@@ -24,8 +24,38 @@ KEY_YEAR=year
 KEY_PUBID=pubid
 KEY_VECTOR=embedding_vector
 
+# Vector index (scripts/setup_weaviate.py): hnsw or flat, HNSW parameters,
+# and compression none/pq/bq
+VECTOR_INDEX_TYPE=hnsw
+HNSW_EF_CONSTRUCTION=128
+HNSW_MAX_CONNECTIONS=32
+HNSW_EF=-1
+VECTOR_COMPRESSION=none
+
 EMBEDDING_MODEL=Qwen/Qwen3-Embedding-0.6B
 
+# LLM scheduling (per-model concurrency, rate limit, load shedding)
+LLM_DEFAULT_CONCURRENCY=4
+LLM_MODEL_CONCURRENCY={"haiku": 8}
+LLM_REQUESTS_PER_MINUTE=50
+LLM_MAX_QUEUE_DEPTH=64
+
+# LLM call policy (seconds); set LLM_HEDGE_AFTER to race a cheaper model
+LLM_TIMEOUT=60
+LLM_DEADLINE=120
+LLM_MAX_RETRIES=3
+# LLM_HEDGE_AFTER=8
+
+# Anthropic transport: live, record or replay (replays LLM_CASSETTE_PATH locally)
+LLM_TRANSPORT=live
+LLM_CASSETTE_PATH=scripts/cassettes/anthropic.jsonl
+
+# Profiling hooks (sampling or deterministic); collapsed stacks go to PROFILING_DIR.
+# Set ADMIN_TOKEN to toggle profiling at runtime via /api/admin/profiling
+PROFILING_ENABLED=false
+PROFILING_MODE=sampling
+# ADMIN_TOKEN=change-me
+
 # Optionally point to a Streamlit app to launch after setup
 APP=streamlit_app/main.py
 
@@ -1,11 +1,13 @@
 import json
 import os
 import sys
-from typing import Any, Dict, Iterable, List
+import time
+import urllib.request
+from typing import Any, Dict, Iterable, List, Optional
 
 import weaviate
 import weaviate.classes as wvc
-from weaviate.classes.config import Configure, DataType, Property
+from weaviate.classes.config import Configure, DataType, Property, Reconfigure
 
 WEAVIATE_HOST = os.getenv("WEAVIATE_HOST", "localhost")
 WEAVIATE_PORT = int(os.getenv("WEAVIATE_PORT", "8080"))
@@ -19,6 +21,25 @@ KEY_YEAR = os.getenv("KEY_YEAR", "year")
 KEY_PUBID = os.getenv("KEY_PUBID", "pubid")
 KEY_VECTOR = os.getenv("KEY_VECTOR", "embedding_vector")  # <— BYO vector column
 
+# Vector index: "hnsw" (approximate, scales to the full corpus) or "flat"
+# (brute force, no graph to build or hold; fine for a few thousand clues).
+# HNSW defaults match Weaviate's; HNSW_EF=-1 lets ef scale with the limit.
+VECTOR_INDEX_TYPE = os.getenv("VECTOR_INDEX_TYPE", "hnsw")
+HNSW_EF_CONSTRUCTION = int(os.getenv("HNSW_EF_CONSTRUCTION", "128"))
+HNSW_MAX_CONNECTIONS = int(os.getenv("HNSW_MAX_CONNECTIONS", "32"))
+HNSW_EF = int(os.getenv("HNSW_EF", "-1"))
+# Vector compression: "none", "pq" (product quantization, HNSW only, trained
+# on the imported vectors) or "bq" (binary quantization)
+VECTOR_COMPRESSION = os.getenv("VECTOR_COMPRESSION", "none")
+PQ_SEGMENTS = int(os.getenv("PQ_SEGMENTS", "0"))  # 0 = Weaviate picks
+PQ_TRAINING_LIMIT = int(os.getenv("PQ_TRAINING_LIMIT", "100000"))
+# Prometheus endpoint (PROMETHEUS_MONITORING_ENABLED) for the measured heap
+WEAVIATE_METRICS_URL = os.getenv(
+    "WEAVIATE_METRICS_URL", "http://localhost:2112/metrics"
+)
+
+COMPRESSIONS = ("none", "pq", "bq")
+
 
 def read_json(path: str) -> Iterable[Dict[str, Any]]:
     with open(path, "r", encoding="utf-8") as f:
@@ -43,34 +64,91 @@ def validate_vector(vec: Any) -> List[float]:
     return out
 
 
-def make_collection(client: weaviate.WeaviateClient):
-    existing = [c for c in client.collections.list_all()]
-    print(f"Existing collections: {existing}")
-    if COLLECTION_NAME in existing:
-        client.collections.delete(COLLECTION_NAME)
+def vector_index_config(
+    index_type: str = VECTOR_INDEX_TYPE,
+    ef_construction: int = HNSW_EF_CONSTRUCTION,
+    max_connections: int = HNSW_MAX_CONNECTIONS,
+    ef: int = HNSW_EF,
+    compression: str = VECTOR_COMPRESSION,
+):
+    """Vector index settings for `make_collection`; PQ is enabled after import by `enable_pq`."""
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"Unknown vector compression: {compression!r}")
+    quantizer = Configure.VectorIndex.Quantizer.bq() if compression == "bq" else None
+    if index_type == "flat":
+        if compression == "pq":
+            raise ValueError("PQ needs an HNSW index; use bq with a flat index")
+        return Configure.VectorIndex.flat(quantizer=quantizer)
+    if index_type != "hnsw":
+        raise ValueError(f"Unknown vector index type: {index_type!r}")
+    return Configure.VectorIndex.hnsw(
+        ef_construction=ef_construction,
+        max_connections=max_connections,
+        ef=ef,
+        quantizer=quantizer,
+    )
+
+
+def make_collection(
+    client: weaviate.WeaviateClient,
+    name: str = COLLECTION_NAME,
+    index_config=None,
+):
+    if client.collections.exists(name):
+        print(f"Replacing existing collection '{name}'")
+        client.collections.delete(name)
 
     props = [
         Property(name="clue", data_type=DataType.TEXT),
         Property(name="answer", data_type=DataType.TEXT),
+        # Letters in the answer, so retrieval can filter by length
+        Property(name="answer_length", data_type=DataType.INT),
         Property(name="year", data_type=DataType.INT),
         Property(name="pubid", data_type=DataType.TEXT),
     ]
 
     # BYO vectors: disable vectorizer, declare self_provided
-    vector_cfg = Configure.Vectors.self_provided()
+    vector_cfg = Configure.Vectors.self_provided(
+        vector_index_config=index_config or vector_index_config()
+    )
 
     client.collections.create(
-        name=COLLECTION_NAME,
+        name=name,
         properties=props,
         vector_config=vector_cfg,
     )
 
 
+def enable_pq(
+    client: weaviate.WeaviateClient,
+    object_count: int,
+    name: str = COLLECTION_NAME,
+    segments: int = PQ_SEGMENTS,
+    training_limit: int = PQ_TRAINING_LIMIT,
+):
+    """
+    Turn on product quantization for an imported collection. Without async
+    indexing Weaviate can't train PQ on data that isn't there yet, so it is
+    switched on after import and trains on up to `training_limit` vectors.
+    """
+    quantizer = Reconfigure.VectorIndex.Quantizer.pq(
+        segments=segments or None,
+        training_limit=max(1, min(object_count, training_limit)),
+    )
+    client.collections.get(name).config.update(
+        vector_config=Reconfigure.Vectors.update(
+            name="default",
+            vector_index_config=Reconfigure.VectorIndex.hnsw(quantizer=quantizer),
+        )
+    )
+
+
 def import_data(
     client: weaviate.WeaviateClient,
     rows: Iterable[Dict[str, Any]],
+    name: str = COLLECTION_NAME,
 ) -> int:
-    coll = client.collections.get(COLLECTION_NAME)
+    coll = client.collections.get(name)
     batch: List[wvc.data.DataObject] = []
     count = 0
 
@@ -105,6 +183,7 @@ def import_data(
             properties={
                 "clue": clue,
                 "answer": answer,
+                "answer_length": len(answer),
                 "year": year,
                 "pubid": pubid,
             },
@@ -119,6 +198,85 @@ def import_data(
     return count
 
 
+def estimate_memory(
+    object_count: int,
+    dims: int,
+    index_type: str = VECTOR_INDEX_TYPE,
+    max_connections: int = HNSW_MAX_CONNECTIONS,
+    compression: str = VECTOR_COMPRESSION,
+    pq_segments: int = 0,
+) -> Dict[str, float]:
+    """
+    Rough in-memory size (MiB) of the vectors Weaviate searches over and of the
+    HNSW graph. Compressed collections keep full vectors on disk for rescoring.
+    """
+    if compression == "bq":
+        vector_bytes = (dims + 7) // 8
+    elif compression == "pq":
+        # One byte per segment (256 centroids)
+        vector_bytes = pq_segments or dims // 4
+    else:
+        vector_bytes = dims * 4
+    # Layer 0 holds up to 2 * maxConnections neighbour ids (uint64) per object
+    graph_bytes = 2 * max_connections * 8 if index_type == "hnsw" else 0
+    mib = 1024 * 1024
+    return {
+        "vectors_mb": round(object_count * vector_bytes / mib, 1),
+        "graph_mb": round(object_count * graph_bytes / mib, 1),
+        "total_mb": round(object_count * (vector_bytes + graph_bytes) / mib, 1),
+    }
+
+
+def weaviate_heap_mb() -> Optional[float]:
+    """Weaviate's Go heap in use, if its Prometheus endpoint is reachable."""
+    try:
+        with urllib.request.urlopen(WEAVIATE_METRICS_URL, timeout=2) as response:
+            for line in response.read().decode("utf-8").splitlines():
+                if line.startswith("go_memstats_heap_inuse_bytes "):
+                    return round(float(line.split()[1]) / (1024 * 1024), 1)
+    except OSError:
+        pass
+    return None
+
+
+def pq_segments(client: weaviate.WeaviateClient, name: str = COLLECTION_NAME) -> int:
+    """Segments PQ settled on (Weaviate picks a count when PQ_SEGMENTS is 0)."""
+    config = client.collections.get(name).config.get()
+    quantizer = config.vector_config["default"].vector_index_config.quantizer
+    return getattr(quantizer, "segments", 0) or 0
+
+
+def report_footprint(
+    client: weaviate.WeaviateClient,
+    object_count: int,
+    sample_vector: Optional[List[float]],
+    heap_before: Optional[float],
+):
+    if VECTOR_INDEX_TYPE == "hnsw":
+        index = (
+            f"hnsw (efConstruction={HNSW_EF_CONSTRUCTION}, "
+            f"maxConnections={HNSW_MAX_CONNECTIONS}, ef={HNSW_EF})"
+        )
+    else:
+        index = VECTOR_INDEX_TYPE
+    print(f"Vector index: {index}, compression: {VECTOR_COMPRESSION}")
+    if sample_vector is not None:
+        segments = pq_segments(client) if VECTOR_COMPRESSION == "pq" else 0
+        estimate = estimate_memory(
+            object_count, len(sample_vector), pq_segments=segments
+        )
+        print(
+            f"Estimated index memory: {estimate['total_mb']} MiB "
+            f"(vectors {estimate['vectors_mb']} MiB, graph {estimate['graph_mb']} MiB)"
+        )
+    heap_after = weaviate_heap_mb()
+    if heap_before is not None and heap_after is not None:
+        print(
+            f"Weaviate heap in use: {heap_after} MiB "
+            f"({heap_after - heap_before:+.1f} MiB during setup)"
+        )
+
+
 def demo_query(client: weaviate.WeaviateClient, sample_vector: List[float]):
     coll = client.collections.get(COLLECTION_NAME)
     print("\n=== Demo vector search ===")
@@ -132,6 +290,7 @@ def main() -> int:
     client = weaviate.connect_to_local(host=WEAVIATE_HOST, port=WEAVIATE_PORT)
 
     try:
+        heap_before = weaviate_heap_mb()
         make_collection(client)
 
         if not os.path.exists(JSON_PATH):
@@ -172,13 +331,20 @@ def main() -> int:
             for r in it:
                 yield r
 
+        started_at = time.perf_counter()
         total = import_data(client, all_rows())
-        print(f"Imported {total} objects into collection '{COLLECTION_NAME}'.")
-
-        import time
+        if VECTOR_COMPRESSION == "pq" and total:
+            enable_pq(client, total)
+        import_s = time.perf_counter() - started_at
+        print(
+            f"Imported {total} objects into collection '{COLLECTION_NAME}' "
+            f"in {import_s:.1f}s ({total / max(import_s, 1e-9):.0f} objects/s)."
+        )
 
         time.sleep(2)
 
+        report_footprint(client, total, sample_vector, heap_before)
+
         if sample_vector is not None:
             demo_query(client, sample_vector)
         print("\nSetup complete.")
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Local Redis stand-in speaking the subset of RESP used by the API's state backend.
+
+Serves the commands RedisBackend uses (GET, SET with PX/EX, DEL, INCR,
+PEXPIRE/EXPIRE, HINCRBYFLOAT, HGETALL) plus PING, AUTH, SELECT, FLUSHDB and
+QUIT, backed by an in-memory store (or a SQLite file with --sqlite). Point
+STATE_BACKEND=redis at it to exercise the Redis path of a multi-worker
+deployment or a test run without installing Redis.
+
+Usage:
+    python scripts/state_server.py --port 6390
+    STATE_BACKEND=redis STATE_REDIS_URL=redis://localhost:6390/0 python scripts/serve.py
+    python scripts/state_server.py --sqlite .cache/state-server.sqlite3
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+from typing import List, Optional
+
+# Add the project root to Python path so 'src' module can be found
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.shared_state import MemoryBackend, SQLiteBackend, StateBackend  # noqa: E402
+
+
+class CommandError(Exception):
+    pass
+
+
+def encode(value: object) -> bytes:
+    if value is None:
+        return b"$-1\r\n"
+    if isinstance(value, CommandError):
+        return f"-ERR {value}\r\n".encode("utf-8")
+    if isinstance(value, bool):
+        return b"+OK\r\n"
+    if isinstance(value, int):
+        return b":%d\r\n" % value
+    if isinstance(value, list):
+        return b"*%d\r\n" % len(value) + b"".join(encode(item) for item in value)
+    data = str(value).encode("utf-8")
+    return b"$%d\r\n%s\r\n" % (len(data), data)
+
+
+def execute(backend: StateBackend, args: List[str]) -> object:
+    """Run one command; True encodes as +OK."""
+    command, *rest = args
+    command = command.upper()
+    if command == "PING":
+        return rest[0] if rest else "PONG"
+    if command in ("AUTH", "SELECT", "QUIT"):
+        return True
+    if command == "GET":
+        return backend.get(rest[0])
+    if command == "SET":
+        key, value, *options = rest
+        ttl: Optional[float] = None
+        if len(options) == 2 and options[0].upper() in ("PX", "EX"):
+            ttl = float(options[1]) / (1000 if options[0].upper() == "PX" else 1)
+        elif options:
+            raise CommandError(f"unsupported SET options {options}")
+        backend.set(key, value, ttl=ttl)
+        return True
+    if command == "DEL":
+        existing = [key for key in rest if backend.get(key) is not None]
+        for key in rest:
+            backend.delete(key)
+        return len(existing)
+    if command == "INCR":
+        return backend.incr(rest[0])
+    if command in ("PEXPIRE", "EXPIRE"):
+        key, ttl = rest
+        if backend.get(key) is None:
+            return 0
+        backend.expire(key, float(ttl) / (1000 if command == "PEXPIRE" else 1))
+        return 1
+    if command == "HINCRBYFLOAT":
+        key, field, amount = rest
+        return repr(backend.hincrbyfloat(key, field, float(amount)))
+    if command == "HGETALL":
+        return [item for pair in backend.hgetall(rest[0]).items() for item in pair]
+    if command == "FLUSHDB":
+        backend.clear()
+        return True
+    raise CommandError(f"unknown command '{command}'")
+
+
+async def read_command(reader: asyncio.StreamReader) -> Optional[List[str]]:
+    line = await reader.readline()
+    if not line:
+        return None
+    if not line.startswith(b"*"):
+        # Inline command, e.g. from `nc` or redis-cli's PING
+        return line.decode("utf-8").split()
+    args = []
+    for _ in range(int(line[1:])):
+        length = int((await reader.readline())[1:])
+        args.append((await reader.readexactly(length + 2))[:-2].decode("utf-8"))
+    return args
+
+
+async def handle_client(
+    backend: StateBackend, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+) -> None:
+    try:
+        while True:
+            args = await read_command(reader)
+            if not args:
+                break
+            try:
+                reply = execute(backend, args)
+            except CommandError as e:
+                reply = e
+            except (ValueError, IndexError) as e:
+                reply = CommandError(f"wrong arguments for '{args[0]}': {e}")
+            writer.write(encode(reply))
+            await writer.drain()
+            if args[0].upper() == "QUIT":
+                break
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(backend: StateBackend, host: str, port: int) -> None:
+    server = await asyncio.start_server(
+        lambda r, w: handle_client(backend, r, w), host, port
+    )
+    print(f"State server listening on redis://{host}:{port}/0")
+    async with server:
+        await server.serve_forever()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6379)
+    parser.add_argument(
+        "--sqlite", help="Persist to this SQLite file instead of memory"
+    )
+    args = parser.parse_args()
+
+    backend = SQLiteBackend(args.sqlite) if args.sqlite else MemoryBackend()
+    try:
+        asyncio.run(serve(backend, args.host, args.port))
+    except KeyboardInterrupt:
+        print("\nState server stopped")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
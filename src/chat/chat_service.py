@@ -1,15 +1,17 @@
-import anthropic
+from typing import Iterator, Optional
 
 from api.constants import CHAT_TYPE
 from src.chat.prompts import HINT_SYSTEM_PROMPT, RESEARCH_SYSTEM_PROMPT
 from src.crossword.clue_generator import CrosswordClue
+from src.llm.client import LLMClient
+from src.llm.scheduler import Priority
 
 MAX_TOKENS = 8192
 
 
 class ChatService:
     def __init__(self, model: str):
-        self.anthropic_client = anthropic.Anthropic()
+        self.llm_client = LLMClient()
         self.model = model
 
     def generate_research_response(
@@ -17,12 +19,9 @@ class ChatService:
         user_input: str,
         historical_messages: list[dict] = [],
     ) -> str:
-        messages = historical_messages + [{"role": "user", "content": user_input}]
-        response = self.anthropic_client.messages.create(
-            model=self.model,
-            max_tokens=MAX_TOKENS,
-            system=RESEARCH_SYSTEM_PROMPT,
-            messages=messages,
+        response = self.llm_client.create_message(
+            priority=Priority.INTERACTIVE,
+            **self._message_params(user_input, None, None, historical_messages),
         )
         return response.content[0].text
 
@@ -33,15 +32,45 @@ class ChatService:
         type: str,
         historical_messages: list[dict] = [],
     ):
-        messages = historical_messages + [{"role": "user", "content": user_input}]
-        if type == CHAT_TYPE[1]:
-            prompt = RESEARCH_SYSTEM_PROMPT
-        else:
-            prompt = HINT_SYSTEM_PROMPT
-        response = self.anthropic_client.messages.create(
-            model=self.model,
-            max_tokens=MAX_TOKENS,
-            system=prompt.format(clue=clue),
-            messages=messages,
+        response = self.llm_client.create_message(
+            priority=Priority.INTERACTIVE,
+            **self._message_params(user_input, clue, type, historical_messages),
         )
         return response.content[0].text
+
+    def stream_response(
+        self,
+        user_input: str,
+        clue: Optional[CrosswordClue] = None,
+        type: Optional[str] = None,
+        historical_messages: list[dict] = [],
+    ) -> Iterator[str]:
+        """
+        Like `generate_response` (or `generate_research_response` without a
+        clue), yielding the reply's text as it is generated.
+        """
+        return self.llm_client.stream_message(
+            priority=Priority.INTERACTIVE,
+            **self._message_params(user_input, clue, type, historical_messages),
+        )
+
+    def _message_params(
+        self,
+        user_input: str,
+        clue: Optional[CrosswordClue],
+        type: Optional[str],
+        historical_messages: list[dict],
+    ) -> dict:
+        messages = historical_messages + [{"role": "user", "content": user_input}]
+        if clue is None:
+            system = RESEARCH_SYSTEM_PROMPT
+        elif type == CHAT_TYPE[1]:
+            system = RESEARCH_SYSTEM_PROMPT.format(clue=clue)
+        else:
+            system = HINT_SYSTEM_PROMPT.format(clue=clue)
+        return {
+            "model": self.model,
+            "max_tokens": MAX_TOKENS,
+            "system": system,
+            "messages": messages,
+        }
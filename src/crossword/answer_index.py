@@ -0,0 +1,259 @@
+import json
+import os
+import re
+import shutil
+import string
+import tempfile
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from src.settings import settings
+
+INDEX_VERSION = 2
+LETTERS = string.ascii_uppercase
+WILDCARDS = "?._"
+MIN_LENGTH = 3
+MAX_LENGTH = 21
+# Real clues kept per answer, most recent first
+MAX_CLUES_PER_ANSWER = 3
+
+_NON_LETTERS = re.compile(r"[^A-Z]")
+
+
+def normalize_answer(answer: str) -> str:
+    return _NON_LETTERS.sub("", answer.upper())
+
+
+class AnswerIndex:
+    """
+    Corpus answers indexed by length and letter-at-position.
+
+    On disk (one directory, written by `build`):
+      - `meta.json`: version and per-length answer counts
+      - `answers_<L>.npy`: sorted `S<L>` array of the answers of length L
+      - `rank_<L>.npy`: answer ids ordered by corpus clue count, most clued first
+      - `bits_<L>.npy`: uint8 `(L, 26, ceil(n/8))` packed bitsets; bit j of
+        `[i, letter]` is set when answer j has `letter` at position i
+      - `clues_<L>.npy` / `clue_offsets_<L>.npy`: clue ids of each answer; clue
+        i is bytes `clue_bytes[i]:clue_bytes[i + 1]` of the UTF-8 blob
+        `clue_text.npy`
+
+    Arrays are memory-mapped and loaded per length on first use, so opening the
+    index is cheap and only the lengths a puzzle touches are paged in.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        with open(os.path.join(directory, "meta.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("version") != INDEX_VERSION:
+            raise ValueError(
+                f"Answer index at {directory} has version {meta.get('version')}, "
+                f"expected {INDEX_VERSION}; rebuild it"
+            )
+        self.counts: Dict[int, int] = {int(k): v for k, v in meta["counts"].items()}
+        self._arrays: Dict[Tuple[str, int], np.ndarray] = {}
+        self._clue_text: Optional[np.ndarray] = None
+        self._clue_bytes: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return sum(self.counts.values())
+
+    def _array(self, name: str, length: int) -> np.ndarray:
+        key = (name, length)
+        if key not in self._arrays:
+            path = os.path.join(self.directory, f"{name}_{length}.npy")
+            self._arrays[key] = np.load(path, mmap_mode="r")
+        return self._arrays[key]
+
+    def contains(self, answer: str) -> bool:
+        answer = normalize_answer(answer)
+        if not self.counts.get(len(answer)):
+            return False
+        answers = self._array("answers", len(answer))
+        key = answer.encode("ascii")
+        position = int(np.searchsorted(answers, key))
+        return position < len(answers) and answers[position] == key
+
+    def match(
+        self,
+        pattern: str,
+        limit: Optional[int] = None,
+        exclude: Iterable[str] = (),
+    ) -> List[str]:
+        """
+        Answers matching a letter pattern such as `??R??` (`?`, `.` or `_` match
+        any letter), most clued in the corpus first.
+        """
+        pattern = pattern.upper()
+        length = len(pattern)
+        count = self.counts.get(length, 0)
+        if not count:
+            return []
+
+        bits = self._array("bits", length)
+        selected: Optional[np.ndarray] = None
+        for position, ch in enumerate(pattern):
+            if ch in WILDCARDS:
+                continue
+            if ch not in LETTERS:
+                return []
+            row = bits[position, LETTERS.index(ch)]
+            selected = row.copy() if selected is None else selected & row
+        rank = self._array("rank", length)
+        if selected is None:
+            indices = rank
+        else:
+            matched = np.unpackbits(selected, count=count).astype(bool)
+            indices = rank[matched[rank]]
+
+        excluded = set(exclude)
+        answers = self._array("answers", length)
+        result = []
+        for index in indices:
+            answer = answers[index].decode("ascii")
+            if answer in excluded:
+                continue
+            result.append(answer)
+            if limit is not None and len(result) >= limit:
+                break
+        return result
+
+    def clues(self, answer: str) -> List[str]:
+        """Real corpus clues for an answer, most recent first."""
+        answer = normalize_answer(answer)
+        if not self.contains(answer):
+            return []
+        answers = self._array("answers", len(answer))
+        position = int(np.searchsorted(answers, answer.encode("ascii")))
+        offsets = self._array("clue_offsets", len(answer))
+        clue_ids = self._array("clues", len(answer))[
+            offsets[position] : offsets[position + 1]
+        ]
+
+        if self._clue_text is None:
+            self._clue_text = np.load(
+                os.path.join(self.directory, "clue_text.npy"), mmap_mode="r"
+            )
+            self._clue_bytes = np.load(
+                os.path.join(self.directory, "clue_bytes.npy"), mmap_mode="r"
+            )
+        return [
+            bytes(
+                self._clue_text[self._clue_bytes[i] : self._clue_bytes[i + 1]]
+            ).decode("utf-8")
+            for i in clue_ids
+        ]
+
+    @classmethod
+    def build(
+        cls, entries: Iterable[Tuple[str, str, Optional[int]]], directory: str
+    ) -> "AnswerIndex":
+        """
+        Write an index from `(answer, clue, year)` rows and open it.
+
+        Args:
+            entries: Corpus rows; answers are upper-cased and stripped to A-Z.
+            directory: Output directory; an existing index there is replaced.
+
+        Returns:
+            AnswerIndex: The freshly written index.
+        """
+        by_answer: Dict[str, List[Tuple[int, str]]] = {}
+        for answer, clue, year in entries:
+            answer = normalize_answer(answer or "")
+            clue = " ".join((clue or "").split())
+            if not clue or not MIN_LENGTH <= len(answer) <= MAX_LENGTH:
+                continue
+            by_answer.setdefault(answer, []).append((year or 0, clue))
+
+        # Write beside the target and swap it in: a half-written index is never
+        # visible, and readers of the old one keep its memory-mapped files
+        parent = os.path.dirname(os.path.abspath(directory))
+        os.makedirs(parent, exist_ok=True)
+        staging = tempfile.mkdtemp(prefix=".answer_index-", dir=parent)
+        os.chmod(staging, 0o755)
+        try:
+            _write_index(by_answer, staging)
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        if os.path.exists(directory):
+            retired = staging + ".old"
+            os.replace(directory, retired)
+            os.replace(staging, directory)
+            shutil.rmtree(retired, ignore_errors=True)
+        else:
+            os.replace(staging, directory)
+        return cls(directory)
+
+
+def _write_index(by_answer: Dict[str, List[Tuple[int, str]]], directory: str) -> None:
+    clue_blobs: List[bytes] = []
+    counts: Dict[int, int] = {}
+    for length in range(MIN_LENGTH, MAX_LENGTH + 1):
+        answers = sorted(a for a in by_answer if len(a) == length)
+        if not answers:
+            continue
+        counts[length] = len(answers)
+        letters = np.frombuffer("".join(answers).encode("ascii"), dtype=np.uint8)
+        letters = letters.reshape(len(answers), length) - ord("A")
+        # (L, 26, n) membership matrix packed along the answer axis
+        membership = letters.T[:, None, :] == np.arange(26)[None, :, None]
+        np.save(
+            os.path.join(directory, f"bits_{length}.npy"),
+            np.packbits(membership, axis=2),
+        )
+        np.save(
+            os.path.join(directory, f"answers_{length}.npy"),
+            np.array([a.encode("ascii") for a in answers], dtype=f"S{length}"),
+        )
+        frequency = np.array([len(by_answer[a]) for a in answers])
+        np.save(
+            os.path.join(directory, f"rank_{length}.npy"),
+            np.argsort(-frequency, kind="stable").astype(np.uint32),
+        )
+
+        clue_ids, offsets = [], [0]
+        for answer in answers:
+            ranked = sorted(set(by_answer[answer]), reverse=True)
+            for _, clue in ranked[:MAX_CLUES_PER_ANSWER]:
+                clue_ids.append(len(clue_blobs))
+                clue_blobs.append(clue.encode("utf-8"))
+            offsets.append(len(clue_ids))
+        np.save(
+            os.path.join(directory, f"clues_{length}.npy"),
+            np.array(clue_ids, dtype=np.uint32),
+        )
+        np.save(
+            os.path.join(directory, f"clue_offsets_{length}.npy"),
+            np.array(offsets, dtype=np.uint32),
+        )
+
+    clue_bytes = np.zeros(len(clue_blobs) + 1, dtype=np.uint64)
+    clue_bytes[1:] = np.cumsum([len(b) for b in clue_blobs])
+    np.save(os.path.join(directory, "clue_bytes.npy"), clue_bytes)
+    np.save(
+        os.path.join(directory, "clue_text.npy"),
+        np.frombuffer(b"".join(clue_blobs), dtype=np.uint8),
+    )
+    with open(os.path.join(directory, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump({"version": INDEX_VERSION, "counts": counts}, f)
+
+
+_ANSWER_INDEX = None
+_ANSWER_INDEX_LOADED = False
+
+
+def get_answer_index() -> Optional[AnswerIndex]:
+    """
+    Get the process-wide answer index from `settings.answer_index_path`, or None
+    if it hasn't been built (see scripts/build_answer_index.py).
+    """
+    global _ANSWER_INDEX, _ANSWER_INDEX_LOADED
+    if not _ANSWER_INDEX_LOADED:
+        _ANSWER_INDEX_LOADED = True
+        if os.path.exists(os.path.join(settings.answer_index_path, "meta.json")):
+            _ANSWER_INDEX = AnswerIndex(settings.answer_index_path)
+    return _ANSWER_INDEX
@@ -1,7 +1,6 @@
 import logging
 from typing import Optional
 
-import anthropic
 from pydantic import BaseModel, Field
 
 from src.crossword.prompts import (
@@ -10,9 +9,14 @@ from src.crossword.prompts import (
     CLUE_GENERATION_TOPIC_PROMPT,
     DIFFICULTY_DESCRIPTION,
 )
+from src.llm.client import LLMClient
+from src.llm.scheduler import Priority
+from src.metrics import timed
+from src.settings import settings
 from src.weaviate_client import WeaviateClient
 
 MAX_TOKENS = 8192
+CLUE_TOOL_NAME = "generate_crossword_clues"
 
 
 class CrosswordClue(BaseModel):
@@ -32,7 +36,7 @@ class CrosswordClueResponse(BaseModel):
 
 class ClueGenerator:
     def __init__(self, model: str):
-        self.anthropic_client = anthropic.Anthropic()
+        self.llm_client = LLMClient()
         self.model = model
 
     def generate_clues(
@@ -40,6 +44,7 @@ class ClueGenerator:
         topic_str: Optional[str] = None,
         difficulty: Optional[str] = None,
         num_clues: Optional[int] = 30,
+        constraints: str = "",
     ) -> CrosswordClueResponse:
         """
         Generate clues based on the provided topic, difficulty, and size.
@@ -48,6 +53,7 @@ class ClueGenerator:
             topic_str (str): Comma-separated topics for the crossword.
             difficulty (str): Difficulty level of the crossword.
             size (int): Size of the crossword grid.
+            constraints (str): Extra prompt instructions (answer lengths, patterns).
 
         Returns:
             None
@@ -55,11 +61,41 @@ class ClueGenerator:
         logging.info(
             f"Generating clues for topics: {topic_str}, difficulty: {difficulty}, num_clues: {num_clues}"
         )
+        prompt = self.build_prompt(
+            topic_str, difficulty, num_clues, constraints=constraints
+        )
+        clues = self._get_clues(prompt)
+        return clues
+
+    def build_prompt(
+        self,
+        topic_str: Optional[str] = None,
+        difficulty: Optional[str] = None,
+        num_clues: Optional[int] = 30,
+        with_examples: bool = True,
+        constraints: str = "",
+    ) -> str:
+        """
+        Build the clue generation prompt, with Weaviate clue examples for the topics.
+
+        Args:
+            topic_str (str): Comma-separated topics for the crossword.
+            difficulty (str): Difficulty level of the crossword.
+            num_clues (int): Number of clues to request.
+            with_examples (bool): Whether to look up example clues in Weaviate.
+            constraints (str): Extra instructions appended to the prompt.
+
+        Returns:
+            str: The user prompt for `message_params`.
+        """
         topic_prompt_str = ""
         if topic_str:
             topics = [topic.strip() for topic in topic_str.split(",")]
             logging.info(f"Parsed topics: {topics}")
-            clue_examples = self._get_clue_examples(topic_str)
+            clue_examples = []
+            if with_examples:
+                with timed("clue_examples"):
+                    clue_examples = self._get_clue_examples(topic_str)
             topic_prompt_str = CLUE_GENERATION_TOPIC_PROMPT.format(
                 topic_str=topic_str,
                 clue_examples=clue_examples,
@@ -69,33 +105,62 @@ class ClueGenerator:
             difficulty=DIFFICULTY_DESCRIPTION.get(difficulty),
             num_clues=num_clues,
         )
-        clues = self._get_clues(prompt)
-        return clues
+        return prompt + constraints
 
-    def _get_clues(self, prompt: str) -> CrosswordClueResponse:
+    def message_params(self, prompt: str) -> dict:
         """
-        Generate clues with Claude based on the provided prompt.
+        Messages API parameters for a clue generation call, shared by the
+        interactive path and Message Batches requests.
 
         Args:
             prompt (str): The prompt to generate clues.
 
         Returns:
-            list[CrosswordClue]: List of generated clues.
+            dict: Keyword arguments for `messages.create`.
         """
-        response = self.anthropic_client.messages.create(
-            model=self.model,
-            max_tokens=MAX_TOKENS,
-            tools=[
+        return {
+            "model": self.model,
+            "max_tokens": MAX_TOKENS,
+            "tools": [
                 {
-                    "name": "generate_crossword_clues",
+                    "name": CLUE_TOOL_NAME,
                     "description": CrosswordClueResponse.__doc__,
                     "input_schema": CrosswordClueResponse.model_json_schema(),
                 }
             ],
-            tool_choice={"type": "tool", "name": "generate_crossword_clues"},
-            system=CLUE_GENERATION_SYSTEM_PROMPT,
-            messages=[{"role": "user", "content": prompt}],
-        )
+            "tool_choice": {"type": "tool", "name": CLUE_TOOL_NAME},
+            "system": CLUE_GENERATION_SYSTEM_PROMPT,
+            "messages": [{"role": "user", "content": prompt}],
+        }
+
+    def _get_clues(self, prompt: str) -> CrosswordClueResponse:
+        """
+        Generate clues with Claude based on the provided prompt.
+
+        Args:
+            prompt (str): The prompt to generate clues.
+
+        Returns:
+            list[CrosswordClue]: List of generated clues.
+        """
+        with timed("claude_call", model=self.model):
+            response = self.llm_client.create_message(
+                priority=Priority.BULK, **self.message_params(prompt)
+            )
+        return self.parse_tool_response(response)
+
+    @staticmethod
+    def parse_tool_response(response) -> Optional[CrosswordClueResponse]:
+        """
+        Validate the clue tool call in a Messages response, dropping non-alphabetic
+        and duplicate answers.
+
+        Args:
+            response (anthropic.types.Message): A `messages.create` or batch result message.
+
+        Returns:
+            CrosswordClueResponse: The cleaned clues, or None if there was no valid tool call.
+        """
         reasoning_text = ""
         tool_response = None
         for content_block in response.content:
@@ -108,7 +173,7 @@ class ClueGenerator:
                 reasoning_text += content_block.text
             if (
                 content_block.type == "tool_use"
-                and content_block.name == "generate_crossword_clues"
+                and content_block.name == CLUE_TOOL_NAME
             ):
                 tool_input = content_block.input
                 try:
@@ -140,7 +205,12 @@ class ClueGenerator:
             list: List of clue examples.
         """
         weaviate_client = WeaviateClient()
-        results = weaviate_client.query_collection(topic_str, limit=5)
+        results = weaviate_client.query_collection(
+            topic_str,
+            limit=5,
+            min_year=settings.retrieval_min_year,
+            max_answer_length=settings.retrieval_max_answer_length,
+        )
         clue_examples = []
         for result in results:
             if result.properties.get("clue") and result.properties.get("answer"):
@@ -1,11 +1,16 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Dict, List, Literal, Tuple
-
-import pandas as pd
+from typing import TYPE_CHECKING, Dict, List, Literal, Tuple
 
 from src.crossword.clue_generator import CrosswordClue
+from src.metrics import timed
+from src.profiling import instrument, profiled
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+    from src.crossword.answer_index import AnswerIndex
 
 
 @dataclass
@@ -22,8 +27,13 @@ class CrosswordGenerator:
     PADDING = 2
     MAX_SIZE_MULTIPLIER = 3
 
-    def __init__(self, clues: List[CrosswordClue]):
-        self.clues = sorted(clues, key=lambda x: len(x.answer.strip()), reverse=True)
+    def __init__(self, clues: List[CrosswordClue], sort_by_length: bool = True):
+        # Words are placed in this order; the first one seeds the grid
+        self.clues = (
+            sorted(clues, key=lambda x: len(x.answer.strip()), reverse=True)
+            if sort_by_length
+            else list(clues)
+        )
         self.words: List[str] = [
             c.answer.strip().upper() for c in self.clues if c.answer.strip()
         ]
@@ -34,7 +44,7 @@ class CrosswordGenerator:
             c.answer.strip().upper(): c.clue for c in self.clues
         }
 
-        self.longest = len(self.words[0])
+        self.longest = max(len(w) for w in self.words)
         self.grid_size = max(self.longest + self.PADDING * 2, self.longest)
         self.grid_size = min(self.grid_size, self.longest * self.MAX_SIZE_MULTIPLIER)
 
@@ -43,12 +53,41 @@ class CrosswordGenerator:
         ]
         self.placements: List[Placement] = []
 
+    @profiled("crossword.generate")
     def generate(self) -> Tuple[pd.DataFrame, List[Placement]]:
-        self._place_first()
+        import pandas as pd
 
-        remaining = [w for w in self.words[1:]]
-        progress = True
+        grid, placements = self.generate_grid()
+        return pd.DataFrame(grid), placements
+
+    @profiled("crossword.generate_grid")
+    def generate_grid(self) -> Tuple[List[List[str]], List[Placement]]:
+        """Same as `generate`, but returns the grid as plain lists (no pandas)."""
+        with timed("grid_build", words=len(self.words)):
+            self._place_first()
+            self._place_remaining(self.words[1:])
+        return self.grid, self.placements
 
+    def resume(
+        self, layout: List[Placement]
+    ) -> Tuple[List[List[str]], List[Placement]]:
+        """
+        Like `generate_grid`, but starting from an earlier `layout` instead of an
+        empty grid, so new words can fill the slots it left open.
+
+        Every word of `layout` must be among this generator's clues, and the
+        layout must fit this grid (it does when it came from a generator over a
+        subset of these clues).
+        """
+        with timed("grid_resume", words=len(self.words), layout=len(layout)):
+            for p in layout:
+                self._commit(p.word, p.row, p.col, p.direction)
+            placed = {p.word for p in layout}
+            self._place_remaining([w for w in self.words if w not in placed])
+        return self.grid, self.placements
+
+    def _place_remaining(self, remaining: List[str]) -> None:
+        progress = True
         while remaining and progress:
             progress = False
             next_remaining = []
@@ -58,7 +97,98 @@ class CrosswordGenerator:
                 else:
                     next_remaining.append(word)
             remaining = next_remaining
-        return pd.DataFrame(self.grid), self.placements
+
+    def fill_gaps(
+        self,
+        answer_index: AnswerIndex,
+        max_words: int,
+        lengths: Tuple[int, ...] = (7, 6, 5, 4, 3),
+        candidates_per_slot: int = 8,
+    ) -> List[Placement]:
+        """
+        Place up to `max_words` corpus answers (with their real clues) across open
+        slots of the current grid, without any LLM call.
+
+        Slots are letter patterns crossing an already placed letter; candidates
+        come from `answer_index` and go through the same strict validator as
+        clue answers, so every crossing they form is a known answer.
+
+        Returns:
+            List[Placement]: The placements added, in order.
+        """
+        added: List[Placement] = []
+        progress = True
+        while progress and len(added) < max_words:
+            progress = False
+            for row, col, direction, pattern in self._open_slots(lengths):
+                if len(added) >= max_words:
+                    break
+                word = self._place_from_index(
+                    answer_index, row, col, direction, pattern, candidates_per_slot
+                )
+                if word:
+                    added.append(self.placements[-1])
+                    progress = True
+        return added
+
+    def _open_slots(self, lengths: Tuple[int, ...]):
+        """
+        Yield `(row, col, direction, pattern)` for every slot of the given
+        lengths that crosses a placed letter not yet part of a word along that
+        axis, with the grid's letters (or `?`) as the pattern.
+        """
+        for placed in list(self.placements):
+            direction = "down" if placed.direction == "across" else "across"
+            dr, dc = (1, 0) if direction == "down" else (0, 1)
+            for k in range(len(placed.word)):
+                r = placed.row + (k if placed.direction == "down" else 0)
+                c = placed.col + (k if placed.direction == "across" else 0)
+                if any(
+                    self._in_bounds(r + s * dr, c + s * dc)
+                    and self.grid[r + s * dr][c + s * dc] != self.EMPTY
+                    for s in (-1, 1)
+                ):
+                    continue
+                for length in lengths:
+                    for offset in range(length):
+                        row, col = r - offset * dr, c - offset * dc
+                        end_r, end_c = row + (length - 1) * dr, col + (length - 1) * dc
+                        if not (
+                            self._in_bounds(row, col) and self._in_bounds(end_r, end_c)
+                        ):
+                            continue
+                        yield (
+                            row,
+                            col,
+                            direction,
+                            "".join(
+                                "?" if cell == self.EMPTY else cell
+                                for cell in (
+                                    self.grid[row + i * dr][col + i * dc]
+                                    for i in range(length)
+                                )
+                            ),
+                        )
+
+    def _place_from_index(
+        self,
+        answer_index: AnswerIndex,
+        row: int,
+        col: int,
+        direction: str,
+        pattern: str,
+        limit: int,
+    ) -> str:
+        for word in answer_index.match(pattern, limit=limit, exclude=self.word_set):
+            # The validator only accepts runs that are known words
+            self.word_set.add(word)
+            if self._can_place_intersecting(word, row, col, direction):
+                self.words.append(word)
+                self.clue_map[word] = next(iter(answer_index.clues(word)), "")
+                self._commit(word, row, col, direction)
+                return word
+            self.word_set.discard(word)
+        return ""
 
     def _place_first(self) -> None:
         first = self.words[0]
@@ -173,3 +303,6 @@ class CrosswordGenerator:
 
     def _in_bounds(self, r: int, c: int) -> bool:
         return 0 <= r < self.grid_size and 0 <= c < self.grid_size
+
+
+instrument(CrosswordGenerator, "_can_place_intersecting", "_collect_run")
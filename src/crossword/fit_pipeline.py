@@ -0,0 +1,281 @@
+import logging
+import math
+import random
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple
+
+from src.crossword.clue_generator import ClueGenerator, CrosswordClue
+from src.crossword.crossword_generator import CrosswordGenerator, Placement
+from src.crossword.prompts import CLUE_LENGTH_DISTRIBUTION_PROMPT, CLUE_PATTERN_PROMPT
+from src.metrics import timed
+from src.settings import settings
+
+if TYPE_CHECKING:
+    from src.crossword.answer_index import AnswerIndex
+
+# Same (stage, progress) signature as api.jobs.ProgressCallback
+ProgressCallback = Callable[[str, float], None]
+
+
+@dataclass
+class FitBudget:
+    max_calls: int = field(default_factory=lambda: settings.fit_max_calls)
+    max_seconds: float = field(default_factory=lambda: settings.fit_max_seconds)
+
+
+@dataclass
+class FitResult:
+    clues: List[CrosswordClue]
+    grid: List[List[str]]
+    placements: List[Placement]
+    stats: Dict[str, float]
+
+
+def _fill(grid: List[List[str]]) -> float:
+    """Share of filled cells inside the bounding box of the letters."""
+    cells = [
+        (r, c)
+        for r, row in enumerate(grid)
+        for c, cell in enumerate(row)
+        if cell != CrosswordGenerator.EMPTY
+    ]
+    if not cells:
+        return 0.0
+    rows = [r for r, _ in cells]
+    cols = [c for _, c in cells]
+    area = (max(rows) - min(rows) + 1) * (max(cols) - min(cols) + 1)
+    return len(cells) / area
+
+
+def _grid_from_placements(size: int, placements: List[Placement]) -> List[List[str]]:
+    grid = [[CrosswordGenerator.EMPTY] * size for _ in range(size)]
+    for p in placements:
+        for k, ch in enumerate(p.word):
+            r = p.row + (k if p.direction == "down" else 0)
+            c = p.col + (k if p.direction == "across" else 0)
+            grid[r][c] = ch
+    return grid
+
+
+def open_slot_patterns(
+    grid: List[List[str]],
+    lengths: Dict[int, float],
+    max_patterns: int,
+    rng: random.Random,
+) -> List[str]:
+    """
+    Letter patterns (e.g. `??R??`) for answers that could cross a placed letter
+    perpendicular to its word, sized by the free cells around it and sampled by
+    the target length distribution.
+    """
+    empty = CrosswordGenerator.EMPTY
+    size = len(grid)
+
+    def free(r: int, c: int) -> bool:
+        return 0 <= r < size and 0 <= c < size and grid[r][c] == empty
+
+    candidates: Dict[str, float] = {}
+    for r in range(size):
+        for c in range(size):
+            ch = grid[r][c]
+            if ch == empty:
+                continue
+            for dr, dc in ((1, 0), (0, 1)):
+                # Only letters not already part of a word along this axis
+                if not (free(r - dr, c - dc) and free(r + dr, c + dc)):
+                    continue
+                before = 0
+                while before < 9 and free(r - dr * (before + 1), c - dc * (before + 1)):
+                    before += 1
+                after = 0
+                while after < 9 and free(r + dr * (after + 1), c + dc * (after + 1)):
+                    after += 1
+                # Leave one free cell at each end so the answer doesn't butt-join
+                before, after = max(0, before - 1), max(0, after - 1)
+                for length, weight in lengths.items():
+                    if weight <= 0:
+                        continue  # excluded length; would also divide by zero below
+                    # Positions of the crossing letter that fit the free cells
+                    low, high = max(0, length - 1 - after), min(before, length - 1)
+                    if low > high:
+                        continue
+                    index = (low + high) // 2
+                    pattern = "?" * index + ch + "?" * (length - 1 - index)
+                    candidates[pattern] = max(candidates.get(pattern, 0.0), weight)
+
+    patterns = list(candidates)
+    # Weighted sampling without replacement (Efraimidis–Spirakis keys)
+    patterns.sort(key=lambda p: rng.random() ** (1.0 / candidates[p]), reverse=True)
+    return patterns[:max_patterns]
+
+
+class FitDrivenPuzzleBuilder:
+    """
+    Builds a puzzle by over-generating clues with a target answer-length mix,
+    keeping the placement order that fills the grid best, and asking for more
+    clues matching open letter patterns until `num_clues` answers are placed or
+    the call/time budget runs out.
+    """
+
+    def __init__(
+        self,
+        clue_generator: ClueGenerator,
+        overgenerate_factor: float = settings.fit_overgenerate_factor,
+        length_distribution: Optional[Dict[int, float]] = None,
+        trials: int = settings.fit_trials,
+        budget: Optional[FitBudget] = None,
+        seed: Optional[int] = None,
+        answer_index: Optional["AnswerIndex"] = None,
+    ):
+        self.clue_generator = clue_generator
+        self.answer_index = answer_index
+        self.overgenerate_factor = overgenerate_factor
+        self.length_distribution = (
+            length_distribution or settings.fit_length_distribution
+        )
+        self.trials = trials
+        self.budget = budget or FitBudget()
+        self.rng = random.Random(seed)
+
+    def build(
+        self,
+        topic_str: Optional[str] = None,
+        difficulty: Optional[str] = None,
+        num_clues: int = 30,
+        report: Optional[ProgressCallback] = None,
+    ) -> FitResult:
+        started_at = time.monotonic()
+        report = report or (lambda stage, progress: None)
+        candidates: Dict[str, CrosswordClue] = {}
+        calls = 0
+        best: Tuple[Tuple[int, float], List[List[str]], List[Placement]] = (
+            (0, 0.0),
+            [],
+            [],
+        )
+
+        def over_budget() -> bool:
+            return (
+                calls >= self.budget.max_calls
+                or time.monotonic() - started_at >= self.budget.max_seconds
+            )
+
+        while not over_budget():
+            missing = num_clues - best[0][0]
+            request_count = math.ceil(max(missing, 1) * self.overgenerate_factor)
+            if calls == 0:
+                constraints = self._length_constraints()
+            else:
+                patterns = open_slot_patterns(
+                    best[1], self.length_distribution, request_count, self.rng
+                )
+                if not patterns:
+                    break
+                request_count = len(patterns)
+                constraints = CLUE_PATTERN_PROMPT.format(
+                    patterns="\n".join(patterns),
+                    existing_answers=", ".join(sorted(candidates)),
+                )
+
+            report("generating_clues", 0.1 + 0.6 * calls / self.budget.max_calls)
+            response = self.clue_generator.generate_clues(
+                topic_str=topic_str,
+                difficulty=difficulty,
+                num_clues=request_count,
+                constraints=constraints,
+            )
+            calls += 1
+            for clue in response.clues if response else []:
+                candidates.setdefault(clue.answer, clue)
+
+            report("fitting_grid", 0.1 + 0.6 * calls / self.budget.max_calls)
+            best = max(
+                best,
+                self._best_fit(list(candidates.values()), num_clues, best[2]),
+                key=lambda fit: fit[0],
+            )
+            if best[0][0] >= num_clues:
+                break
+
+        (placed, fill), grid, placements = best
+        if not placements:
+            raise ValueError("No valid words provided.")
+        clues = [
+            candidates.get(p.word) or CrosswordClue(clue=p.clue, answer=p.word)
+            for p in placements
+        ]
+        stats = {
+            "calls": calls,
+            "candidates": len(candidates),
+            "placed": placed,
+            "from_index": sum(p.word not in candidates for p in placements),
+            "fill": round(fill, 4),
+            "elapsed_s": round(time.monotonic() - started_at, 3),
+        }
+        logging.info(f"Fit-driven puzzle: {stats}")
+        return FitResult(
+            clues=clues,
+            grid=grid,
+            placements=placements,
+            stats=stats,
+        )
+
+    def _length_constraints(self) -> str:
+        distribution = "\n".join(
+            f"{length} letters: {share:.0%}"
+            for length, share in sorted(self.length_distribution.items())
+        )
+        return CLUE_LENGTH_DISTRIBUTION_PROMPT.format(distribution=distribution)
+
+    def _best_fit(
+        self,
+        candidates: List[CrosswordClue],
+        num_clues: int,
+        layout: Optional[List[Placement]] = None,
+    ) -> Tuple[Tuple[int, float], List[List[str]], List[Placement]]:
+        """
+        Try placement orders seeded by different long answers. Every word placed
+        crosses an earlier one, so the first `num_clues` placements of a run form
+        a valid connected puzzle; keep the prefix with the most words, then the
+        densest fill. With the previous best `layout`, one more run extends it
+        in place, so answers asked for its open slot patterns can land in them.
+        A short best run is then topped up from the answer index.
+        """
+        by_length = sorted(candidates, key=lambda c: len(c.answer), reverse=True)
+        seeds = by_length[: self.trials]
+        runs: List[Tuple[List[CrosswordClue], Optional[List[Placement]]]] = [
+            ([seed] + [c for c in by_length if c is not seed], None) for seed in seeds
+        ]
+        if layout:
+            # Index fill words aren't candidates, but the layout's crossings need them
+            known = {c.answer for c in candidates}
+            extra = [
+                CrosswordClue(clue=p.clue, answer=p.word)
+                for p in layout
+                if p.word not in known
+            ]
+            runs.append((by_length + extra, layout))
+        best = ((0, 0.0), [], [])
+        best_generator = None
+        with timed("fit_selection", candidates=len(candidates), trials=len(runs)):
+            for order, start in runs:
+                generator = CrosswordGenerator(order, sort_by_length=False)
+                if start:
+                    _, placements = generator.resume(start)
+                else:
+                    _, placements = generator.generate_grid()
+                placements = placements[:num_clues]
+                grid = _grid_from_placements(generator.grid_size, placements)
+                fit = ((len(placements), _fill(grid)), grid, placements)
+                if fit[0] > best[0]:
+                    best, best_generator = fit, generator
+
+        missing = num_clues - best[0][0]
+        if self.answer_index is None or best_generator is None or missing <= 0:
+            return best
+        with timed("fit_index_fill", missing=missing):
+            best_generator.fill_gaps(self.answer_index, missing)
+        placements = list(best_generator.placements)
+        grid = _grid_from_placements(best_generator.grid_size, placements)
+        return (len(placements), _fill(grid)), grid, placements
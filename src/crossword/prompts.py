@@ -39,6 +39,27 @@ Here are the topics to inspire your crossword:
 Please consider these topics as you generate clues and answers. You should pull scientific, historical, cultural references from these topics as your clues.
 """
 
+CLUE_LENGTH_DISTRIBUTION_PROMPT = """
+<answer_lengths>
+{distribution}
+</answer_lengths>
+
+Spread the answer lengths roughly according to the distribution above (share of clues per answer length in letters), so the answers can interlock in a dense grid.
+"""
+
+CLUE_PATTERN_PROMPT = """
+<answer_patterns>
+{patterns}
+</answer_patterns>
+
+Every answer must match one of the letter patterns above, where ? stands for any letter (e.g. ??R?? is a five-letter answer whose third letter is R). Use each pattern at most once.
+
+Do not reuse any of these answers:
+<existing_answers>
+{existing_answers}
+</existing_answers>
+"""
+
 
 # <clue_examples>
 # {clue_examples}
@@ -0,0 +1,149 @@
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.crossword.crossword_generator import CrosswordGenerator
+
+# Per-cell result codes, row-major in `Verification.cells`
+CELL_CORRECT = "+"
+CELL_WRONG = "x"
+CELL_EMPTY = "."
+CELL_BLOCK = "#"
+
+_BLOCK = ord(CrosswordGenerator.EMPTY)
+_CELL_CODES = np.frombuffer(
+    (CELL_EMPTY + CELL_WRONG + CELL_CORRECT + CELL_BLOCK).encode("ascii"),
+    dtype=np.uint8,
+)
+
+
+@dataclass
+class Verification:
+    # "correct", "incorrect" or "incomplete" per placement, in stored order
+    statuses: List[str]
+    cells: Optional[str] = None
+
+    @property
+    def solved(self) -> int:
+        return self.statuses.count("correct")
+
+
+class SolutionMask:
+    """
+    A stored solution as a flat uint8 array, with the flat cell indices of every
+    placement laid out back to back so one fill is checked with a few
+    whole-array operations.
+    """
+
+    def __init__(self, grid: List[List[str]], placements: Sequence[dict]):
+        self.shape = (len(grid), len(grid[0]) if grid else 0)
+        self.solution = np.frombuffer(
+            "".join("".join(row) for row in grid).encode("ascii"), dtype=np.uint8
+        )
+        self.blocks = self.solution == _BLOCK
+
+        # (row, col, direction) of each placement, in stored order
+        self.slots: List[Tuple[int, int, str]] = []
+        cells, starts = [], []
+        for p in placements:
+            self.slots.append((p["row"], p["col"], p["direction"]))
+            starts.append(len(cells))
+            k = np.arange(len(p["word"]))
+            rows = p["row"] + (k if p["direction"] == "down" else 0)
+            cols = p["col"] + (k if p["direction"] == "across" else 0)
+            cells.extend(rows * self.shape[1] + cols)
+        self._word_cells = np.asarray(cells, dtype=np.intp)
+        self._word_starts = np.asarray(starts, dtype=np.intp)
+
+    @property
+    def size(self) -> int:
+        return self.solution.size
+
+    def parse_fill(self, fill: str) -> np.ndarray:
+        """
+        Row-major fill string, one character per cell; anything but a letter
+        (space, `.`, `#`, ...) is an empty cell.
+        """
+        if len(fill) != self.size:
+            raise ValueError(
+                f"Fill has {len(fill)} cells, the grid has {self.size} "
+                f"({self.shape[0]}x{self.shape[1]})"
+            )
+        return _letter_codes(fill)
+
+    def parse_cells(self, cells: Sequence[Tuple[int, int, str]]) -> np.ndarray:
+        """Sparse `(row, col, letter)` entries; unlisted cells are empty."""
+        entries = np.zeros(self.size, dtype=np.uint8)
+        if not cells:
+            return entries
+        rows, cols, letters = zip(*cells)
+        rows, cols = np.asarray(rows), np.asarray(cols)
+        if (
+            rows.min() < 0
+            or cols.min() < 0
+            or rows.max() >= self.shape[0]
+            or cols.max() >= self.shape[1]
+        ):
+            raise ValueError(f"Cell outside the {self.shape[0]}x{self.shape[1]} grid")
+        codes = _letter_codes("".join((letter or " ")[:1] for letter in letters))
+        entries[rows * self.shape[1] + cols] = codes
+        return entries
+
+    def verify(self, entries: np.ndarray, per_cell: bool = False) -> Verification:
+        filled = (entries != 0) & ~self.blocks
+        correct = filled & (entries == self.solution)
+
+        statuses: List[str] = []
+        if len(self._word_starts):
+            word_correct = np.logical_and.reduceat(
+                correct[self._word_cells], self._word_starts
+            )
+            word_filled = np.logical_and.reduceat(
+                filled[self._word_cells], self._word_starts
+            )
+            statuses = [
+                "correct" if ok else "incorrect" if full else "incomplete"
+                for ok, full in zip(word_correct.tolist(), word_filled.tolist())
+            ]
+
+        cells = None
+        if per_cell:
+            # 0 empty, 1 wrong, 2 correct, 3 block -> one result character per cell
+            codes = filled.astype(np.uint8) + correct + self.blocks * np.uint8(3)
+            cells = _CELL_CODES[codes].tobytes().decode("ascii")
+        return Verification(statuses=statuses, cells=cells)
+
+
+def _letter_codes(text: str) -> np.ndarray:
+    """ASCII code of each upper-cased letter, 0 for anything else."""
+    # Encode before upper-casing: str.upper() can change the length ("ß" -> "SS")
+    codes = np.frombuffer(
+        text.encode("ascii", errors="replace").upper(), dtype=np.uint8
+    )
+    return np.where((codes >= ord("A")) & (codes <= ord("Z")), codes, 0).astype(
+        np.uint8
+    )
+
+
+def strip_solution(
+    grid: List[List[str]], placements: Sequence[dict]
+) -> Tuple[List[List[str]], List[dict]]:
+    """
+    The grid with letters blanked (blocks kept) and placements with the answer
+    replaced by its length, for clients that check answers server-side.
+    """
+    blank = [
+        [cell if cell == CrosswordGenerator.EMPTY else "" for cell in row]
+        for row in grid
+    ]
+    return blank, [
+        {
+            "row": p["row"],
+            "col": p["col"],
+            "direction": p["direction"],
+            "clue": p["clue"],
+            "length": len(p["word"]),
+        }
+        for p in placements
+    ]
@@ -0,0 +1,85 @@
+from typing import Any, Dict, List
+
+JSON_MEDIA_TYPE = "application/json"
+COMPACT_MEDIA_TYPE = "application/vnd.crossword.compact+json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+
+BLANK_CELL = "."
+_DIRECTIONS = {"across": "A", "down": "D"}
+_DIRECTION_NAMES = {v: k for k, v in _DIRECTIONS.items()}
+
+
+def compact(obj: Any) -> Any:
+    """
+    Recursively replace crossword grids/placements with their compact form.
+
+    Any object with `grid` and `placements` (crossword, puzzle, stored puzzle, a
+    job's result) becomes:
+
+        "grid": {"rows": 11, "cols": 11, "cells": "##PYTHON###..."}
+        "placements": {"row": [...], "col": [...], "direction": "ADA...",
+                       "word": [...], "clue": [...]}
+
+    `cells` is the grid row-major, one character per cell ("#" block, "." an
+    empty cell of a solution-free puzzle); placements are parallel arrays with
+    one "A"/"D" character per direction. Everything else is unchanged.
+    """
+    if isinstance(obj, list):
+        return [compact(item) for item in obj]
+    if not isinstance(obj, dict):
+        return obj
+    result = {key: compact(value) for key, value in obj.items()}
+    grid, placements = obj.get("grid"), obj.get("placements")
+    if isinstance(grid, list) and isinstance(placements, list):
+        cells = [cell or BLANK_CELL for row in grid for cell in row]
+        # Only single-character cells fit the packed string
+        if all(len(cell) == 1 for cell in cells):
+            result["grid"] = {
+                "rows": len(grid),
+                "cols": len(grid[0]) if grid else 0,
+                "cells": "".join(cells),
+            }
+            result["placements"] = _columns(placements)
+    return result
+
+
+def expand(obj: Any) -> Any:
+    """Inverse of `compact`; plain JSON payloads pass through unchanged."""
+    if isinstance(obj, list):
+        return [expand(item) for item in obj]
+    if not isinstance(obj, dict):
+        return obj
+    result = {key: expand(value) for key, value in obj.items()}
+    grid, placements = obj.get("grid"), obj.get("placements")
+    if isinstance(grid, dict) and isinstance(placements, dict):
+        cells, cols = grid["cells"], grid["cols"]
+        result["grid"] = [
+            [
+                "" if cell == BLANK_CELL else cell
+                for cell in cells[r * cols : (r + 1) * cols]
+            ]
+            for r in range(grid["rows"])
+        ]
+        result["placements"] = _rows(placements)
+    return result
+
+
+def _columns(placements: List[dict]) -> Dict[str, Any]:
+    if not placements:
+        return {}
+    columns: Dict[str, Any] = {
+        key: [p[key] for p in placements] for key in placements[0]
+    }
+    if "direction" in columns:
+        columns["direction"] = "".join(_DIRECTIONS[d] for d in columns["direction"])
+    return columns
+
+
+def _rows(columns: Dict[str, Any]) -> List[dict]:
+    if not columns:
+        return []
+    columns = dict(columns)
+    if "direction" in columns:
+        columns["direction"] = [_DIRECTION_NAMES[d] for d in columns["direction"]]
+    keys = list(columns)
+    return [dict(zip(keys, values)) for values in zip(*(columns[k] for k in keys))]
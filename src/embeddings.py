@@ -0,0 +1,139 @@
+import importlib.util
+import logging
+import os
+import platform
+import threading
+from typing import Dict, Optional
+
+from src.settings import settings
+
+EMBEDDING_BACKENDS = ("torch", "onnx", "onnx-int8")
+
+
+def default_quantization_config() -> str:
+    """Dynamic quantization preset for this CPU: "arm64" on ARM, else "avx2"."""
+    machine = platform.machine().lower()
+    return "arm64" if machine in ("arm64", "aarch64") else "avx2"
+
+
+def onnx_available() -> bool:
+    """Whether the ONNX backends can load: `optimum` and `onnxruntime` are installed."""
+    return all(
+        importlib.util.find_spec(name) is not None
+        for name in ("optimum", "onnxruntime")
+    )
+
+
+def quantized_model_dir(model_name: str) -> str:
+    """Local directory the int8 ONNX export of `model_name` is cached in."""
+    return os.path.join(settings.embedding_onnx_dir, model_name.replace("/", "__"))
+
+
+def _quantized_file_name(quantization_config: str) -> str:
+    # Name written by sentence_transformers' export_dynamic_quantized_onnx_model
+    return f"onnx/model_qint8_{quantization_config}.onnx"
+
+
+def export_quantized_model(
+    model_name: str, quantization_config: Optional[str] = None
+) -> str:
+    """
+    Export `model_name` to ONNX with int8 dynamic quantization, unless already cached.
+
+    Requires `optimum[onnxruntime]`. The full-precision ONNX model is saved
+    alongside the quantized one, so the directory loads without the Hub.
+
+    Returns:
+        str: Path of the quantized model file, relative to `quantized_model_dir`.
+    """
+    from sentence_transformers import (
+        SentenceTransformer,
+        export_dynamic_quantized_onnx_model,
+    )
+
+    quantization_config = quantization_config or default_quantization_config()
+    save_dir = quantized_model_dir(model_name)
+    file_name = _quantized_file_name(quantization_config)
+    if not os.path.exists(os.path.join(save_dir, file_name)):
+        logging.info(f"Exporting {model_name} to int8 ONNX ({quantization_config})")
+        model = SentenceTransformer(model_name, device="cpu", backend="onnx")
+        model.save(save_dir)
+        export_dynamic_quantized_onnx_model(model, quantization_config, save_dir)
+    return file_name
+
+
+def load_embedding_model(
+    backend: Optional[str] = None, model_name: Optional[str] = None
+):
+    """
+    Load the query embedding model on CPU with the given inference backend.
+
+    Backends:
+        torch      full-precision PyTorch (the reference)
+        onnx       the same weights under ONNX Runtime
+        onnx-int8  ONNX Runtime with int8 dynamic quantization; exported once
+                   to `settings.embedding_onnx_dir`
+
+    The ONNX backends need `optimum[onnxruntime]`; without it they fall back to
+    torch with a warning.
+
+    Args:
+        backend (Optional[str]): One of EMBEDDING_BACKENDS. Defaults to `settings.embedding_backend`.
+        model_name (Optional[str]): Model id or path. Defaults to `settings.embedding_model`.
+
+    Returns:
+        SentenceTransformer: The loaded model.
+    """
+    from sentence_transformers import SentenceTransformer
+
+    backend = (backend or settings.embedding_backend).lower()
+    model_name = model_name or settings.embedding_model
+    if backend not in EMBEDDING_BACKENDS:
+        raise ValueError(f"Unknown embedding backend: {backend!r}")
+
+    # sentence_transformers raises a bare Exception, not ImportError, without them
+    if backend != "torch" and not onnx_available():
+        logging.warning(
+            f"Embedding backend {backend} needs optimum[onnxruntime]; using torch"
+        )
+        backend = "torch"
+    try:
+        if backend == "onnx":
+            return SentenceTransformer(model_name, device="cpu", backend="onnx")
+        if backend == "onnx-int8":
+            file_name = export_quantized_model(
+                model_name, settings.embedding_quantization
+            )
+            return SentenceTransformer(
+                quantized_model_dir(model_name),
+                device="cpu",
+                backend="onnx",
+                model_kwargs={"file_name": file_name},
+            )
+    except ImportError as e:
+        logging.warning(f"Embedding backend {backend} unavailable ({e}); using torch")
+    return SentenceTransformer(model_name, device="cpu")
+
+
+_MODELS: Dict[str, object] = {}
+_RERANKERS: Dict[str, object] = {}
+_MODELS_LOCK = threading.Lock()
+
+
+def get_embedding_model():
+    """Get the process-wide query embedding model, loading it on first use."""
+    backend = settings.embedding_backend.lower()
+    with _MODELS_LOCK:
+        if backend not in _MODELS:
+            _MODELS[backend] = load_embedding_model(backend)
+        return _MODELS[backend]
+
+
+def get_reranker(model_name: str):
+    """Get a process-wide cross-encoder reranker, loading it on first use."""
+    from sentence_transformers import CrossEncoder
+
+    with _MODELS_LOCK:
+        if model_name not in _RERANKERS:
+            _RERANKERS[model_name] = CrossEncoder(model_name, device="cpu")
+        return _RERANKERS[model_name]
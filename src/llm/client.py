@@ -0,0 +1,358 @@
+from __future__ import annotations
+
+import contextvars
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Iterator, Optional
+
+from api.constants import get_cached_claude_models
+from src.llm.scheduler import Priority, get_scheduler
+from src.llm.transport import build_http_client
+from src.llm.usage import (
+    current_usage_context,
+    estimate_input_tokens,
+    get_usage_tracker,
+)
+from src.metrics import LLM_REQUESTS
+from src.settings import settings
+
+if TYPE_CHECKING:
+    import anthropic
+
+# Status codes worth retrying: timeouts, conflicts, rate limits, overload and 5xx
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504, 529}
+
+
+class LLMUnavailableError(Exception):
+    """Raised when an LLM call still fails after the retry policy is exhausted."""
+
+
+class LLMCallCancelledError(Exception):
+    """Raised inside an attempt that lost a hedged race before its call was made."""
+
+
+@dataclass
+class CallPolicy:
+    """Deadlines, retries and hedging applied to every Anthropic call."""
+
+    timeout: float = field(default_factory=lambda: settings.llm_timeout)
+    deadline: float = field(default_factory=lambda: settings.llm_deadline)
+    max_retries: int = field(default_factory=lambda: settings.llm_max_retries)
+    backoff_base: float = field(default_factory=lambda: settings.llm_backoff_base)
+    backoff_max: float = field(default_factory=lambda: settings.llm_backoff_max)
+    # Seconds to wait on the primary call before racing a cheaper model; None disables
+    hedge_after: Optional[float] = field(
+        default_factory=lambda: settings.llm_hedge_after
+    )
+    hedge_model: Optional[str] = field(default_factory=lambda: settings.llm_hedge_model)
+
+    def backoff(self, attempt: int) -> float:
+        """Exponential backoff with full jitter."""
+        return random.uniform(
+            0, min(self.backoff_max, self.backoff_base * (2**attempt))
+        )
+
+
+def _is_retryable(error: Exception) -> bool:
+    import anthropic
+
+    if isinstance(error, (anthropic.APITimeoutError, anthropic.APIConnectionError)):
+        return True
+    if isinstance(error, anthropic.APIStatusError):
+        return error.status_code in RETRYABLE_STATUS_CODES
+    return False
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    try:
+        return float(response.headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+# Hedged attempts run here so the caller can wait on whichever finishes first
+_HEDGE_EXECUTOR = ThreadPoolExecutor(max_workers=16, thread_name_prefix="llm-hedge")
+
+
+class LLMClient:
+    """
+    Thin wrapper around `anthropic.Anthropic` that routes calls through the shared
+    scheduler and applies the configured `CallPolicy`.
+    """
+
+    def __init__(self, policy: Optional[CallPolicy] = None):
+        # The SDK is a heavy import; load it when the first client is built
+        import anthropic
+
+        client_kwargs = {}
+        http_client = build_http_client()
+        if http_client is not None:
+            client_kwargs["http_client"] = http_client
+            if settings.llm_transport.lower() == "replay":
+                # The replay stub never checks the key; allow running without one
+                client_kwargs["api_key"] = os.getenv("ANTHROPIC_API_KEY") or "replay"
+
+        # Retries are owned by the policy, not the SDK
+        self.anthropic_client = anthropic.Anthropic(max_retries=0, **client_kwargs)
+        self.policy = policy or CallPolicy()
+
+    def create_message(
+        self, priority: Priority = Priority.BULK, **kwargs
+    ) -> anthropic.types.Message:
+        """
+        Call `messages.create` with per-attempt timeouts, retries with jittered
+        backoff and optional hedging to a cheaper model.
+
+        Args:
+            priority (Priority): Scheduling class for the call.
+            **kwargs: Arguments forwarded to `messages.create`; `model` is required.
+
+        Returns:
+            anthropic.types.Message: The first successful response.
+        """
+        self._apply_budget(kwargs)
+
+        policy = self.policy
+        started_at = time.monotonic()
+        deadline = started_at + policy.deadline
+        last_error: Optional[Exception] = None
+
+        for attempt in range(policy.max_retries + 1):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                return self._hedged_attempt(
+                    attempt, priority, min(policy.timeout, remaining), kwargs
+                )
+            except Exception as e:
+                if not _is_retryable(e):
+                    raise
+                last_error = e
+                if attempt == policy.max_retries:
+                    break
+                delay = _retry_after(e) or policy.backoff(attempt)
+                if time.monotonic() + delay >= deadline:
+                    break
+                logging.warning(
+                    f"LLM attempt {attempt + 1} failed ({type(e).__name__}); "
+                    f"retrying in {delay:.2f}s"
+                )
+                time.sleep(delay)
+
+        raise LLMUnavailableError(
+            f"LLM call failed after {time.monotonic() - started_at:.1f}s: {last_error}"
+        ) from last_error
+
+    def stream_message(
+        self, priority: Priority = Priority.INTERACTIVE, **kwargs
+    ) -> Iterator[str]:
+        """
+        Call `messages.stream` and yield text deltas as they arrive.
+
+        Failed attempts are retried under the same policy as `create_message`, but
+        only until the first delta has been yielded; there is no hedging, since
+        partial output cannot be swapped for another model's.
+
+        Args:
+            priority (Priority): Scheduling class for the call.
+            **kwargs: Arguments forwarded to `messages.stream`; `model` is required.
+
+        Yields:
+            str: Text deltas of the response.
+        """
+        self._apply_budget(kwargs)
+
+        policy = self.policy
+        started_at = time.monotonic()
+        deadline = started_at + policy.deadline
+        last_error: Optional[Exception] = None
+
+        for attempt in range(policy.max_retries + 1):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            streamed = False
+            try:
+                for text in self._stream_attempt(
+                    attempt, priority, min(policy.timeout, remaining), kwargs
+                ):
+                    streamed = True
+                    yield text
+                return
+            except Exception as e:
+                if streamed or not _is_retryable(e):
+                    raise
+                last_error = e
+                if attempt == policy.max_retries:
+                    break
+                delay = _retry_after(e) or policy.backoff(attempt)
+                if time.monotonic() + delay >= deadline:
+                    break
+                logging.warning(
+                    f"LLM stream attempt {attempt + 1} failed ({type(e).__name__}); "
+                    f"retrying in {delay:.2f}s"
+                )
+                time.sleep(delay)
+
+        raise LLMUnavailableError(
+            f"LLM stream failed after {time.monotonic() - started_at:.1f}s: {last_error}"
+        ) from last_error
+
+    @staticmethod
+    def _apply_budget(kwargs: dict) -> None:
+        """Cap `max_tokens` to what remains of the current usage scope's budget."""
+        budget = current_usage_context().budget
+        if budget is not None:
+            kwargs["max_tokens"] = budget.cap_max_tokens(
+                kwargs["max_tokens"], estimate_input_tokens(kwargs)
+            )
+
+    def _attempt(
+        self,
+        attempt: int,
+        priority: Priority,
+        timeout: float,
+        kwargs: dict,
+        cancelled: Optional[threading.Event] = None,
+    ) -> anthropic.types.Message:
+        """
+        Make one call while holding a scheduler slot for its model.
+
+        `timeout` only starts once the slot is held: time spent queued in the
+        scheduler is bounded by its `queue_timeout`, not by `policy.deadline`,
+        so a call can finish up to that much past the deadline. If `cancelled`
+        is set by the time the slot is granted, the slot is released without
+        making the call.
+        """
+        model = kwargs["model"]
+        started_at = time.monotonic()
+        try:
+            with get_scheduler().slot(model, priority):
+                if cancelled is not None and cancelled.is_set():
+                    raise LLMCallCancelledError(f"{model} lost a hedged race")
+                response = self.anthropic_client.messages.create(
+                    timeout=timeout, **kwargs
+                )
+        except Exception as e:
+            LLM_REQUESTS.inc(model=model, status=type(e).__name__)
+            logging.info(
+                f"LLM attempt={attempt + 1} model={model} status=error "
+                f"error={type(e).__name__} elapsed={time.monotonic() - started_at:.3f}s"
+            )
+            raise
+        LLM_REQUESTS.inc(model=model, status="ok")
+        if getattr(response, "usage", None) is not None:
+            # A hedged attempt that finished after losing the race was paid for
+            # but its output is discarded, so it doesn't count against the budget
+            lost = cancelled is not None and cancelled.is_set()
+            get_usage_tracker().record(model, response.usage, charge_budget=not lost)
+        logging.info(
+            f"LLM attempt={attempt + 1} model={model} status=ok "
+            f"elapsed={time.monotonic() - started_at:.3f}s"
+        )
+        return response
+
+    def _stream_attempt(
+        self, attempt: int, priority: Priority, timeout: float, kwargs: dict
+    ) -> Iterator[str]:
+        model = kwargs["model"]
+        started_at = time.monotonic()
+        try:
+            # The slot is held while the caller consumes the stream
+            with get_scheduler().slot(model, priority):
+                with self.anthropic_client.messages.stream(
+                    timeout=timeout, **kwargs
+                ) as stream:
+                    yield from stream.text_stream
+                    response = stream.get_final_message()
+        except Exception as e:
+            LLM_REQUESTS.inc(model=model, status=type(e).__name__)
+            logging.info(
+                f"LLM stream attempt={attempt + 1} model={model} status=error "
+                f"error={type(e).__name__} elapsed={time.monotonic() - started_at:.3f}s"
+            )
+            raise
+        LLM_REQUESTS.inc(model=model, status="ok")
+        if getattr(response, "usage", None) is not None:
+            get_usage_tracker().record(model, response.usage)
+        logging.info(
+            f"LLM stream attempt={attempt + 1} model={model} status=ok "
+            f"elapsed={time.monotonic() - started_at:.3f}s"
+        )
+
+    def _hedged_attempt(
+        self, attempt: int, priority: Priority, timeout: float, kwargs: dict
+    ) -> anthropic.types.Message:
+        hedge_model = (
+            None
+            if self.policy.hedge_after is None
+            else self._hedge_model(kwargs["model"])
+        )
+        if hedge_model is None or self.policy.hedge_after >= timeout:
+            return self._attempt(attempt, priority, timeout, kwargs)
+
+        # Set once the race is decided, so the losing attempt doesn't take a slot
+        # or make its call if it is still queued. A call already in flight can't
+        # be aborted and runs until it completes or times out.
+        cancelled = threading.Event()
+        # Run attempts in copies of the caller's context so usage stays attributed
+        primary = _HEDGE_EXECUTOR.submit(
+            contextvars.copy_context().run,
+            self._attempt,
+            attempt,
+            priority,
+            timeout,
+            kwargs,
+            cancelled,
+        )
+        done, _ = wait([primary], timeout=self.policy.hedge_after)
+        if done:
+            return primary.result()
+
+        logging.info(
+            f"LLM primary call exceeded {self.policy.hedge_after}s; "
+            f"hedging with {hedge_model}"
+        )
+        hedge = _HEDGE_EXECUTOR.submit(
+            contextvars.copy_context().run,
+            self._attempt,
+            attempt,
+            priority,
+            timeout - self.policy.hedge_after,
+            {**kwargs, "model": hedge_model},
+            cancelled,
+        )
+        pending: set[Future] = {primary, hedge}
+        error: Optional[Exception] = None
+        try:
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future.exception() is None:
+                        return future.result()
+                    error = future.exception()
+        finally:
+            cancelled.set()
+            for future in pending:
+                future.cancel()
+        raise error
+
+    def _hedge_model(self, model: str) -> Optional[str]:
+        """Pick the model to race against `model`: configured, else the first Haiku."""
+        if self.policy.hedge_model:
+            return None if self.policy.hedge_model == model else self.policy.hedge_model
+        if "haiku" in model.lower():
+            return None
+        for candidate in get_cached_claude_models():
+            if "haiku" in candidate.lower():
+                return candidate
+        return None
@@ -0,0 +1,232 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from enum import IntEnum
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+from src.settings import settings
+from src.shared_state import StateBackend, get_state_backend
+
+
+class Priority(IntEnum):
+    """Scheduling classes for LLM calls. Lower values are served first."""
+
+    INTERACTIVE = 0  # chat hints / deep dives, a user is waiting on the answer
+    BULK = 1  # clue generation and batch work
+
+
+class SchedulerOverloadedError(Exception):
+    """Raised when the LLM queue is too deep (or too slow) to accept a call."""
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled at `rate` tokens per second."""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self.tokens = float(self.capacity)
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated_at) * self.rate
+        )
+        self.updated_at = now
+
+    def acquire(self, deadline: Optional[float] = None) -> bool:
+        """Block until a token is available. Returns False if `deadline` passes first."""
+        if self.rate <= 0:
+            return True
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return True
+                wait = (1 - self.tokens) / self.rate
+            if deadline is not None and time.monotonic() + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+class SharedRateLimiter:
+    """
+    Rate limit kept in the shared state backend, so every API worker process
+    draws from one budget: at most `capacity` calls per fixed window of
+    `capacity / rate` seconds (the time a bucket of that size takes to refill).
+    Same `acquire` contract as `TokenBucket`.
+    """
+
+    def __init__(self, key: str, rate: float, capacity: int, backend: StateBackend):
+        self.key = key
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self.window = self.capacity / rate if rate > 0 else 0.0
+        self.backend = backend
+
+    def acquire(self, deadline: Optional[float] = None) -> bool:
+        """Block until the window has room. Returns False if `deadline` passes first."""
+        if self.rate <= 0:
+            return True
+        while True:
+            now = time.time()
+            window = int(now // self.window)
+            count = self.backend.incr(
+                f"atb:ratelimit:{self.key}:{window}", ttl=2 * self.window
+            )
+            if count <= self.capacity:
+                return True
+            wait = (window + 1) * self.window - now
+            if deadline is not None and time.monotonic() + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+class _ModelLane:
+    """Concurrency slots and a priority wait queue for a single model."""
+
+    def __init__(self, limit: int, bucket: Union[TokenBucket, SharedRateLimiter]):
+        self.limit = max(1, limit)
+        self.bucket = bucket
+        self.in_flight = 0
+        self.waiters: List[Tuple[int, int]] = []
+        self.cond = threading.Condition()
+
+
+class LLMScheduler:
+    """
+    Shared gate for every Anthropic call made by the API.
+
+    Calls are admitted per model up to a concurrency limit, waiting callers are
+    served by priority (then FIFO), and each admitted call consumes a token from
+    the model's rate-limit bucket, which is shared across worker processes when
+    the state backend is. When more than `max_queue_depth` callers are
+    already waiting, new calls are rejected immediately with
+    `SchedulerOverloadedError` so the API can answer with a fast 429.
+    """
+
+    def __init__(
+        self,
+        default_concurrency: int = settings.llm_default_concurrency,
+        model_concurrency: Optional[Dict[str, int]] = None,
+        requests_per_minute: float = settings.llm_requests_per_minute,
+        burst: int = settings.llm_burst,
+        max_queue_depth: int = settings.llm_max_queue_depth,
+        queue_timeout: float = settings.llm_queue_timeout,
+        backend: Optional[StateBackend] = None,
+    ):
+        self.default_concurrency = default_concurrency
+        self.model_concurrency = (
+            settings.llm_model_concurrency
+            if model_concurrency is None
+            else model_concurrency
+        )
+        self.requests_per_minute = requests_per_minute
+        self.burst = burst
+        self.max_queue_depth = max_queue_depth
+        self.queue_timeout = queue_timeout
+        self.backend = backend
+
+        self._lanes: Dict[str, _ModelLane] = {}
+        self._lock = threading.Lock()
+        self._waiting = 0
+        self._seq = itertools.count()
+
+    def _limit_for(self, model: str) -> int:
+        for key, limit in self.model_concurrency.items():
+            if key.lower() in model.lower():
+                return limit
+        return self.default_concurrency
+
+    def _lane(self, model: str) -> _ModelLane:
+        with self._lock:
+            if model not in self._lanes:
+                self._lanes[model] = _ModelLane(
+                    limit=self._limit_for(model), bucket=self._bucket_for(model)
+                )
+            return self._lanes[model]
+
+    def _bucket_for(self, model: str) -> Union[TokenBucket, SharedRateLimiter]:
+        rate = self.requests_per_minute / 60.0
+        backend = self.backend or get_state_backend()
+        if backend.shared:
+            return SharedRateLimiter(model, rate, self.burst, backend)
+        return TokenBucket(rate=rate, capacity=self.burst)
+
+    def queue_depth(self) -> int:
+        with self._lock:
+            return self._waiting
+
+    def in_flight(self) -> Dict[str, int]:
+        with self._lock:
+            return {model: lane.in_flight for model, lane in self._lanes.items()}
+
+    @contextmanager
+    def slot(self, model: str, priority: Priority = Priority.BULK) -> Iterator[None]:
+        """Hold a concurrency slot for `model` for the duration of the block."""
+        lane = self._lane(model)
+        with self._lock:
+            if self._waiting >= self.max_queue_depth:
+                raise SchedulerOverloadedError(
+                    f"LLM queue is full ({self._waiting} waiting)"
+                )
+            self._waiting += 1
+
+        enqueued_at = time.monotonic()
+        deadline = enqueued_at + self.queue_timeout
+        ticket = (int(priority), next(self._seq))
+        admitted = False
+        try:
+            with lane.cond:
+                heapq.heappush(lane.waiters, ticket)
+                try:
+                    while not (
+                        lane.waiters[0] == ticket and lane.in_flight < lane.limit
+                    ):
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            raise SchedulerOverloadedError(
+                                f"Timed out after {self.queue_timeout}s waiting for {model}"
+                            )
+                        lane.cond.wait(remaining)
+                finally:
+                    lane.waiters.remove(ticket)
+                    heapq.heapify(lane.waiters)
+                    lane.cond.notify_all()
+                lane.in_flight += 1
+                admitted = True
+        finally:
+            with self._lock:
+                self._waiting -= 1
+
+        try:
+            if not lane.bucket.acquire(deadline=deadline):
+                raise SchedulerOverloadedError(f"Rate limit exceeded for {model}")
+            logging.debug(
+                f"LLM slot acquired for {model} (priority={priority.name}, "
+                f"queued={time.monotonic() - enqueued_at:.3f}s)"
+            )
+            yield
+        finally:
+            if admitted:
+                with lane.cond:
+                    lane.in_flight -= 1
+                    lane.cond.notify_all()
+
+
+# Shared by every service in the process
+_SCHEDULER = None
+
+
+def get_scheduler() -> LLMScheduler:
+    """Get the process-wide scheduler, creating it on first use."""
+    global _SCHEDULER
+    if _SCHEDULER is None:
+        _SCHEDULER = LLMScheduler()
+    return _SCHEDULER
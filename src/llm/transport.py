@@ -0,0 +1,303 @@
+import itertools
+import json
+import math
+import os
+import random
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+import httpx
+
+from src.settings import settings
+
+MESSAGES_PATH = "/v1/messages"
+BATCHES_PATH = "/v1/messages/batches"
+
+
+class LatencyModel:
+    """
+    Samples simulated upstream latency (seconds) from a spec string:
+    `fixed:0.8`, `uniform:0.2,1.5` or `lognormal:<median>,<sigma>`.
+    """
+
+    def __init__(self, spec: str = "fixed:0"):
+        kind, _, params = spec.partition(":")
+        self.kind = kind.strip().lower()
+        self.params = [float(p) for p in params.split(",") if p.strip()]
+        if self.kind not in ("fixed", "uniform", "lognormal"):
+            raise ValueError(f"Unknown latency distribution: {spec!r}")
+        self._rng = random.Random()
+
+    def sample(self) -> float:
+        if self.kind == "fixed":
+            return self.params[0] if self.params else 0.0
+        if self.kind == "uniform":
+            low, high = self.params
+            return self._rng.uniform(low, high)
+        median, sigma = self.params
+        return self._rng.lognormvariate(math.log(median), sigma)
+
+
+def request_kind(body: dict) -> str:
+    """Key used to match a Messages request to cassette entries."""
+    tool_choice = body.get("tool_choice") or {}
+    if tool_choice.get("type") == "tool":
+        return f"tool_use:{tool_choice.get('name')}"
+    return "text"
+
+
+class CassetteReplayTransport(httpx.BaseTransport):
+    """
+    Serves `POST /v1/messages` and the Message Batches endpoints from a recorded
+    cassette (JSONL of `{"kind", "status_code", "body"}` entries) instead of the
+    Anthropic API. Entries of the matching kind are replayed round-robin after a
+    simulated delay; requests with `"stream": true` get the entry as SSE events.
+    """
+
+    def __init__(self, cassette_path: str, latency: Optional[LatencyModel] = None):
+        self.latency = latency or LatencyModel()
+        self._entries: Dict[str, List[dict]] = {}
+        with open(cassette_path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    self._entries.setdefault(entry["kind"], []).append(entry)
+        self._cycles = {
+            kind: itertools.cycle(entries) for kind, entries in self._entries.items()
+        }
+        self._lock = threading.Lock()
+        self._batches: Dict[str, dict] = {}
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        if path.startswith(BATCHES_PATH):
+            return self._handle_batch_request(request)
+        if request.method != "POST" or path != MESSAGES_PATH:
+            return _error_response(404, f"Replay stub has no route {path}")
+
+        body = json.loads(request.read() or b"{}")
+        entry = self._next_entry(request_kind(body))
+        if entry is None:
+            return _error_response(
+                500, f"No recorded responses of kind {request_kind(body)!r}"
+            )
+
+        time.sleep(self.latency.sample())
+        status_code = entry.get("status_code", 200)
+        payload = self._message_payload(entry, body)
+        if body.get("stream") and status_code == 200:
+            return httpx.Response(
+                200,
+                content=_stream_events(payload),
+                headers={"content-type": "text/event-stream"},
+            )
+        return httpx.Response(status_code, json=payload)
+
+    def _next_entry(self, kind: str) -> Optional[dict]:
+        with self._lock:
+            cycle = self._cycles.get(kind)
+            return next(cycle) if cycle else None
+
+    @staticmethod
+    def _message_payload(entry: dict, body: dict) -> dict:
+        return {**entry["body"], "model": body.get("model", entry["body"].get("model"))}
+
+    def _handle_batch_request(self, request: httpx.Request) -> httpx.Response:
+        """
+        Minimal Message Batches stub: create, retrieve and results. A batch "ends"
+        once one latency sample has elapsed since creation, without blocking.
+        """
+        parts = request.url.path[len(BATCHES_PATH) :].strip("/").split("/")
+        if request.method == "POST" and parts == [""]:
+            body = json.loads(request.read() or b"{}")
+            batch_id = f"msgbatch_replay_{uuid.uuid4().hex[:24]}"
+            batch = {
+                "id": batch_id,
+                "created_at": datetime.now(timezone.utc),
+                "ready_at": time.monotonic() + self.latency.sample(),
+                "requests": body.get("requests", []),
+            }
+            with self._lock:
+                self._batches[batch_id] = batch
+            return httpx.Response(200, json=self._batch_payload(batch, request))
+
+        with self._lock:
+            batch = self._batches.get(parts[0])
+        if request.method != "GET" or batch is None or len(parts) > 2:
+            return _error_response(404, f"Replay stub has no route {request.url.path}")
+        if len(parts) == 1:
+            return httpx.Response(200, json=self._batch_payload(batch, request))
+        if parts[1] != "results" or time.monotonic() < batch["ready_at"]:
+            return _error_response(404, "Batch results are not available")
+
+        lines = []
+        for item in batch["requests"]:
+            entry = self._next_entry(request_kind(item["params"]))
+            if entry is None or entry.get("status_code", 200) != 200:
+                result = {
+                    "type": "errored",
+                    "error": {
+                        "type": "error",
+                        "error": {"type": "api_error", "message": "No recording"},
+                    },
+                }
+            else:
+                result = {
+                    "type": "succeeded",
+                    "message": self._message_payload(entry, item["params"]),
+                }
+            lines.append(json.dumps({"custom_id": item["custom_id"], "result": result}))
+        return httpx.Response(
+            200,
+            content=("\n".join(lines) + "\n").encode("utf-8"),
+            headers={"content-type": "application/binary"},
+        )
+
+    @staticmethod
+    def _batch_payload(batch: dict, request: httpx.Request) -> dict:
+        ended = time.monotonic() >= batch["ready_at"]
+        created_at: datetime = batch["created_at"]
+        count = len(batch["requests"])
+        results_path = f"{BATCHES_PATH}/{batch['id']}/results"
+        return {
+            "id": batch["id"],
+            "type": "message_batch",
+            "processing_status": "ended" if ended else "in_progress",
+            "request_counts": {
+                "processing": 0 if ended else count,
+                "succeeded": count if ended else 0,
+                "errored": 0,
+                "canceled": 0,
+                "expired": 0,
+            },
+            "created_at": created_at.isoformat(),
+            "expires_at": (created_at + timedelta(hours=24)).isoformat(),
+            "ended_at": datetime.now(timezone.utc).isoformat() if ended else None,
+            "results_url": str(request.url.copy_with(path=results_path, query=None))
+            if ended
+            else None,
+        }
+
+
+# Headers describing the wire encoding of a body, not the decoded bytes
+_DECODED_BODY_HEADERS = ("content-encoding", "content-length", "transfer-encoding")
+
+
+class CassetteRecordingTransport(httpx.BaseTransport):
+    """Forwards requests to the real API and appends Messages responses to a cassette."""
+
+    def __init__(self, cassette_path: str):
+        self.cassette_path = cassette_path
+        self._inner = httpx.HTTPTransport()
+        self._lock = threading.Lock()
+        directory = os.path.dirname(cassette_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        response = self._inner.handle_request(request)
+        if request.method != "POST" or request.url.path != MESSAGES_PATH:
+            return response
+        # Streams are passed through as they arrive; only whole messages are recorded
+        if response.headers.get("content-type", "").startswith("text/event-stream"):
+            return response
+
+        content = response.read()
+        try:
+            entry = {
+                "kind": request_kind(json.loads(request.content or b"{}")),
+                "status_code": response.status_code,
+                "body": json.loads(content),
+            }
+            with self._lock, open(self.cassette_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+        except ValueError:
+            pass  # non-JSON bodies are passed through unrecorded
+        # read() already undid any content-encoding, so the framing headers are stale
+        headers = [
+            (name, value)
+            for name, value in response.headers.multi_items()
+            if name.lower() not in _DECODED_BODY_HEADERS
+        ]
+        return httpx.Response(response.status_code, headers=headers, content=content)
+
+    def close(self) -> None:
+        self._inner.close()
+
+
+def _stream_events(message: dict, size: int = 16) -> bytes:
+    """A recorded message as the Messages streaming SSE sequence, text in `size`-char deltas."""
+    usage = message.get("usage") or {}
+    events = [
+        (
+            "message_start",
+            {"message": {**message, "content": [], "stop_reason": None}},
+        )
+    ]
+    for index, block in enumerate(message.get("content", [])):
+        if block.get("type") == "text":
+            text = block.get("text", "")
+            events.append(
+                (
+                    "content_block_start",
+                    {"index": index, "content_block": {"type": "text", "text": ""}},
+                )
+            )
+            events.extend(
+                (
+                    "content_block_delta",
+                    {
+                        "index": index,
+                        "delta": {"type": "text_delta", "text": text[i : i + size]},
+                    },
+                )
+                for i in range(0, len(text), size)
+            )
+        else:
+            events.append(
+                ("content_block_start", {"index": index, "content_block": block})
+            )
+        events.append(("content_block_stop", {"index": index}))
+    events.append(
+        (
+            "message_delta",
+            {
+                "delta": {
+                    "stop_reason": message.get("stop_reason"),
+                    "stop_sequence": message.get("stop_sequence"),
+                },
+                "usage": {"output_tokens": usage.get("output_tokens", 0)},
+            },
+        )
+    )
+    events.append(("message_stop", {}))
+    return "".join(
+        f"event: {name}\ndata: {json.dumps({'type': name, **data})}\n\n"
+        for name, data in events
+    ).encode("utf-8")
+
+
+def _error_response(status_code: int, message: str) -> httpx.Response:
+    return httpx.Response(
+        status_code,
+        json={"type": "error", "error": {"type": "api_error", "message": message}},
+    )
+
+
+def build_http_client() -> Optional[httpx.Client]:
+    """HTTP client for the Anthropic SDK per `settings.llm_transport`; None means live."""
+    mode = settings.llm_transport.lower()
+    if mode == "live":
+        return None
+    if mode == "replay":
+        transport = CassetteReplayTransport(
+            settings.llm_cassette_path, LatencyModel(settings.llm_replay_latency)
+        )
+    elif mode == "record":
+        transport = CassetteRecordingTransport(settings.llm_cassette_path)
+    else:
+        raise ValueError(f"Unknown LLM transport: {settings.llm_transport!r}")
+    return httpx.Client(transport=transport, timeout=settings.llm_timeout)
@@ -0,0 +1,231 @@
+import json
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field, fields
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from src.metrics import LLM_COST, LLM_TOKENS
+from src.shared_state import StateBackend, get_state_backend
+
+# USD per million tokens (input, output) by model family; cache writes are billed
+# at 1.25x and cache reads at 0.1x the input price
+MODEL_PRICES: Dict[str, Tuple[float, float]] = {
+    "claude-3-haiku": (0.25, 1.25),
+    "claude-3-5-haiku": (0.80, 4.00),
+    "haiku": (1.00, 5.00),
+    "sonnet": (3.00, 15.00),
+    "opus-4-5": (5.00, 25.00),
+    "opus": (15.00, 75.00),
+}
+CACHE_WRITE_MULTIPLIER = 1.25
+CACHE_READ_MULTIPLIER = 0.1
+
+# Rough characters-per-token ratio used to estimate prompt size before a call
+CHARS_PER_TOKEN = 4
+
+
+class TokenBudgetExceededError(Exception):
+    """Raised when a request's token budget has no room left for another call."""
+
+
+def model_prices(model: str) -> Tuple[float, float]:
+    """Prices for the most specific family key contained in the model id."""
+    matches = [key for key in MODEL_PRICES if key in model.lower()]
+    if not matches:
+        return MODEL_PRICES["sonnet"]
+    return MODEL_PRICES[max(matches, key=len)]
+
+
+@dataclass
+class UsageTotals:
+    requests: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_creation_input_tokens: int = 0
+    cache_read_input_tokens: int = 0
+    cost_usd: float = 0.0
+
+    def add(self, other: "UsageTotals") -> None:
+        self.requests += other.requests
+        self.input_tokens += other.input_tokens
+        self.output_tokens += other.output_tokens
+        self.cache_creation_input_tokens += other.cache_creation_input_tokens
+        self.cache_read_input_tokens += other.cache_read_input_tokens
+        self.cost_usd += other.cost_usd
+
+    @classmethod
+    def from_response_usage(cls, model: str, usage: Any) -> "UsageTotals":
+        totals = cls(
+            requests=1,
+            input_tokens=usage.input_tokens or 0,
+            output_tokens=usage.output_tokens or 0,
+            cache_creation_input_tokens=getattr(usage, "cache_creation_input_tokens", 0)
+            or 0,
+            cache_read_input_tokens=getattr(usage, "cache_read_input_tokens", 0) or 0,
+        )
+        input_price, output_price = model_prices(model)
+        totals.cost_usd = (
+            totals.input_tokens * input_price
+            + totals.cache_creation_input_tokens * input_price * CACHE_WRITE_MULTIPLIER
+            + totals.cache_read_input_tokens * input_price * CACHE_READ_MULTIPLIER
+            + totals.output_tokens * output_price
+        ) / 1_000_000
+        return totals
+
+
+@dataclass
+class TokenBudget:
+    """Tokens (input + output) a single API request may spend across its LLM calls."""
+
+    limit: int
+    used: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    @property
+    def remaining(self) -> int:
+        return max(0, self.limit - self.used)
+
+    def cap_max_tokens(self, requested: int, estimated_input: int) -> int:
+        """Shrink `max_tokens` so the call fits in what is left of the budget."""
+        available = self.remaining - estimated_input
+        if available <= 0:
+            raise TokenBudgetExceededError(
+                f"Token budget of {self.limit} exhausted "
+                f"({self.used} used, ~{estimated_input} needed for the prompt)"
+            )
+        return min(requested, available)
+
+    def consume(self, tokens: int) -> None:
+        with self._lock:
+            self.used += tokens
+
+
+@dataclass
+class UsageContext:
+    endpoint: str = "unknown"
+    session_id: Optional[str] = None
+    budget: Optional[TokenBudget] = None
+
+
+_usage_context: ContextVar[UsageContext] = ContextVar(
+    "usage_context", default=UsageContext()
+)
+
+
+@contextmanager
+def usage_scope(
+    endpoint: str,
+    session_id: Optional[str] = None,
+    token_budget: Optional[int] = None,
+) -> Iterator[UsageContext]:
+    """Attribute LLM usage inside the block to `endpoint`/`session_id`, optionally budgeted."""
+    context = UsageContext(
+        endpoint=endpoint,
+        session_id=session_id,
+        budget=TokenBudget(limit=token_budget) if token_budget else None,
+    )
+    token = _usage_context.set(context)
+    try:
+        yield context
+    finally:
+        _usage_context.reset(token)
+
+
+def current_usage_context() -> UsageContext:
+    return _usage_context.get()
+
+
+def estimate_input_tokens(request_kwargs: Dict[str, Any]) -> int:
+    """Cheap prompt-size estimate from the serialized system, messages and tools."""
+    text = json.dumps(
+        [request_kwargs.get(key) for key in ("system", "messages", "tools")],
+        default=str,
+    )
+    return len(text) // CHARS_PER_TOKEN
+
+
+USAGE_KEY = "atb:usage"
+# Separates endpoint, model, session and counter name in the usage hash fields
+_FIELD_SEPARATOR = "\t"
+
+
+class UsageTracker:
+    """
+    Token and cost aggregates keyed by (endpoint, model, session), kept as
+    counters in the shared state backend so every API worker adds to (and
+    reports) the same totals.
+    """
+
+    GROUP_KEYS = ("endpoint", "model", "session")
+
+    def __init__(self, backend: Optional[StateBackend] = None):
+        self.backend = backend or get_state_backend()
+
+    def record(self, model: str, usage: Any, charge_budget: bool = True) -> UsageTotals:
+        """
+        Add a response's usage to the totals of the current usage scope.
+
+        With `charge_budget=False` the tokens are still tracked and costed but
+        not taken from the scope's budget, e.g. for a hedged attempt whose
+        response was discarded.
+        """
+        context = current_usage_context()
+        totals = UsageTotals.from_response_usage(model, usage)
+        prefix = _FIELD_SEPARATOR.join(
+            part.replace(_FIELD_SEPARATOR, " ")
+            for part in (context.endpoint, model, context.session_id or "")
+        )
+        for counter in fields(UsageTotals):
+            value = getattr(totals, counter.name)
+            if value:
+                self.backend.hincrbyfloat(
+                    USAGE_KEY, f"{prefix}{_FIELD_SEPARATOR}{counter.name}", value
+                )
+
+        if charge_budget and context.budget is not None:
+            context.budget.consume(totals.input_tokens + totals.output_tokens)
+        for kind, tokens in (
+            ("input", totals.input_tokens),
+            ("output", totals.output_tokens),
+            ("cache_creation", totals.cache_creation_input_tokens),
+            ("cache_read", totals.cache_read_input_tokens),
+        ):
+            if tokens:
+                LLM_TOKENS.inc(
+                    tokens, model=model, endpoint=context.endpoint, kind=kind
+                )
+        LLM_COST.inc(totals.cost_usd, model=model, endpoint=context.endpoint)
+        return totals
+
+    def summary(self, group_by: str = "model") -> Dict[str, Any]:
+        """Aggregate totals grouped by one of `GROUP_KEYS`."""
+        if group_by not in self.GROUP_KEYS:
+            raise ValueError(f"group_by must be one of {self.GROUP_KEYS}")
+        index = self.GROUP_KEYS.index(group_by)
+        groups: Dict[str, UsageTotals] = {}
+        overall = UsageTotals()
+        for name, value in self.backend.hgetall(USAGE_KEY).items():
+            *key, counter = name.split(_FIELD_SEPARATOR)
+            amount = float(value)
+            if counter != "cost_usd":
+                amount = int(round(amount))
+            group = groups.setdefault(key[index] or "(none)", UsageTotals())
+            setattr(group, counter, getattr(group, counter) + amount)
+            setattr(overall, counter, getattr(overall, counter) + amount)
+        return {
+            "group_by": group_by,
+            "groups": {name: asdict(totals) for name, totals in sorted(groups.items())},
+            "total": asdict(overall),
+        }
+
+
+_USAGE_TRACKER = None
+
+
+def get_usage_tracker() -> UsageTracker:
+    """Get the process-wide usage tracker, creating it on first use."""
+    global _USAGE_TRACKER
+    if _USAGE_TRACKER is None:
+        _USAGE_TRACKER = UsageTracker()
+    return _USAGE_TRACKER
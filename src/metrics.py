@@ -0,0 +1,243 @@
+import bisect
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Latency buckets (seconds) spanning fast cache hits up to slow LLM calls
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)  # fmt: skip
+
+timing_logger = logging.getLogger("across_the_board.timing")
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def get(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(
+                    f"{self.name}{_format_labels(self.labelnames, key)} {value}"
+                )
+        return lines
+
+
+class Gauge(Counter):
+    type_name = "gauge"
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, *args, buckets: Sequence[float] = DEFAULT_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> (per-bucket counts incl. +Inf, sum, count)
+        self._values: Dict[LabelValues, Tuple[List[int], float, int]] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts, total, count = self._values.get(
+                key, ([0] * (len(self.buckets) + 1), 0.0, 0)
+            )
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            self._values[key] = (counts, total + value, count + 1)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            for key, (counts, total, count) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(
+                    [*map(str, self.buckets), "+Inf"], counts
+                ):
+                    cumulative += bucket_count
+                    labels = _format_labels(self.labelnames, key, f'le="{bound}"')
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                labels = _format_labels(self.labelnames, key)
+                lines.append(f"{self.name}_sum{labels} {total}")
+                lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class Registry:
+    """Collection of metrics rendered in the Prometheus text exposition format."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, cls, name: str, documentation: str, labelnames, **kwargs):
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = cls(name, documentation, labelnames, **kwargs)
+            return self._metrics[name]
+
+    def counter(self, name: str, documentation: str, labelnames=()) -> Counter:
+        return self._register(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames=()) -> Gauge:
+        return self._register(Gauge, name, documentation, labelnames)
+
+    def histogram(
+        self, name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._register(
+            Histogram, name, documentation, labelnames, buckets=buckets
+        )
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+STAGE_DURATION = REGISTRY.histogram(
+    "atb_stage_duration_seconds",
+    "Time spent in each pipeline stage (embedding, weaviate_query, claude_call, ...)",
+    ["stage"],
+)
+HTTP_REQUEST_DURATION = REGISTRY.histogram(
+    "atb_http_request_duration_seconds",
+    "HTTP request latency by route",
+    ["method", "route", "status"],
+)
+HTTP_REQUESTS_IN_FLIGHT = REGISTRY.gauge(
+    "atb_http_requests_in_flight", "HTTP requests currently being served", ["method"]
+)
+LLM_REQUESTS = REGISTRY.counter(
+    "atb_llm_requests_total", "Anthropic call attempts by outcome", ["model", "status"]
+)
+LLM_TOKENS = REGISTRY.counter(
+    "atb_llm_tokens_total",
+    "Anthropic tokens by kind (input, output, cache_creation, cache_read)",
+    ["model", "endpoint", "kind"],
+)
+LLM_COST = REGISTRY.counter(
+    "atb_llm_cost_usd_total",
+    "Estimated Anthropic spend in USD from list prices",
+    ["model", "endpoint"],
+)
+LLM_QUEUE_DEPTH = REGISTRY.gauge(
+    "atb_llm_queue_depth", "LLM calls waiting for a scheduler slot"
+)
+LLM_IN_FLIGHT = REGISTRY.gauge(
+    "atb_llm_in_flight", "LLM calls currently holding a scheduler slot", ["model"]
+)
+WS_CONNECTIONS = REGISTRY.gauge("atb_ws_connections", "Open play WebSocket connections")
+WS_FRAMES = REGISTRY.counter(
+    "atb_ws_frames_total",
+    "Play WebSocket frames by direction (in, out, dropped) and type",
+    ["direction", "type"],
+)
+CACHE_REQUESTS = REGISTRY.counter(
+    "atb_cache_requests_total", "Cache lookups by cache and result", ["cache", "result"]
+)
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile of `values`, e.g. `pct=99` for p99; 0.0 if empty."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+@contextmanager
+def timed(stage: str, **fields) -> Iterator[Dict[str, Optional[float]]]:
+    """
+    Time a pipeline stage: observe it in `atb_stage_duration_seconds` and log a
+    structured timing record. Yields a dict whose `duration` is set on exit.
+    """
+    span: Dict[str, Optional[float]] = {"duration": None}
+    started_at = time.perf_counter()
+    status = "ok"
+    try:
+        yield span
+    except BaseException:
+        status = "error"
+        raise
+    finally:
+        duration = time.perf_counter() - started_at
+        span["duration"] = duration
+        STAGE_DURATION.observe(duration, stage=stage)
+        if timing_logger.isEnabledFor(logging.DEBUG):
+            timing_logger.debug(
+                json.dumps(
+                    {
+                        "stage": stage,
+                        "status": status,
+                        "duration_ms": round(duration * 1000, 3),
+                        **fields,
+                    },
+                    default=str,
+                )
+            )
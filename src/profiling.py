@@ -0,0 +1,387 @@
+import asyncio
+import functools
+import itertools
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import asdict, dataclass
+from types import FrameType
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.settings import settings
+from src.shared_state import get_state_backend
+
+PROFILING_MODES = ("sampling", "deterministic")
+
+# Runtime toggles are published here so every worker process picks them up
+SHARED_CONFIG_KEY = "profiling:config"
+# Seconds between checks of the shared toggle, i.e. how long other workers lag
+SYNC_INTERVAL = 1.0
+
+
+@dataclass
+class ProfilingConfig:
+    enabled: bool = settings.profiling_enabled
+    mode: str = settings.profiling_mode
+    directory: str = settings.profiling_dir
+    interval: float = settings.profiling_interval
+
+
+_config = ProfilingConfig()
+_active = threading.local()
+_dump_seq = itertools.count()
+# (owner, attribute, original function) for methods swapped in only while enabled
+_hot_paths: List[Tuple[type, str, Callable]] = []
+_synced_at = 0.0
+
+
+def get_config() -> ProfilingConfig:
+    return _config
+
+
+def configure(
+    enabled: Optional[bool] = None,
+    mode: Optional[str] = None,
+    interval: Optional[float] = None,
+) -> ProfilingConfig:
+    """
+    Toggle profiling at runtime (env defaults come from `Settings`).
+
+    With a shared state backend the change is published to every worker, which
+    adopts it within `SYNC_INTERVAL`; with the memory backend it only applies
+    to this process.
+    """
+    _apply(enabled, mode, interval)
+    backend = get_state_backend()
+    if backend.shared:
+        config = {key: getattr(_config, key) for key in ("enabled", "mode", "interval")}
+        backend.set(SHARED_CONFIG_KEY, json.dumps(config))
+    return _config
+
+
+def _sync(force: bool = False) -> None:
+    """Adopt a toggle published by another worker, at most every `SYNC_INTERVAL`."""
+    global _synced_at
+    now = time.monotonic()
+    if not force and now - _synced_at < SYNC_INTERVAL:
+        return
+    _synced_at = now
+    try:
+        backend = get_state_backend()
+        raw = backend.get(SHARED_CONFIG_KEY) if backend.shared else None
+        if raw:
+            shared = json.loads(raw)
+            _apply(shared.get("enabled"), shared.get("mode"), shared.get("interval"))
+    except Exception as e:
+        # Profiling must never fail a request; keep the last known config
+        logging.warning(f"Could not read the shared profiling config: {e}")
+
+
+def _apply(
+    enabled: Optional[bool], mode: Optional[str], interval: Optional[float]
+) -> None:
+    if mode is not None:
+        if mode not in PROFILING_MODES:
+            raise ValueError(f"mode must be one of {PROFILING_MODES}")
+        _config.mode = mode
+    if interval is not None:
+        if interval <= 0:
+            raise ValueError("interval must be positive")
+        _config.interval = interval
+    if enabled is not None and enabled != _config.enabled:
+        _config.enabled = enabled
+        _apply_hot_paths()
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    name = getattr(code, "co_qualname", code.co_name)
+    # ';' separates frames in collapsed stacks, so it can't appear in a label
+    return (
+        f"{name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(
+            ";", ":"
+        )
+    )
+
+
+def _stack(frame) -> List[str]:
+    labels = []
+    while frame is not None:
+        if frame.f_code.co_filename != __file__:
+            labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return labels[::-1]
+
+
+class _Session:
+    """One profile: collects weighted collapsed stacks and per-function stats."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.stacks: Counter = Counter()
+        self.function_stats: Dict[str, Dict[str, float]] = {}
+        self.started_at = time.perf_counter()
+
+    def record_call(self, name: str, duration: float) -> None:
+        stats = self.function_stats.setdefault(name, {"calls": 0, "total_s": 0.0})
+        stats["calls"] += 1
+        stats["total_s"] += duration
+
+    def dump(self, mode: str) -> Optional[str]:
+        if not self.stacks:
+            return None
+        os.makedirs(_config.directory, exist_ok=True)
+        base = os.path.join(
+            _config.directory,
+            f"{self.name}-{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}-{next(_dump_seq)}",
+        )
+        with open(f"{base}.collapsed", "w", encoding="utf-8") as f:
+            for stack, weight in self.stacks.most_common():
+                f.write(f"{stack} {int(weight)}\n")
+        with open(f"{base}.json", "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "name": self.name,
+                    "mode": mode,
+                    "duration_s": time.perf_counter() - self.started_at,
+                    "weight_unit": "samples" if mode == "sampling" else "microseconds",
+                    "functions": self.function_stats,
+                },
+                f,
+                indent=2,
+            )
+        return f"{base}.collapsed"
+
+
+class _Sampler(threading.Thread):
+    """
+    Samples the stacks of one thread (or all threads) every `interval` seconds.
+
+    With `owner`, only samples with that frame on the stack are kept: for a
+    coroutine, the times it is running rather than another task on its loop.
+    """
+
+    def __init__(
+        self,
+        session: _Session,
+        interval: float,
+        thread_id: Optional[int],
+        owner: Optional[FrameType] = None,
+    ):
+        super().__init__(daemon=True, name="profiler-sampler")
+        self.session = session
+        self.interval = interval
+        self.thread_id = thread_id
+        self.owner = owner
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        names = {}
+        while not self._stop_event.wait(self.interval):
+            frames = sys._current_frames()
+            if self.thread_id is not None:
+                frames = {self.thread_id: frames.get(self.thread_id)}
+            for thread_id, frame in frames.items():
+                if frame is None or thread_id == self.ident:
+                    continue
+                if self.owner is not None and not _on_stack(self.owner, frame):
+                    continue
+                stack = _stack(frame)
+                if self.thread_id is None:
+                    if thread_id not in names:
+                        names = {t.ident: t.name for t in threading.enumerate()}
+                    stack.insert(0, f"thread:{names.get(thread_id, thread_id)}")
+                self.session.stacks[";".join(stack)] += 1
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+
+
+def _on_stack(target: FrameType, frame: Optional[FrameType]) -> bool:
+    while frame is not None:
+        if frame is target:
+            return True
+        frame = frame.f_back
+    return False
+
+
+class _Tracer:
+    """
+    Deterministic profiler: attributes exact self time (µs) to each call stack,
+    including C calls. Keeps the current collapsed stack incrementally so each
+    event costs O(1).
+    """
+
+    def __init__(self, session: _Session):
+        self.session = session
+        self.path: List[str] = []
+        self.last = time.perf_counter()
+
+    def __call__(self, frame, event, arg) -> None:
+        now = time.perf_counter()
+        # Charge the elapsed time to the stack that was running until now
+        if self.path and self.path[-1]:
+            self.session.stacks[self.path[-1]] += (now - self.last) * 1_000_000
+        if event == "call" and frame.f_code.co_filename == __file__:
+            # Hide the profiler's own wrappers: repeat the parent stack
+            self.path.append(self.path[-1] if self.path else "")
+        elif event == "call" or event == "c_call":
+            label = _frame_label(frame) if event == "call" else _c_label(arg)
+            self.path.append(
+                f"{self.path[-1]};{label}" if self.path and self.path[-1] else label
+            )
+        elif self.path:
+            # Returns from frames entered before profiling started are ignored
+            self.path.pop()
+        self.last = time.perf_counter()
+
+
+def _c_label(fn) -> str:
+    module = getattr(fn, "__module__", None) or "builtins"
+    return f"{getattr(fn, '__qualname__', repr(fn))} ({module})".replace(";", ":")
+
+
+def _start(session: _Session, mode: str, owner: Optional[FrameType] = None):
+    """Profile the current thread; sampling only, and filtered, with an `owner` frame."""
+    if mode == "deterministic" and owner is None:
+        tracer = _Tracer(session)
+        sys.setprofile(tracer)
+        return tracer
+    sampler = _Sampler(session, _config.interval, threading.get_ident(), owner)
+    sampler.start()
+    return sampler
+
+
+def _stop(profiler) -> None:
+    if isinstance(profiler, _Tracer):
+        sys.setprofile(None)
+    else:
+        profiler.stop()
+
+
+def profiled(name: str, root: bool = True) -> Callable:
+    """
+    Decorator for hot paths. When profiling is disabled it adds a couple of
+    attribute checks (plus a shared toggle read at most every `SYNC_INTERVAL`).
+
+    With `root=True` a call that is not already inside a profile starts one and
+    dumps collapsed stacks (flamegraph.pl / speedscope compatible) to
+    `profiling_dir` when it returns. With `root=False` the function only records
+    call counts and time into an enclosing profile. Coroutine functions (request
+    handlers) are sampled on the event-loop thread, and only while the
+    coroutine itself is running, so concurrent requests stay out of each
+    other's profiles; work they hand to the threadpool is not included.
+    Root calls pick up toggles made through other workers (see `configure`).
+    """
+
+    def decorator(fn: Callable) -> Callable:
+        if asyncio.iscoroutinefunction(fn):
+
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                if root:
+                    _sync()
+                if not _config.enabled or not root:
+                    return await fn(*args, **kwargs)
+                session = _Session(name)
+                # This coroutine's frame is on the loop thread's stack while it runs
+                profiler = _start(session, "sampling", owner=sys._getframe())
+                try:
+                    return await fn(*args, **kwargs)
+                finally:
+                    _stop(profiler)
+                    _dump(session, "sampling")
+
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if root and getattr(_active, "session", None) is None:
+                _sync()
+            if not _config.enabled:
+                return fn(*args, **kwargs)
+            session: Optional[_Session] = getattr(_active, "session", None)
+            if session is not None:
+                started_at = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    session.record_call(name, time.perf_counter() - started_at)
+            if not root:
+                return fn(*args, **kwargs)
+
+            session = _Session(name)
+            mode = _config.mode
+            _active.session = session
+            profiler = _start(session, mode)
+            started_at = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                _stop(profiler)
+                _active.session = None
+                session.record_call(name, time.perf_counter() - started_at)
+                _dump(session, mode)
+
+        return wrapper
+
+    return decorator
+
+
+def instrument(owner: type, *attributes: str) -> None:
+    """
+    Register per-call hot paths (e.g. grid validators called thousands of times per
+    puzzle). They are wrapped with `profiled(root=False)` only while profiling is
+    enabled, so the disabled path costs nothing at all.
+    """
+    for attribute in attributes:
+        _hot_paths.append((owner, attribute, getattr(owner, attribute)))
+    _apply_hot_paths()
+
+
+def _apply_hot_paths() -> None:
+    for owner, attribute, original in _hot_paths:
+        if _config.enabled:
+            name = f"{owner.__name__}.{attribute}"
+            setattr(owner, attribute, profiled(name, root=False)(original))
+        else:
+            setattr(owner, attribute, original)
+
+
+def _dump(session: _Session, mode: str) -> None:
+    try:
+        path = session.dump(mode)
+        if path:
+            logging.info(f"Wrote {mode} profile for {session.name} to {path}")
+    except OSError as e:
+        logging.warning(f"Could not write profile for {session.name}: {e}")
+
+
+def list_profiles(limit: int = 20) -> List[Dict[str, Any]]:
+    """Most recent collapsed-stack dumps in the profiling directory."""
+    if not os.path.isdir(_config.directory):
+        return []
+    paths = [
+        os.path.join(_config.directory, name)
+        for name in os.listdir(_config.directory)
+        if name.endswith(".collapsed")
+    ]
+    paths.sort(key=os.path.getmtime, reverse=True)
+    return [
+        {
+            "path": path,
+            "bytes": os.path.getsize(path),
+            "modified": os.path.getmtime(path),
+        }
+        for path in paths[:limit]
+    ]
+
+
+def config_dict() -> Dict[str, Any]:
+    _sync(force=True)
+    return asdict(_config)
@@ -0,0 +1,165 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterator, List, Optional
+
+from src.crossword.clue_generator import CrosswordClue
+from src.settings import settings
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS puzzles (
+    id TEXT PRIMARY KEY,
+    topic TEXT,
+    difficulty TEXT,
+    model TEXT,
+    source TEXT NOT NULL,
+    clues TEXT NOT NULL,
+    grid TEXT NOT NULL,
+    placements TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS puzzles_topic ON puzzles (topic, difficulty);
+"""
+
+
+@dataclass
+class StoredPuzzle:
+    id: str
+    topic: Optional[str]
+    difficulty: Optional[str]
+    model: Optional[str]
+    source: str
+    clues: List[CrosswordClue]
+    grid: List[List[str]]
+    placements: List[dict]
+    created_at: float
+
+
+def puzzle_id(grid: List[List[str]], placements: List[dict]) -> str:
+    """Content hash of the solved grid and its clues, so identical puzzles share an id."""
+    canonical = json.dumps(
+        {"grid": grid, "placements": placements}, sort_keys=True, separators=(",", ":")
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:20]
+
+
+class PuzzleStore:
+    """
+    Local SQLite store of generated puzzles, keyed by content hash. Written by the
+    offline pre-generation CLI and readable by the API.
+    """
+
+    def __init__(self, path: str = settings.puzzle_store_path):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        with self._connection() as conn:
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        # One connection per thread; sqlite3 connections aren't shareable across threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        with conn:
+            yield conn
+
+    def save(
+        self,
+        clues: List[CrosswordClue],
+        grid: List[List[str]],
+        placements: List[dict],
+        topic: Optional[str] = None,
+        difficulty: Optional[str] = None,
+        model: Optional[str] = None,
+        source: str = "api",
+    ) -> str:
+        """
+        Store a puzzle unless an identical one exists.
+
+        Returns:
+            str: The puzzle id (content hash).
+        """
+        pid = puzzle_id(grid, placements)
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO puzzles VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    pid,
+                    topic,
+                    difficulty,
+                    model,
+                    source,
+                    json.dumps([c.model_dump() for c in clues]),
+                    json.dumps(grid),
+                    json.dumps(placements),
+                    time.time(),
+                ),
+            )
+        return pid
+
+    def get(self, pid: str) -> Optional[StoredPuzzle]:
+        with self._connection() as conn:
+            row = conn.execute("SELECT * FROM puzzles WHERE id = ?", (pid,)).fetchone()
+        return self._from_row(row) if row else None
+
+    def find(
+        self,
+        topic: Optional[str] = None,
+        difficulty: Optional[str] = None,
+        limit: int = 20,
+    ) -> List[StoredPuzzle]:
+        """Most recent puzzles, optionally filtered by topic and difficulty."""
+        query = "SELECT * FROM puzzles WHERE 1 = 1"
+        params: list = []
+        if topic is not None:
+            query += " AND topic = ?"
+            params.append(topic)
+        if difficulty is not None:
+            query += " AND difficulty = ?"
+            params.append(difficulty)
+        query += " ORDER BY created_at DESC LIMIT ?"
+        params.append(limit)
+        with self._connection() as conn:
+            rows = conn.execute(query, params).fetchall()
+        return [self._from_row(row) for row in rows]
+
+    def count(self) -> int:
+        with self._connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM puzzles").fetchone()[0]
+
+    @staticmethod
+    def _from_row(row: tuple) -> StoredPuzzle:
+        pid, topic, difficulty, model, source, clues, grid, placements, created = row
+        return StoredPuzzle(
+            id=pid,
+            topic=topic,
+            difficulty=difficulty,
+            model=model,
+            source=source,
+            clues=[CrosswordClue(**c) for c in json.loads(clues)],
+            grid=json.loads(grid),
+            placements=json.loads(placements),
+            created_at=created,
+        )
+
+
+_PUZZLE_STORE = None
+
+
+def get_puzzle_store() -> PuzzleStore:
+    """Get the process-wide puzzle store, creating it on first use."""
+    global _PUZZLE_STORE
+    if _PUZZLE_STORE is None:
+        _PUZZLE_STORE = PuzzleStore()
+    return _PUZZLE_STORE
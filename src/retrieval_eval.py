@@ -0,0 +1,124 @@
+import random
+import statistics
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from src.metrics import percentile
+
+ClueKey = Tuple[str, str]
+
+
+def clue_key(clue: str, answer: str) -> ClueKey:
+    """Normalized identity of a corpus clue, comparable across sources."""
+    return " ".join(str(clue).lower().split()), str(answer).strip().upper()
+
+
+@dataclass
+class EvalQuery:
+    """
+    One held-out query with the corpus clues that count as relevant.
+
+    "answer" queries use an answer as a one-word topic ("Jazz") and expect
+    the clues for that answer; "clue" queries use one clue and expect the
+    other clues for the same answer, with the query clue itself excluded.
+
+    `query_properties` limits the text the query is matched against (BM25 and
+    the reranker; None = all). "answer" queries leave out the answer property,
+    which would match the query text exactly and say nothing about retrieval.
+    """
+
+    text: str
+    kind: str
+    relevant: FrozenSet[ClueKey]
+    exclude: Optional[ClueKey] = None
+    query_properties: Optional[List[str]] = None
+
+
+# search(query, limit) -> retrieved (clue, answer) keys, best first
+SearchFn = Callable[[EvalQuery, int], List[ClueKey]]
+
+
+def build_query_set(
+    rows: Iterable[Dict[str, Any]],
+    num_queries: int,
+    seed: int = 13,
+    min_clues: int = 2,
+) -> List[EvalQuery]:
+    """
+    Sample answers with at least `min_clues` distinct clues in the corpus and
+    build one "answer" and one "clue" query for each, `num_queries` in total.
+    """
+    by_answer: Dict[str, set] = defaultdict(set)
+    for row in rows:
+        clue, answer = row.get("clue"), row.get("answer")
+        if clue and answer and str(answer).strip().isalpha():
+            key = clue_key(clue, answer)
+            by_answer[key[1]].add(key)
+
+    rng = random.Random(seed)
+    answers = sorted(a for a, keys in by_answer.items() if len(keys) >= min_clues)
+    rng.shuffle(answers)
+    queries: List[EvalQuery] = []
+    for answer in answers:
+        if len(queries) >= num_queries:
+            break
+        keys = sorted(by_answer[answer])
+        queries.append(
+            EvalQuery(
+                answer.title(), "answer", frozenset(keys), query_properties=["clue"]
+            )
+        )
+        held_out = rng.choice(keys)
+        queries.append(
+            EvalQuery(
+                held_out[0],
+                "clue",
+                frozenset(k for k in keys if k != held_out),
+                exclude=held_out,
+            )
+        )
+    return queries[:num_queries]
+
+
+def evaluate(search: SearchFn, queries: List[EvalQuery], k: int) -> Dict[str, Any]:
+    """
+    Run every query through `search` and score the top `k` results.
+
+    recall@k is the share of relevant clues retrieved, out of at most `k`;
+    MRR is the mean reciprocal rank of the first relevant clue (0 if none).
+    Latency covers the whole `search` call (embedding, query and reranking).
+
+    Returns:
+        dict: Overall and per-kind recall@k and MRR, and latency p50/p99 in ms.
+    """
+    scores: Dict[str, List[Tuple[float, float]]] = defaultdict(list)
+    latencies = []
+    for query in queries:
+        started_at = time.perf_counter()
+        retrieved = search(query, k + (1 if query.exclude else 0))
+        latencies.append(time.perf_counter() - started_at)
+
+        # Repeated clues (same text and answer, other years) count once
+        unique = [key for key in dict.fromkeys(retrieved) if key != query.exclude]
+        retrieved = unique[:k]
+        hits = [key in query.relevant for key in retrieved]
+        recall = sum(hits) / min(len(query.relevant), k)
+        reciprocal_rank = next((1 / (i + 1) for i, hit in enumerate(hits) if hit), 0)
+        scores[query.kind].append((recall, reciprocal_rank))
+        scores["all"].append((recall, reciprocal_rank))
+
+    result: Dict[str, Any] = {
+        kind: {
+            "queries": len(pairs),
+            f"recall@{k}": round(statistics.mean(r for r, _ in pairs), 4),
+            "mrr": round(statistics.mean(rr for _, rr in pairs), 4),
+        }
+        for kind, pairs in scores.items()
+    }
+    result["latency_ms"] = {
+        "p50": round(percentile(latencies, 50) * 1000, 2),
+        "p99": round(percentile(latencies, 99) * 1000, 2),
+    }
+    return result
@@ -1,3 +1,5 @@
+from typing import Dict, Optional
+
 from pydantic_settings import BaseSettings
 
 
@@ -7,6 +9,115 @@ class Settings(BaseSettings):
     collection_name: str
     embedding_model: str
 
+    # Query embedding inference: "torch" (fp32 reference), "onnx" (ONNX Runtime)
+    # or "onnx-int8" (dynamically quantized, exported once to `embedding_onnx_dir`;
+    # quantization preset "avx2"/"avx512"/"avx512_vnni"/"arm64", None = by CPU).
+    # Compare them with scripts/bench_embeddings.py
+    embedding_backend: str = "torch"
+    embedding_onnx_dir: str = ".cache/onnx"
+    embedding_quantization: Optional[str] = None
+
+    # Clue example retrieval: "vector" (near_vector only) or "hybrid" (BM25 on
+    # clue/answer fused with vector search; alpha 1.0 = pure vector, 0.0 = pure
+    # BM25). A cross-encoder reranker (e.g. "cross-encoder/ms-marco-MiniLM-L6-v2")
+    # reorders `retrieval_rerank_candidates` results when set. Year and answer
+    # length bounds are pushed down into the query as filters.
+    # Compare settings with scripts/eval_retrieval.py before changing the default
+    retrieval_mode: str = "vector"
+    retrieval_alpha: float = 0.5
+    retrieval_reranker_model: Optional[str] = None
+    retrieval_rerank_candidates: int = 20
+    retrieval_min_year: Optional[int] = None
+    retrieval_max_answer_length: Optional[int] = None
+
+    # LLM scheduling: concurrency per model (substring match on the model id,
+    # e.g. {"haiku": 8}), token-bucket rate limit and load shedding thresholds
+    llm_default_concurrency: int = 4
+    llm_model_concurrency: Dict[str, int] = {}
+    llm_requests_per_minute: float = 50.0
+    llm_burst: int = 10
+    llm_max_queue_depth: int = 64
+    llm_queue_timeout: float = 30.0
+
+    # LLM call policy: per-attempt timeout, overall deadline, retries with
+    # jittered exponential backoff, and optional hedging to a cheaper model
+    llm_timeout: float = 60.0
+    llm_deadline: float = 120.0
+    llm_max_retries: int = 3
+    llm_backoff_base: float = 0.5
+    llm_backoff_max: float = 8.0
+    llm_hedge_after: Optional[float] = None
+    llm_hedge_model: Optional[str] = None
+
+    # Anthropic transport: "live", "record" (append responses to the cassette) or
+    # "replay" (serve the cassette locally with simulated latency, no API calls)
+    llm_transport: str = "live"
+    llm_cassette_path: str = "scripts/cassettes/anthropic.jsonl"
+    llm_replay_latency: str = "fixed:0"
+
+    # Claude model discovery: persisted last-known list and refresh cadence (seconds)
+    model_cache_path: str = ".cache/claude_models.json"
+    model_refresh_interval: float = 3600.0
+    model_discovery_timeout: float = 10.0
+
+    # State shared by API worker processes (job records, LLM rate-limit windows,
+    # usage totals): "sqlite" (a local file, fine for workers on one host),
+    # "redis" (any Redis-protocol server) or "memory" (single worker only)
+    state_backend: str = "sqlite"
+    state_sqlite_path: str = ".cache/state.sqlite3"
+    state_redis_url: str = "redis://localhost:6379/0"
+
+    # Background job workers and how long finished job results are kept (seconds)
+    job_workers: int = 4
+    job_result_ttl: float = 3600.0
+
+    # Batch puzzle generation: max puzzles per request, puzzles generating clues
+    # at once, and grid-building worker processes (None = one per CPU)
+    batch_max_puzzles: int = 50
+    batch_concurrency: int = 4
+    grid_workers: Optional[int] = None
+
+    # Fit-driven puzzles: over-generate clues with a target answer-length mix
+    # (share per length), keep the subset that fills the grid best and top up
+    # with pattern-targeted clues within a call/time budget
+    fit_overgenerate_factor: float = 2.0
+    fit_length_distribution: Dict[int, float] = {
+        3: 0.10, 4: 0.20, 5: 0.20, 6: 0.15, 7: 0.15, 8: 0.10, 9: 0.05, 10: 0.05,
+    }  # fmt: skip
+    fit_trials: int = 6
+    fit_max_calls: int = 3
+    fit_max_seconds: float = 120.0
+
+    # Memory-mapped index of corpus answers by length and letter-at-position
+    # (built by scripts/build_answer_index.py); fit-driven puzzles fill open
+    # slots from it when present
+    answer_index_path: str = ".cache/answer_index"
+
+    # Play WebSocket (/ws/play/{session_id}): outbound frames buffered per
+    # connection before senders wait, server ping cadence, seconds without any
+    # client frame before the connection is closed, and concurrent requests
+    ws_send_queue_size: int = 256
+    ws_heartbeat_interval: float = 20.0
+    ws_idle_timeout: float = 60.0
+    ws_max_in_flight: int = 4
+
+    # Responses at least this large (bytes) are Brotli/gzip-compressed
+    compression_minimum_size: int = 1000
+
+    # Local SQLite store of generated puzzles (filled by scripts/pregenerate_puzzles.py)
+    puzzle_store_path: str = ".cache/puzzles.sqlite3"
+
+    # Profiling hooks: off by default, toggled here or via /api/admin/profiling.
+    # Mode is "sampling" (stack samples every `profiling_interval` seconds) or
+    # "deterministic" (every call); collapsed stacks are written to `profiling_dir`
+    profiling_enabled: bool = False
+    profiling_mode: str = "sampling"
+    profiling_dir: str = ".cache/profiles"
+    profiling_interval: float = 0.005
+
+    # Shared secret for /api/admin/* (sent as X-Admin-Token); unset disables them
+    admin_token: Optional[str] = None
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
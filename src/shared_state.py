@@ -0,0 +1,387 @@
+import os
+import socket
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from src.settings import settings
+
+
+class StateBackend(ABC):
+    """
+    Key-value state shared by the API's worker processes: job records, rate-limit
+    windows and usage totals. Values are strings; TTLs are in seconds.
+
+    `shared` is False for backends that only live in the current process, which
+    is only correct with a single worker.
+    """
+
+    shared = True
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[str]: ...
+
+    @abstractmethod
+    def set(self, key: str, value: str, ttl: Optional[float] = None) -> None: ...
+
+    @abstractmethod
+    def delete(self, key: str) -> None: ...
+
+    @abstractmethod
+    def incr(self, key: str, ttl: Optional[float] = None) -> int:
+        """Atomically add one to an integer key; `ttl` applies when it is created."""
+
+    @abstractmethod
+    def expire(self, key: str, ttl: float) -> None: ...
+
+    @abstractmethod
+    def hincrbyfloat(self, key: str, field: str, amount: float) -> float:
+        """Atomically add `amount` to one field of a hash."""
+
+    @abstractmethod
+    def hgetall(self, key: str) -> Dict[str, str]: ...
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Drop every key."""
+
+
+class MemoryBackend(StateBackend):
+    """Process-local dicts; for a single worker and tests."""
+
+    shared = False
+
+    def __init__(self):
+        self._values: Dict[str, Tuple[str, Optional[float]]] = {}
+        self._hashes: Dict[str, Dict[str, str]] = {}
+        self._lock = threading.Lock()
+
+    def _live(self, key: str) -> Optional[str]:
+        item = self._values.get(key)
+        if item is None:
+            return None
+        value, expires_at = item
+        if expires_at is not None and expires_at <= time.time():
+            del self._values[key]
+            return None
+        return value
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            return self._live(key)
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        with self._lock:
+            self._values[key] = (value, time.time() + ttl if ttl else None)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._values.pop(key, None)
+            self._hashes.pop(key, None)
+
+    def incr(self, key: str, ttl: Optional[float] = None) -> int:
+        with self._lock:
+            current = self._live(key)
+            if current is None:
+                self._values[key] = ("1", time.time() + ttl if ttl else None)
+                return 1
+            value = int(current) + 1
+            self._values[key] = (str(value), self._values[key][1])
+            return value
+
+    def expire(self, key: str, ttl: float) -> None:
+        with self._lock:
+            value = self._live(key)
+            if value is not None:
+                self._values[key] = (value, time.time() + ttl)
+
+    def hincrbyfloat(self, key: str, field: str, amount: float) -> float:
+        with self._lock:
+            fields = self._hashes.setdefault(key, {})
+            value = float(fields.get(field, 0.0)) + amount
+            fields[field] = repr(value)
+            return value
+
+    def hgetall(self, key: str) -> Dict[str, str]:
+        with self._lock:
+            return dict(self._hashes.get(key, {}))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+            self._hashes.clear()
+
+
+_SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS kv (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    expires_at REAL
+);
+CREATE TABLE IF NOT EXISTS hashes (
+    key TEXT NOT NULL,
+    field TEXT NOT NULL,
+    value REAL NOT NULL,
+    PRIMARY KEY (key, field)
+);
+"""
+
+
+class SQLiteBackend(StateBackend):
+    """
+    State in a local SQLite file (WAL mode), shared by every worker process on
+    the host. Expired keys are ignored on read and purged periodically.
+    """
+
+    # Purge expired keys after this many writes
+    PURGE_EVERY = 1000
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        self._writes = 0
+        with self._connection() as conn:
+            conn.executescript(_SQLITE_SCHEMA)
+
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        # One connection per thread; sqlite3 connections aren't shareable across threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        with conn:
+            yield conn
+
+    def _wrote(self, conn: sqlite3.Connection) -> None:
+        self._writes += 1
+        if self._writes % self.PURGE_EVERY == 0:
+            conn.execute("DELETE FROM kv WHERE expires_at <= ?", (time.time(),))
+
+    def get(self, key: str) -> Optional[str]:
+        with self._connection() as conn:
+            row = conn.execute(
+                "SELECT value FROM kv WHERE key = ? "
+                "AND (expires_at IS NULL OR expires_at > ?)",
+                (key, time.time()),
+            ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO kv (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, time.time() + ttl if ttl else None),
+            )
+            self._wrote(conn)
+
+    def delete(self, key: str) -> None:
+        with self._connection() as conn:
+            conn.execute("DELETE FROM kv WHERE key = ?", (key,))
+            conn.execute("DELETE FROM hashes WHERE key = ?", (key,))
+
+    def incr(self, key: str, ttl: Optional[float] = None) -> int:
+        now = time.time()
+        with self._connection() as conn:
+            # An expired row restarts at 1 with a fresh TTL
+            row = conn.execute(
+                """
+                INSERT INTO kv (key, value, expires_at) VALUES (?1, '1', ?2)
+                ON CONFLICT (key) DO UPDATE SET
+                    value = CASE WHEN expires_at <= ?3 THEN '1'
+                                 ELSE CAST(CAST(value AS INTEGER) + 1 AS TEXT) END,
+                    expires_at = CASE WHEN expires_at <= ?3 THEN ?2 ELSE expires_at END
+                RETURNING value
+                """,
+                (key, now + ttl if ttl else None, now),
+            ).fetchone()
+            self._wrote(conn)
+        return int(row[0])
+
+    def expire(self, key: str, ttl: float) -> None:
+        with self._connection() as conn:
+            conn.execute(
+                "UPDATE kv SET expires_at = ? WHERE key = ?", (time.time() + ttl, key)
+            )
+
+    def hincrbyfloat(self, key: str, field: str, amount: float) -> float:
+        with self._connection() as conn:
+            row = conn.execute(
+                """
+                INSERT INTO hashes (key, field, value) VALUES (?, ?, ?)
+                ON CONFLICT (key, field) DO UPDATE SET value = value + excluded.value
+                RETURNING value
+                """,
+                (key, field, amount),
+            ).fetchone()
+        return row[0]
+
+    def hgetall(self, key: str) -> Dict[str, str]:
+        with self._connection() as conn:
+            rows = conn.execute(
+                "SELECT field, value FROM hashes WHERE key = ?", (key,)
+            ).fetchall()
+        return {field: repr(value) for field, value in rows}
+
+    def clear(self) -> None:
+        with self._connection() as conn:
+            conn.execute("DELETE FROM kv")
+            conn.execute("DELETE FROM hashes")
+
+
+class RedisProtocolError(Exception):
+    """Raised for RESP error replies (`-ERR ...`) from the state server."""
+
+
+class RedisBackend(StateBackend):
+    """
+    State on a Redis-protocol server (Redis, Valkey, or the local stand-in in
+    `scripts/state_server.py`), via a minimal RESP2 client with one connection
+    per thread. Only GET/SET/DEL/INCR/PEXPIRE/HINCRBYFLOAT/HGETALL/FLUSHDB are
+    used.
+    """
+
+    # Safe to resend when the reply was lost: a second run has the same effect
+    IDEMPOTENT_COMMANDS = frozenset(
+        {"AUTH", "SELECT", "GET", "SET", "DEL", "PEXPIRE", "HGETALL", "FLUSHDB"}
+    )
+
+    def __init__(self, url: str, timeout: float = 5.0):
+        parsed = urlparse(url)
+        if parsed.scheme != "redis":
+            raise ValueError(f"Unsupported state backend URL: {url!r}")
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.password = parsed.password
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connect(self) -> Tuple[socket.socket, BinaryIO]:
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        conn = (sock, sock.makefile("rb"))
+        self._local.conn = conn
+        if self.password:
+            self._command("AUTH", self.password)
+        if self.db:
+            self._command("SELECT", self.db)
+        return conn
+
+    def _command(self, *args) -> object:
+        request = _encode_command(args)
+        conn = getattr(self._local, "conn", None) or self._connect()
+        sent = False
+        try:
+            conn[0].sendall(request)
+            sent = True
+            return _read_reply(conn[1])
+        except (ConnectionError, socket.timeout, OSError):
+            conn[0].close()
+            self._local.conn = None
+            # Reconnect once: the server may have closed an idle connection. Once
+            # the request is out it may have run, so it is only resent when
+            # running it twice is harmless; INCR/HINCRBYFLOAT would double count
+            if sent and args[0] not in self.IDEMPOTENT_COMMANDS:
+                raise
+            conn = self._connect()
+            conn[0].sendall(request)
+            return _read_reply(conn[1])
+
+    def get(self, key: str) -> Optional[str]:
+        value = self._command("GET", key)
+        return value.decode("utf-8") if value is not None else None
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        if ttl:
+            self._command("SET", key, value, "PX", max(1, int(ttl * 1000)))
+        else:
+            self._command("SET", key, value)
+
+    def delete(self, key: str) -> None:
+        self._command("DEL", key)
+
+    def incr(self, key: str, ttl: Optional[float] = None) -> int:
+        value = self._command("INCR", key)
+        if value == 1 and ttl:
+            self.expire(key, ttl)
+        return value
+
+    def expire(self, key: str, ttl: float) -> None:
+        self._command("PEXPIRE", key, max(1, int(ttl * 1000)))
+
+    def hincrbyfloat(self, key: str, field: str, amount: float) -> float:
+        return float(self._command("HINCRBYFLOAT", key, field, repr(amount)))
+
+    def hgetall(self, key: str) -> Dict[str, str]:
+        items: List[bytes] = self._command("HGETALL", key) or []
+        return {
+            items[i].decode("utf-8"): items[i + 1].decode("utf-8")
+            for i in range(0, len(items), 2)
+        }
+
+    def clear(self) -> None:
+        self._command("FLUSHDB")
+
+
+def _encode_command(args: tuple) -> bytes:
+    parts = [f"*{len(args)}\r\n".encode()]
+    for arg in args:
+        data = arg if isinstance(arg, bytes) else str(arg).encode("utf-8")
+        parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+    return b"".join(parts)
+
+
+def _read_reply(reader: BinaryIO) -> object:
+    line = reader.readline()
+    if not line:
+        raise ConnectionError("State server closed the connection")
+    kind, payload = line[:1], line[1:-2]
+    if kind == b"+":
+        return payload.decode("utf-8")
+    if kind == b"-":
+        raise RedisProtocolError(payload.decode("utf-8"))
+    if kind == b":":
+        return int(payload)
+    if kind == b"$":
+        length = int(payload)
+        if length < 0:
+            return None
+        data = reader.read(length + 2)
+        return data[:-2]
+    if kind == b"*":
+        count = int(payload)
+        return None if count < 0 else [_read_reply(reader) for _ in range(count)]
+    raise RedisProtocolError(f"Unexpected reply: {line!r}")
+
+
+def build_state_backend(kind: Optional[str] = None) -> StateBackend:
+    """Backend per `settings.state_backend`: "memory", "sqlite" or "redis"."""
+    kind = (kind or settings.state_backend).lower()
+    if kind == "memory":
+        return MemoryBackend()
+    if kind == "sqlite":
+        return SQLiteBackend(settings.state_sqlite_path)
+    if kind == "redis":
+        return RedisBackend(settings.state_redis_url)
+    raise ValueError(f"Unknown state backend: {kind!r}")
+
+
+_STATE_BACKEND = None
+
+
+def get_state_backend() -> StateBackend:
+    """Get the process-wide state backend, creating it on first use."""
+    global _STATE_BACKEND
+    if _STATE_BACKEND is None:
+        _STATE_BACKEND = build_state_backend()
+    return _STATE_BACKEND
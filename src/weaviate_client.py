@@ -1,10 +1,44 @@
-from typing import Optional
-
-import weaviate
-from sentence_transformers import SentenceTransformer
+from typing import List, Optional
 
+from src.embeddings import get_embedding_model, get_reranker
+from src.metrics import timed
 from src.settings import settings
 
+RETRIEVAL_MODES = ("vector", "hybrid")
+
+# Text properties matched against the query by BM25 (hybrid mode) and the reranker
+KEYWORD_PROPERTIES = ["clue", "answer"]
+
+
+def build_filters(
+    min_year: Optional[int] = None,
+    max_year: Optional[int] = None,
+    min_answer_length: Optional[int] = None,
+    max_answer_length: Optional[int] = None,
+):
+    """
+    Weaviate filter for the given bounds (inclusive), or None when unbounded.
+
+    Answer length filters need the `answer_length` property written by
+    scripts/setup_weaviate.py.
+    """
+    from weaviate.classes.query import Filter
+
+    bounds = [
+        ("year", min_year, "greater_or_equal"),
+        ("year", max_year, "less_or_equal"),
+        ("answer_length", min_answer_length, "greater_or_equal"),
+        ("answer_length", max_answer_length, "less_or_equal"),
+    ]
+    filters = [
+        getattr(Filter.by_property(name), op)(value)
+        for name, value, op in bounds
+        if value is not None
+    ]
+    if not filters:
+        return None
+    return Filter.all_of(filters) if len(filters) > 1 else filters[0]
+
 
 class WeaviateClient:
     def __init__(
@@ -13,27 +47,102 @@ class WeaviateClient:
         port: int = settings.weaviate_port,
         collection_name=settings.collection_name,
     ):
+        # Imported here: weaviate (grpc) and sentence_transformers (torch) are the
+        # heaviest imports in the project and only needed once a query is made
+        import weaviate
+
         self.client = weaviate.connect_to_local(
             host=host, port=port
         )  # TODO: This shouldn't be local for production
         self.collection = self.client.collections.get(collection_name)
-        self.embedding_model = SentenceTransformer(
-            settings.embedding_model, device="cpu"
-        )
+        # Shared by every client in the process; see settings.embedding_backend
+        self.embedding_model = get_embedding_model()
 
-    def query_collection(self, query: str, limit: Optional[int] = 7):
+    def query_collection(
+        self,
+        query: str,
+        limit: Optional[int] = 7,
+        mode: Optional[str] = None,
+        alpha: Optional[float] = None,
+        reranker_model: Optional[str] = None,
+        query_properties: Optional[List[str]] = None,
+        min_year: Optional[int] = None,
+        max_year: Optional[int] = None,
+        min_answer_length: Optional[int] = None,
+        max_answer_length: Optional[int] = None,
+    ):
         """
         Query the Weaviate collection with a given query string.
 
+        Hybrid mode fuses BM25 over the clue and answer text with vector search,
+        which keeps short topics like "Jazz" on topic where the embedding alone
+        drifts. With a reranker, `settings.retrieval_rerank_candidates` results
+        are fetched and the best `limit` kept by cross-encoder score.
+
         Args:
             query (str): The query string to search for.
             limit (Optional[int]): The maximum number of results to return. Defaults to 7.
+            mode (Optional[str]): "vector" or "hybrid". Defaults to `settings.retrieval_mode`.
+            alpha (Optional[float]): Hybrid weight of the vector score, 0.0-1.0. Defaults to `settings.retrieval_alpha`.
+            reranker_model (Optional[str]): Cross-encoder to rerank with. Defaults to `settings.retrieval_reranker_model`; "" disables.
+            query_properties (Optional[List[str]]): Text properties BM25 and the reranker match the query against. Defaults to KEYWORD_PROPERTIES.
+            min_year, max_year (Optional[int]): Inclusive bounds on the clue's year.
+            min_answer_length, max_answer_length (Optional[int]): Inclusive bounds on the answer length.
 
         Returns:
             list: A list of results matching the query.
         """
-        query_embedding = self.embedding_model.encode(query)
-        res = self.collection.query.near_vector(
-            near_vector=query_embedding, limit=limit
+        mode = (mode or settings.retrieval_mode).lower()
+        if mode not in RETRIEVAL_MODES:
+            raise ValueError(f"Unknown retrieval mode: {mode!r}")
+        alpha = settings.retrieval_alpha if alpha is None else alpha
+        if reranker_model is None:
+            reranker_model = settings.retrieval_reranker_model
+        query_properties = query_properties or KEYWORD_PROPERTIES
+        filters = build_filters(
+            min_year, max_year, min_answer_length, max_answer_length
         )
-        return res.objects
+        fetch = limit
+        if reranker_model:
+            fetch = max(limit or 0, settings.retrieval_rerank_candidates)
+
+        with timed("embedding"):
+            query_embedding = self.embedding_model.encode(query)
+        with timed("weaviate_query", limit=fetch, mode=mode):
+            if mode == "hybrid":
+                res = self.collection.query.hybrid(
+                    query=query,
+                    vector=query_embedding,
+                    alpha=alpha,
+                    query_properties=query_properties,
+                    filters=filters,
+                    limit=fetch,
+                )
+            else:
+                res = self.collection.query.near_vector(
+                    near_vector=query_embedding, filters=filters, limit=fetch
+                )
+        if not reranker_model or not res.objects:
+            return res.objects
+        with timed("rerank", candidates=len(res.objects)):
+            return self._rerank(
+                reranker_model, query, res.objects, "answer" in query_properties
+            )[:limit]
+
+    @staticmethod
+    def _rerank(
+        model_name: str, query: str, objects: list, with_answer: bool = True
+    ) -> list:
+        """Order `objects` by cross-encoder relevance of "clue (answer)" to `query`."""
+        pairs = [
+            (
+                query,
+                f"{obj.properties.get('clue', '')} ({obj.properties.get('answer', '')})"
+                if with_answer
+                else str(obj.properties.get("clue", "")),
+            )
+            for obj in objects
+        ]
+        scores = get_reranker(model_name).predict(pairs)
+        order = sorted(range(len(objects)), key=lambda i: scores[i], reverse=True)
+        return [objects[i] for i in order]
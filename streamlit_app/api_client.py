@@ -1,19 +1,76 @@
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import json
 import logging
-from typing import Dict, List, Optional
+import threading
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional
 
 import httpx
-import pandas as pd
 
 from src.crossword.clue_generator import CrosswordClue, CrosswordClueResponse
 from src.crossword.crossword_generator import Placement
+from src.crossword.wire_format import COMPACT_MEDIA_TYPE, MSGPACK_MEDIA_TYPE, expand
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# One APIClient serves every Streamlit session, so keep enough idle connections
+# for concurrent users and hold them across script reruns
+HTTP_LIMITS = httpx.Limits(
+    max_connections=32, max_keepalive_connections=16, keepalive_expiry=120.0
+)
+# HTTP/2 needs the optional `h2` package (httpx[http2]); it is negotiated over
+# TLS, e.g. when the API sits behind an h2-speaking proxy, else HTTP/1.1 is used
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Ask for the compact crossword wire format (msgpack when installed); the API
+# falls back to plain JSON, and `_decode` handles all three
+MSGPACK_AVAILABLE = importlib.util.find_spec("msgpack") is not None
+ACCEPT = ", ".join(
+    ([MSGPACK_MEDIA_TYPE] if MSGPACK_AVAILABLE else [])
+    + [COMPACT_MEDIA_TYPE, "application/json;q=0.5"]
+)
+
+# Fallbacks used when the API can't be reached for a metadata endpoint
+METADATA_ENDPOINTS: Dict[str, tuple[str, str, List[str]]] = {
+    "models": ("/api/models", "models", []),
+    "difficulty_levels": (
+        "/api/difficulty-levels",
+        "difficulty_levels",
+        ["Easy", "Medium", "Hard"],
+    ),
+    "chat_types": (
+        "/api/chat-types",
+        "chat_types",
+        ["Get a Hint", "Deep Dive into the Answer"],
+    ),
+}
 
 
 class APIClient:
     """Client for communicating with the FastAPI backend."""
 
-    def __init__(self, base_url: str = "http://localhost:8000"):
+    # Server-side wait per long-poll request; must stay below the HTTP timeout
+    LONG_POLL_TIMEOUT = 25.0
+    # Stored puzzles kept for conditional GETs, least recently used evicted first
+    PUZZLE_CACHE_SIZE = 256
+
+    def __init__(
+        self, base_url: str = "http://localhost:8000", http2: bool = HTTP2_AVAILABLE
+    ):
         self.base_url = base_url
-        self.client = httpx.Client(timeout=30.0)
+        self.http2 = http2
+        # Thread-safe and pooled: shared by all sessions' script threads
+        self.client = httpx.Client(
+            timeout=30.0, limits=HTTP_LIMITS, http2=http2, headers={"Accept": ACCEPT}
+        )
+        # puzzle_id -> (ETag, response JSON) for conditional GETs
+        self._puzzle_cache: OrderedDict[str, tuple[str, dict]] = OrderedDict()
+        self._puzzle_cache_lock = threading.Lock()
 
     def __del__(self):
         """Clean up the HTTP client on destruction."""
@@ -51,7 +108,7 @@ class APIClient:
             )
             response.raise_for_status()
 
-            data = response.json()
+            data = self._decode(response)
             return CrosswordClueResponse(**data)
 
         except Exception as e:
@@ -73,28 +130,184 @@ class APIClient:
             )
             response.raise_for_status()
 
-            data = response.json()
+            return self._parse_crossword(self._decode(response))
 
-            # Convert response back to expected formats
-            grid_df = pd.DataFrame(data["grid"])
+        except Exception as e:
+            logging.error(f"Error generating crossword: {e}")
+            return None
 
-            placements = []
-            for p_data in data["placements"]:
-                placement = Placement(
-                    word=p_data["word"],
-                    row=p_data["row"],
-                    col=p_data["col"],
-                    direction=p_data["direction"],
-                    clue=p_data["clue"],
+    def generate_puzzle(
+        self,
+        topic_str: Optional[str] = None,
+        difficulty: Optional[str] = None,
+        num_clues: Optional[int] = 30,
+        model: str = "claude-3-5-haiku-20241022",
+        max_wait: float = 600.0,
+        fit_driven: bool = False,
+    ) -> Optional[tuple[List[CrosswordClue], pd.DataFrame, List[Placement], str]]:
+        """
+        Generate clues and grid as a background job, long-polling until it finishes.
+        Returns the clues, grid, placements and shareable puzzle id.
+        """
+        try:
+            payload = {
+                "topic_str": topic_str,
+                "difficulty": difficulty,
+                "num_clues": num_clues,
+                "model": model,
+                "fit_driven": fit_driven,
+            }
+            response = self.client.post(
+                f"{self.base_url}/api/jobs/puzzle", json=payload
+            )
+            response.raise_for_status()
+            job_id = self._decode(response)["job_id"]
+
+            deadline = time.monotonic() + max_wait
+            while time.monotonic() < deadline:
+                response = self.client.get(
+                    f"{self.base_url}/api/jobs/{job_id}/wait",
+                    params={"timeout": self.LONG_POLL_TIMEOUT},
                 )
-                placements.append(placement)
+                response.raise_for_status()
+                job = self._decode(response)
+                if job["status"] == "completed":
+                    result = job["result"]
+                    return (*self._parse_puzzle(result), result.get("puzzle_id"))
+                if job["status"] == "failed":
+                    logging.error(f"Puzzle job {job_id} failed: {job['error']}")
+                    return None
+
+            logging.error(f"Puzzle job {job_id} did not finish within {max_wait}s")
+            return None
 
-            return grid_df, placements
+        except Exception as e:
+            logging.error(f"Error generating puzzle: {e}")
+            return None
+
+    def generate_puzzle_batch(
+        self,
+        specs: List[Dict],
+        model: str = "claude-3-5-haiku-20241022",
+        timeout: float = 1800.0,
+    ) -> Iterator[dict]:
+        """
+        Generate many puzzles in one request. `specs` are dicts of topic_str,
+        difficulty and num_clues; yields each NDJSON result line (with its
+        `index` into `specs`) as soon as the server finishes that puzzle.
+        """
+        payload = {"puzzles": [{"model": model, **spec} for spec in specs]}
+        with self.client.stream(
+            "POST",
+            f"{self.base_url}/api/puzzles/batch",
+            json=payload,
+            timeout=httpx.Timeout(30.0, read=timeout),
+        ) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if line.strip():
+                    yield json.loads(line)
+
+    def get_puzzle(
+        self, puzzle_id: str
+    ) -> Optional[tuple[List[CrosswordClue], pd.DataFrame, List[Placement]]]:
+        """Load a stored puzzle by id, revalidating a cached copy with its ETag."""
+        try:
+            headers = {}
+            cached = self._cached_puzzle(puzzle_id)
+            if cached:
+                headers["If-None-Match"] = cached[0]
+            response = self.client.get(
+                f"{self.base_url}/api/puzzles/{puzzle_id}", headers=headers
+            )
+            if response.status_code == 304 and cached:
+                data = cached[1]
+            else:
+                response.raise_for_status()
+                data = self._decode(response)
+                if response.headers.get("etag"):
+                    self._cache_puzzle(puzzle_id, response.headers["etag"], data)
+            return self._parse_puzzle(data)
 
         except Exception as e:
-            logging.error(f"Error generating crossword: {e}")
+            logging.error(f"Error loading puzzle {puzzle_id}: {e}")
+            return None
+
+    def _cached_puzzle(self, puzzle_id: str) -> Optional[tuple[str, dict]]:
+        with self._puzzle_cache_lock:
+            cached = self._puzzle_cache.get(puzzle_id)
+            if cached:
+                self._puzzle_cache.move_to_end(puzzle_id)
+            return cached
+
+    def _cache_puzzle(self, puzzle_id: str, etag: str, data: dict) -> None:
+        with self._puzzle_cache_lock:
+            self._puzzle_cache[puzzle_id] = (etag, data)
+            self._puzzle_cache.move_to_end(puzzle_id)
+            while len(self._puzzle_cache) > self.PUZZLE_CACHE_SIZE:
+                self._puzzle_cache.popitem(last=False)
+
+    def verify_puzzle(
+        self,
+        puzzle_id: str,
+        fill: Optional[str] = None,
+        cells: Optional[List[tuple[int, int, str]]] = None,
+        per_cell: bool = False,
+    ) -> Optional[dict]:
+        """
+        Check a fill server-side: `fill` is the grid row-major as one string (any
+        non-letter is empty), `cells` sparse (row, col, letter) entries. Returns
+        per-placement statuses, solved/total and, with `per_cell`, a result
+        string ("+" correct, "x" wrong, "." empty, "#" block).
+        """
+        try:
+            payload = {"fill": fill, "cells": cells, "per_cell": per_cell}
+            response = self.client.post(
+                f"{self.base_url}/api/puzzles/{puzzle_id}/verify", json=payload
+            )
+            response.raise_for_status()
+            return self._decode(response)
+
+        except Exception as e:
+            logging.error(f"Error verifying puzzle {puzzle_id}: {e}")
             return None
 
+    @staticmethod
+    def _decode(response: httpx.Response) -> Any:
+        """Response body as plain JSON-shaped data, whatever wire format was served."""
+        if response.headers.get("content-type", "").startswith(MSGPACK_MEDIA_TYPE):
+            import msgpack
+
+            return expand(msgpack.unpackb(response.content, raw=False))
+        return expand(response.json())
+
+    @classmethod
+    def _parse_puzzle(
+        cls, data: dict
+    ) -> tuple[List[CrosswordClue], pd.DataFrame, List[Placement]]:
+        clues = [CrosswordClue(**c) for c in data["clues"]]
+        return (clues, *cls._parse_crossword(data))
+
+    @staticmethod
+    def _parse_crossword(data: dict) -> tuple[pd.DataFrame, List[Placement]]:
+        """Convert a crossword response back to the grid DataFrame and placements."""
+        import pandas as pd
+
+        grid_df = pd.DataFrame(data["grid"])
+
+        placements = []
+        for p_data in data["placements"]:
+            placement = Placement(
+                word=p_data["word"],
+                row=p_data["row"],
+                col=p_data["col"],
+                direction=p_data["direction"],
+                clue=p_data["clue"],
+            )
+            placements.append(placement)
+
+        return grid_df, placements
+
     def generate_chat_response(
         self,
         user_input: str,
@@ -102,6 +315,7 @@ class APIClient:
         chat_type: str = "Get a Hint",
         historical_messages: List[Dict[str, str]] = None,
         model: str = "claude-3-5-sonnet-20241022",
+        session_id: Optional[str] = None,
     ) -> Optional[str]:
         """Generate chat response via API."""
         try:
@@ -114,6 +328,7 @@ class APIClient:
                 "chat_type": chat_type,
                 "historical_messages": historical_messages,
                 "model": model,
+                "session_id": session_id,
             }
 
             response = self.client.post(
@@ -121,48 +336,69 @@ class APIClient:
             )
             response.raise_for_status()
 
-            data = response.json()
+            data = self._decode(response)
             return data["response"]
 
         except Exception as e:
             logging.error(f"Error generating chat response: {e}")
             return None
 
+    async def fetch_metadata_async(self) -> Dict[str, Any]:
+        """
+        Fetch API health and the models, difficulty levels and chat types
+        concurrently, falling back to defaults for any endpoint that fails.
+
+        Returns:
+            Dict[str, Any]: `healthy` plus one list per `METADATA_ENDPOINTS` key.
+        """
+        # An AsyncClient's pool is bound to its event loop, so it lives for one
+        # fetch; callers cache the result instead of the connections
+        async with httpx.AsyncClient(
+            base_url=self.base_url, timeout=10.0, limits=HTTP_LIMITS, http2=self.http2
+        ) as client:
+
+            async def healthy() -> bool:
+                try:
+                    return (await client.get("/health")).status_code == 200
+                except Exception:
+                    return False
+
+            async def fetch(name: str) -> List[str]:
+                path, key, fallback = METADATA_ENDPOINTS[name]
+                try:
+                    response = await client.get(path)
+                    response.raise_for_status()
+                    return response.json()[key]
+                except Exception as e:
+                    logging.error(f"Error getting {name}: {e}")
+                    return fallback
+
+            names = list(METADATA_ENDPOINTS)
+            results = await asyncio.gather(healthy(), *(fetch(n) for n in names))
+        return {"healthy": results[0], **dict(zip(names, results[1:]))}
+
+    def fetch_metadata(self) -> Dict[str, Any]:
+        """Blocking wrapper of `fetch_metadata_async` for Streamlit's script thread."""
+        return asyncio.run(self.fetch_metadata_async())
+
     def get_available_models(self) -> List[str]:
         """Get list of available models from the API."""
-        try:
-            response = self.client.get(f"{self.base_url}/api/models")
-            response.raise_for_status()
-
-            data = response.json()
-            return data["models"]
-
-        except Exception as e:
-            logging.error(f"Error getting available models: {e}")
-            return []
+        return self._get_metadata("models")
 
     def get_difficulty_levels(self) -> List[str]:
         """Get list of difficulty levels from the API."""
-        try:
-            response = self.client.get(f"{self.base_url}/api/difficulty-levels")
-            response.raise_for_status()
-
-            data = response.json()
-            return data["difficulty_levels"]
-
-        except Exception as e:
-            logging.error(f"Error getting difficulty levels: {e}")
-            return ["Easy", "Medium", "Hard"]  # Fallback
+        return self._get_metadata("difficulty_levels")
 
     def get_chat_types(self) -> List[str]:
         """Get list of chat types from the API."""
+        return self._get_metadata("chat_types")
+
+    def _get_metadata(self, name: str) -> List[str]:
+        path, key, fallback = METADATA_ENDPOINTS[name]
         try:
-            response = self.client.get(f"{self.base_url}/api/chat-types")
+            response = self.client.get(f"{self.base_url}{path}")
             response.raise_for_status()
-
-            data = response.json()
-            return data["chat_types"]
-
+            return self._decode(response)[key]
         except Exception as e:
-            logging.error(f"Error getting chat types: {e}")
-            return ["Get a Hint", "Deep Dive into the Answer"]  # Fallback
+            logging.error(f"Error getting {name}: {e}")
+            return fallback
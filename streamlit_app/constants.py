@@ -9,3 +9,6 @@ DIFFICULTY_LEVEL = ["Easy", "Medium", "Hard"]
 CHAT_TYPE = ["Get a Hint", "Deep Dive into the Answer"]
 
 BLOCK_TOKEN = "⬛⬛"
+
+# How long the API's models / difficulty levels / chat types are cached
+METADATA_TTL_SECONDS = 300
@@ -1,33 +1,46 @@
-from typing import List, Optional
+import uuid
+from typing import Any, Dict, List, Optional
 
-import numpy as np
 import pandas as pd
 import streamlit as st
 
-from src.crossword.crossword_generator import (
-    CrosswordClue,
-    CrosswordGenerator,
-    Placement,
-)
+from src.crossword.crossword_generator import CrosswordClue, Placement
 from streamlit_app.api_client import APIClient
-from streamlit_app.constants import BLOCK_TOKEN
+from streamlit_app.constants import METADATA_TTL_SECONDS
+from streamlit_app.grid_state import GridState
+
+
+@st.cache_resource
+def get_api_client() -> APIClient:
+    """One pooled API client per Streamlit process, reused across reruns and sessions."""
+    return APIClient()
+
+
+@st.cache_data(ttl=METADATA_TTL_SECONDS, show_spinner=False)
+def load_metadata() -> Dict[str, Any]:
+    """Models, difficulty levels and chat types, refetched at most once per TTL."""
+    metadata = get_api_client().fetch_metadata()
+    if not metadata["healthy"]:
+        # Exceptions aren't cached, so the next rerun retries
+        raise ConnectionError("API server is not running")
+    return metadata
 
 
 class AppDisplay:
     def __init__(self):
-        self.api_client = APIClient()
+        self.api_client = get_api_client()
 
-        # Check API health on initialization
-        if not self.api_client.health_check():
+        try:
+            metadata = load_metadata()
+        except ConnectionError:
             st.error(
                 "❌ API server is not running! Please start it with: python scripts/run_api.py"
             )
             st.stop()
 
-        # Fetch constants from API
-        self.claude_models = self.api_client.get_available_models()
-        self.difficulty_levels = self.api_client.get_difficulty_levels()
-        self.chat_types = self.api_client.get_chat_types()
+        self.claude_models = metadata["models"]
+        self.difficulty_levels = metadata["difficulty_levels"]
+        self.chat_types = metadata["chat_types"]
 
         self.init_session_states()
 
@@ -35,11 +48,18 @@ class AppDisplay:
         submitted = self.display_crossword_form()
         if submitted:
             self.generate_crossword()
+        else:
+            self.load_shared_puzzle()
         if (
             st.session_state.grid is not None
             and st.session_state.placements is not None
         ):
             st.success("Generated crossword successfully")
+            if st.session_state.puzzle_id:
+                st.caption(
+                    f"Puzzle ID `{st.session_state.puzzle_id}`: share this page's URL "
+                    "to share the puzzle"
+                )
             col1, col2 = st.columns(2)
             with col1:
                 self.display_crossword()
@@ -57,14 +77,17 @@ class AppDisplay:
             ("show_answers", False),
             ("clue_model", self.claude_models[0]),
             ("num_clues", 30),
+            ("fit_driven", False),
             ("editable", True),
-            ("user_grid", None),
+            ("grid_state", None),
             ("chat_type", self.chat_types[0]),
             ("prev_chat_type", self.chat_types[0]),
             ("chat_history", []),
             ("selected_clue", None),
             ("last_selected_clue_idx", None),
             ("pending_clue_response", False),
+            ("session_id", uuid.uuid4().hex),
+            ("puzzle_id", None),
         ]:
             if k not in st.session_state:
                 st.session_state[k] = v
@@ -99,29 +122,43 @@ Hard – tougher references, grad-level knowledge, trickier clues.""",
                     value=st.session_state.num_clues,
                     step=1,
                 )
+                fit_driven = st.checkbox(
+                    "Optimize grid fill",
+                    value=st.session_state.fit_driven,
+                    help="Over-generates clues and keeps the ones that interlock best. "
+                    "Slower and uses extra model calls.",
+                )
             submitted = st.form_submit_button("Generate Crossword")
         if submitted:
             st.session_state.topics = topics
             st.session_state.difficulty_level = difficulty_level
             st.session_state.clue_model = clue_model
             st.session_state.num_clues = num_clues
+            st.session_state.fit_driven = fit_driven
         return submitted
 
     def reset_non_form_states(self):
         """Reset all session states except the form-driving ones."""
-        preserved_keys = {"topics", "difficulty_level", "clue_model", "num_clues"}
+        preserved_keys = {
+            "topics",
+            "difficulty_level",
+            "clue_model",
+            "num_clues",
+            "fit_driven",
+        }
         defaults = {
             "grid": None,
             "placements": None,
             "show_answers": False,
             "editable": True,
-            "user_grid": None,
+            "grid_state": None,
             "chat_type": self.chat_types[0],
             "prev_chat_type": self.chat_types[0],
             "chat_history": [],
             "selected_clue": None,
             "last_selected_clue_idx": None,
             "pending_clue_response": False,
+            "puzzle_id": None,
         }
         for k, v in defaults.items():
             if k not in preserved_keys:
@@ -129,31 +166,49 @@ Hard – tougher references, grad-level knowledge, trickier clues.""",
 
     def generate_crossword(self):
         self.reset_non_form_states()
-        with st.spinner("Generating clues..."):
-            clue_response = self.api_client.generate_clues(
+        with st.spinner("Generating crossword..."):
+            result = self.api_client.generate_puzzle(
                 topic_str=st.session_state.topics,
                 difficulty=st.session_state.difficulty_level,
                 num_clues=st.session_state.num_clues,
                 model=st.session_state.clue_model,
+                fit_driven=st.session_state.fit_driven,
             )
-        if clue_response and clue_response.clues:
-            with st.spinner("Creating crossword..."):
-                result = self.api_client.generate_crossword(clues=clue_response.clues)
-                if result:
-                    grid, placements = result
-                    st.session_state.grid = grid
-                    st.session_state.placements = sorted(
-                        sorted(placements, key=lambda x: x.col), key=lambda x: x.row
-                    )
-                    st.session_state.user_grid = None
-                else:
-                    st.session_state.grid = None
-                    st.session_state.placements = None
-                    st.session_state.user_grid = None
+        if result:
+            _, grid, placements, puzzle_id = result
+            self._set_puzzle(grid, placements, puzzle_id)
         else:
             st.session_state.grid = None
             st.session_state.placements = None
-            st.session_state.user_grid = None
+            st.session_state.grid_state = None
+
+    def load_shared_puzzle(self):
+        """Load the puzzle named in the `?puzzle=` URL parameter, if not already shown."""
+        puzzle_id = st.query_params.get("puzzle")
+        if not puzzle_id or puzzle_id == st.session_state.puzzle_id:
+            return
+        self.reset_non_form_states()
+        with st.spinner("Loading puzzle..."):
+            result = self.api_client.get_puzzle(puzzle_id)
+        if result:
+            _, grid, placements = result
+            self._set_puzzle(grid, placements, puzzle_id)
+        else:
+            st.error(f"Puzzle {puzzle_id} was not found")
+            del st.query_params["puzzle"]
+
+    def _set_puzzle(
+        self, grid: pd.DataFrame, placements: List[Placement], puzzle_id: Optional[str]
+    ):
+        st.session_state.grid = grid
+        st.session_state.placements = sorted(
+            sorted(placements, key=lambda x: x.col), key=lambda x: x.row
+        )
+        st.session_state.grid_state = None
+        st.session_state.puzzle_id = puzzle_id
+        # Keep the URL shareable: reloading it restores this puzzle
+        if puzzle_id:
+            st.query_params["puzzle"] = puzzle_id
 
     def display_crossword(self):
         st.write("### ✍️ Crossword")
@@ -211,6 +266,7 @@ Hard – tougher references, grad-level knowledge, trickier clues.""",
                     chat_type=st.session_state.chat_type,
                     historical_messages=st.session_state.chat_history,
                     model=self.claude_models[0],
+                    session_id=st.session_state.session_id,
                 )
             if response:
                 st.session_state.chat_history.append(
@@ -243,6 +299,7 @@ Hard – tougher references, grad-level knowledge, trickier clues.""",
             chat_type=st.session_state.chat_type,
             historical_messages=st.session_state.chat_history,
             model=self.claude_models[0],
+            session_id=st.session_state.session_id,
         )
         if response:
             st.session_state.chat_history.append(
@@ -306,114 +363,62 @@ Hard – tougher references, grad-level knowledge, trickier clues.""",
             st.session_state.pending_clue_response = True
         st.session_state.prev_chat_type = new_chat_type
 
-    def _sync_user_grid(
-        self, grid: pd.DataFrame, editor_key: str = "grid_editor"
-    ) -> None:
-        """Callback: convert what's shown in the editor back into the internal user_grid."""
-        if editor_key not in st.session_state:
-            return
-
-        raw_val = st.session_state.get(editor_key)
-        if raw_val is None:
-            return
-
-        try:
-            edited_df = pd.DataFrame(raw_val, index=grid.index, columns=grid.columns)
-            mask_blocks = grid == CrosswordGenerator.EMPTY
-            new_user = edited_df.copy()
-            new_user[mask_blocks] = CrosswordGenerator.EMPTY
-            non_blocks = ~mask_blocks
-            cleaned = new_user.where(non_blocks)
-            cleaned = cleaned.replace({BLOCK_TOKEN: ""}).fillna("")
-            new_user[non_blocks] = cleaned[non_blocks].astype(str)
-
-            st.session_state.user_grid = new_user
-        except Exception:
-            pass
+    def _grid_state(self, grid: pd.DataFrame) -> GridState:
+        """The session's GridState, built once per puzzle."""
+        state = st.session_state.grid_state
+        if state is None or state.shape != grid.shape:
+            state = GridState(grid.to_numpy(), st.session_state.placements)
+            st.session_state.grid_state = state
+        return state
 
     def render_crossword(
         self, grid: pd.DataFrame, show_answer: bool = False, editable: bool = False
     ) -> None:
         """Render the crossword grid with optional editing & answer reveal."""
-        need_init = (
-            "user_grid" not in st.session_state
-            or st.session_state.user_grid is None
-            or not isinstance(st.session_state.user_grid, pd.DataFrame)
-            or st.session_state.user_grid.shape != grid.shape
-        )
-        if need_init:
-            st.session_state.user_grid = pd.DataFrame(
-                np.where(
-                    grid.values != CrosswordGenerator.EMPTY,
-                    "",
-                    CrosswordGenerator.EMPTY,
-                ),
-                index=grid.index,
-                columns=grid.columns,
-            )
-
-        n_rows = grid.shape[0]
-        row_heights = (n_rows + 1) * 35
-
-        def color_cells(val: Optional[str]) -> str:
-            if val in (CrosswordGenerator.EMPTY, BLOCK_TOKEN):
-                return "background-color: black; color: black"
-            return "background-color: white; color: black; text-align: center"
+        state = self._grid_state(grid)
+        row_heights = (grid.shape[0] + 1) * 35
 
         if editable:
-            if show_answer:
-                display_df = grid.replace(CrosswordGenerator.EMPTY, BLOCK_TOKEN)
-                disabled = True
-            else:
-                display_df = st.session_state.user_grid.mask(
-                    grid == CrosswordGenerator.EMPTY, BLOCK_TOKEN
-                )
-                disabled = False
-
+            display_df = pd.DataFrame(
+                state.display(show_answer), index=grid.index, columns=grid.columns
+            )
             col_config = {
                 col: st.column_config.Column(width=45) for col in display_df.columns
             }
-            if disabled:
-                st.data_editor(
-                    display_df,
-                    height=row_heights,
-                    key="grid_editor",
-                    disabled=disabled,
-                    column_config=col_config,
-                    hide_index=False,
-                )
-            else:
-                st.data_editor(
-                    display_df,
-                    height=row_heights,
-                    key="grid_editor",
-                    disabled=disabled,
-                    column_config=col_config,
-                    hide_index=False,
-                )
-                if "grid_editor" in st.session_state:
-                    self._sync_user_grid(grid, "grid_editor")
-
+            edited = st.data_editor(
+                display_df,
+                height=row_heights,
+                key="grid_editor",
+                disabled=show_answer,
+                column_config=col_config,
+                hide_index=False,
+            )
+            if not show_answer:
+                state.update(edited.fillna("").to_numpy())
         else:
-            if show_answer:
-                df = grid
-            else:
-                df = pd.DataFrame(
-                    np.where(
-                        grid.values != CrosswordGenerator.EMPTY,
-                        "",
-                        CrosswordGenerator.EMPTY,
-                    ),
-                    index=grid.index,
-                    columns=grid.columns,
-                )
-
-            styled = df.style.applymap(color_cells)
-            st.dataframe(styled, height=row_heights)
+            df = pd.DataFrame(
+                state.display(show_answer), index=grid.index, columns=grid.columns
+            )
+            styles = state.styles(highlight_solved=not show_answer)
+            st.dataframe(
+                df.style.apply(lambda _: styles, axis=None), height=row_heights
+            )
 
     def render_placements(self, placements: List[Placement], show_answer: bool = False):
         """Display the crossword clues in Streamlit, split into Across and Down."""
         st.write("### 🔍 Clues")
+        state = st.session_state.grid_state
+        statuses = (
+            {
+                (p.row, p.col, p.direction): status
+                for p, status in zip(state.placements, state.check_words())
+            }
+            if state
+            else {}
+        )
+        if statuses:
+            solved = sum(status == "correct" for status in statuses.values())
+            st.caption(f"{solved}/{len(statuses)} answers solved")
         across = [p for p in placements if p.direction == "across"]
         down = [p for p in placements if p.direction == "down"]
         col1, col2 = st.columns(2)
@@ -432,6 +437,8 @@ Hard – tougher references, grad-level knowledge, trickier clues.""",
                     clue_text = f"{p.clue} ({p.word})"
                 else:
                     clue_text = p.clue
+                if statuses.get((p.row, p.col, p.direction)) == "correct":
+                    clue_text = f"✅ {clue_text}"
                 c3.write(clue_text)
 
         with col1:
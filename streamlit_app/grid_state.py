@@ -0,0 +1,98 @@
+from functools import lru_cache
+from typing import List, Literal, Sequence
+
+import numpy as np
+
+from src.crossword.crossword_generator import CrosswordGenerator, Placement
+from streamlit_app.constants import BLOCK_TOKEN
+
+WordStatus = Literal["correct", "incorrect", "incomplete"]
+
+BLOCK_STYLE = "background-color: black; color: black"
+CELL_STYLE = "background-color: white; color: black; text-align: center"
+SOLVED_STYLE = "background-color: #d4edda; color: black; text-align: center"
+
+
+class GridState:
+    """
+    A player's progress on one puzzle as fixed-width NumPy character arrays.
+
+    The solution, block mask and the flat cell indices of every placement are
+    computed once per puzzle; edits and answer checks are then whole-array
+    operations instead of DataFrame rebuilds.
+    """
+
+    def __init__(self, solution: np.ndarray, placements: Sequence[Placement]):
+        self.solution = np.asarray(solution, dtype="<U1")
+        self.blocks = self.solution == CrosswordGenerator.EMPTY
+        self.user = np.where(self.blocks, CrosswordGenerator.EMPTY, "").astype("<U1")
+        self.placements = list(placements)
+
+        # Flat cell indices of all words back to back, split at `_word_starts`
+        n_cols = self.solution.shape[1]
+        cells, starts = [], []
+        for p in self.placements:
+            starts.append(len(cells))
+            k = np.arange(len(p.word))
+            rows = p.row + (k if p.direction == "down" else 0)
+            cols = p.col + (k if p.direction == "across" else 0)
+            cells.extend(rows * n_cols + cols)
+        self._word_cells = np.asarray(cells, dtype=np.intp)
+        self._word_starts = np.asarray(starts, dtype=np.intp)
+
+    @property
+    def shape(self) -> tuple:
+        return self.solution.shape
+
+    def update(self, values: np.ndarray) -> None:
+        """Take the editor's values: first letter of each cell, upper-cased."""
+        values = np.char.upper(np.char.strip(np.asarray(values, dtype=str)))
+        values = np.where(values == BLOCK_TOKEN, "", values).astype("<U1")
+        self.user = np.where(self.blocks, CrosswordGenerator.EMPTY, values)
+
+    def display(self, show_answer: bool = False) -> np.ndarray:
+        """Cell values for the grid widgets, with blocks shown as `BLOCK_TOKEN`."""
+        values = self.solution if show_answer else self.user
+        return np.where(self.blocks, BLOCK_TOKEN, values)
+
+    def check_words(self) -> List[WordStatus]:
+        """Status of each placement, in the order given at construction."""
+        correct, filled = self._word_flags()
+        return [
+            "correct" if ok else "incorrect" if full else "incomplete"
+            for ok, full in zip(correct.tolist(), filled.tolist())
+        ]
+
+    def solved_cells(self) -> np.ndarray:
+        """Mask of the cells covered by at least one correctly filled word."""
+        correct, _ = self._word_flags()
+        lengths = np.diff(np.append(self._word_starts, len(self._word_cells)))
+        mask = np.zeros(self.solution.size, dtype=bool)
+        mask[self._word_cells[np.repeat(correct, lengths)]] = True
+        return mask.reshape(self.shape)
+
+    def _word_flags(self) -> tuple:
+        """(all letters correct, all cells filled) per placement."""
+        if not self.placements:
+            return np.zeros(0, dtype=bool), np.zeros(0, dtype=bool)
+        user = self.user.ravel()[self._word_cells]
+        correct = np.logical_and.reduceat(
+            user == self.solution.ravel()[self._word_cells], self._word_starts
+        )
+        filled = np.logical_and.reduceat(user != "", self._word_starts)
+        return correct, filled
+
+    def styles(self, highlight_solved: bool = False) -> np.ndarray:
+        """Per-cell CSS for a pandas Styler, cached per block/solved layout."""
+        solved = self.solved_cells() if highlight_solved else np.zeros_like(self.blocks)
+        return _cell_styles(self.shape, self.blocks.tobytes(), solved.tobytes())
+
+
+@lru_cache(maxsize=64)
+def _cell_styles(shape: tuple, blocks: bytes, solved: bytes) -> np.ndarray:
+    blocks_mask = np.frombuffer(blocks, dtype=bool).reshape(shape)
+    solved_mask = np.frombuffer(solved, dtype=bool).reshape(shape)
+    styles = np.where(solved_mask, SOLVED_STYLE, CELL_STYLE)
+    styles = np.where(blocks_mask, BLOCK_STYLE, styles)
+    styles.flags.writeable = False
+    return styles